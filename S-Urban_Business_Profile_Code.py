@@ -5,41 +5,602 @@ Using actual branding: Dark charcoal/black with yellow/gold accents
 Version 3: Fixed year to 2026, added Aadhar Equipments, improved client logos alignment, fixed contact page
 """
 
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.units import mm
-from reportlab.lib.colors import HexColor
-from reportlab.pdfgen import canvas
-from reportlab.lib.utils import ImageReader
-from PIL import Image
+from collections import OrderedDict, deque
+from dataclasses import asdict, dataclass, field, fields, replace
+from functools import lru_cache
+from typing import NamedTuple
+import argparse
+import base64
+import contextlib
+import copy
+import hashlib
+import importlib
+import io
+import json
+import math
 import os
+import re
+import shutil
+import signal
+import socket
+import string
+import struct
+import sys
+import time
+import traceback
+import zlib
+
+class _LazyModule:
+    """Stand-in for a module that is imported on first attribute access.
+
+    reportlab, Pillow, asyncio and the process pool account for most of the
+    startup time, and commands such as --help or client never touch them.
+    """
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+reportlab = _LazyModule('reportlab')
+rl_config = _LazyModule('reportlab.rl_config')
+colors = _LazyModule('reportlab.lib.colors')
+canvas = _LazyModule('reportlab.pdfgen.canvas')
+pdfdoc = _LazyModule('reportlab.pdfbase.pdfdoc')
+pdfmetrics = _LazyModule('reportlab.pdfbase.pdfmetrics')
+pathobject = _LazyModule('reportlab.pdfgen.pathobject')
+Image = _LazyModule('PIL.Image')
+features = _LazyModule('PIL.features')
+asyncio = _LazyModule('asyncio')
+futures = _LazyModule('concurrent.futures')
+csv = _LazyModule('csv')
+html = _LazyModule('html')
+np = _LazyModule('numpy')
+pickle = _LazyModule('pickle')
+pymupdf = _LazyModule('pymupdf')
+statistics = _LazyModule('statistics')
+subprocess = _LazyModule('subprocess')
+tempfile = _LazyModule('tempfile')
+tracemalloc = _LazyModule('tracemalloc')
+urllib_parse = _LazyModule('urllib.parse')
 
 # Get the directory where this script is located
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 IMAGES_DIR = os.path.join(SCRIPT_DIR, 'images')
+# SURBAN_CACHE_DIR relocates every on-disk cache (the benchmarks use it for cold runs)
+CACHE_DIR = os.environ.get('SURBAN_CACHE_DIR') or os.path.join(SCRIPT_DIR, '.cache')
+PLAN_CACHE_DIR = os.path.join(CACHE_DIR, 'plans')
+ASSET_CACHE_DIR = os.path.join(CACHE_DIR, 'assets')
+PAGE_CACHE_DIR = os.path.join(CACHE_DIR, 'pages')
+XOBJECT_CACHE_DIR = os.path.join(CACHE_DIR, 'xobjects')
 
-# Page dimensions
-WIDTH, HEIGHT = A4
+# Page dimensions: reportlab's mm and A4, spelled out so they need no import
+mm = 72.0 / 2.54 * 0.1
+WIDTH, HEIGHT = (210*mm, 297*mm)
 
 # Brand Colors - S-Urban Website Theme (Dark with Yellow)
-DARK_BG = HexColor('#1a1a1a')         # Main dark background
-DARKER_BG = HexColor('#000000')       # Pure black background
-ACCENT_YELLOW = HexColor('#f5b041')   # Yellow/Gold accent
-ACCENT_DARK_YELLOW = HexColor('#d4a534')  # Darker yellow
-WHITE = HexColor('#ffffff')
-LIGHT_GRAY = HexColor('#e5e5e5')
-MID_GRAY = HexColor('#888888')
-CARD_BG = HexColor('#252525')         # Card backgrounds
+DARK_BG = '#1a1a1a'  # Main dark background
+DARKER_BG = '#000000'  # Pure black background
+ACCENT_YELLOW = '#f5b041'  # Yellow/Gold accent
+ACCENT_DARK_YELLOW = '#d4a534'  # Darker yellow
+WHITE = '#ffffff'
+LIGHT_GRAY = '#e5e5e5'
+MID_GRAY = '#888888'
+CARD_BG = '#252525'  # Card backgrounds
 
-def draw_rounded_rect(c, x, y, width, height, radius, fill_color=None, stroke_color=None, stroke_width=1):
-    """Draw a rounded rectangle"""
-    c.saveState()
-    if fill_color:
-        c.setFillColor(fill_color)
-    if stroke_color:
-        c.setStrokeColor(stroke_color)
-        c.setLineWidth(stroke_width)
-    
-    p = c.beginPath()
+# ==================== CONTENT MODEL ====================
+
+@dataclass
+class ProfileContent:
+    """Everything the profile says, kept apart from how it is drawn.
+
+    Values are plain strings and lists so a profile round-trips through
+    JSON; batch manifests override fields by name.
+    """
+    recipient: str = None
+    # Printed under the recipient on the cover, e.g. a quotation number
+    reference: str = None
+    # Translucent diagonal text across every page, e.g. "DRAFT" or "CONFIDENTIAL"
+    watermark: str = None
+    tagline: str = "From Queries to Solutions"
+    year: str = "2026"
+    coverage_tag: str = "PAN India Services"
+    stats: list = field(default_factory=lambda: [
+        ("8+", "Years", "Experience"),
+        ("30+", "Projects", "Completed"),
+        ("15+", "Happy", "Clients"),
+        ("PAN", "India", "Coverage")
+    ])
+
+    about_title: list = field(default_factory=lambda: ["Building Excellence", "Through Expertise"])
+    about_paragraphs: list = field(default_factory=lambda: [
+        "S-Urban Consultancy is an emerging Project Management Company driven by a robust workforce of Project Managers, Team Leaders, Engineers, and multi-skilled technical resources.",
+        "At S-Urban, our governing principle is to maintain equality, diversity, and integrity in each project. We provide One Stop for Project Management Services with commitment to on-time delivery within budget.",
+        "We specialize in managing Big Industrial Projects including RCC Buildings, PEB Sheds, Outside Developments, RCC Roads, Drainage, High-Rise Towers, Commercial Complexes, and Villas across South Gujarat, Daman & Diu, and Dadra & Nagar Haveli."
+    ])
+    core_values: list = field(default_factory=lambda: [
+        ("Efficient Delivery", "On-time completion within budget"),
+        ("Quality Focus", "Precision in every detail"),
+        ("Client First", "Complete satisfaction guaranteed"),
+        ("Innovation", "Advanced methods & technology")
+    ])
+
+    services_subtitle: str = "Comprehensive project management solutions"
+    services: list = field(default_factory=lambda: [
+        ("01", "Project Consultancy", [
+            "Client objectives & constraints",
+            "Strategic planning process",
+            "Engineering deliverables",
+            "Value engineering solutions"
+        ]),
+        ("02", "Project Management", [
+            "Document control procedure",
+            "Design deliverables",
+            "Cost module & parameters",
+            "Migration strategy"
+        ]),
+        ("03", "Planning Services", [
+            "Planning packages",
+            "Weekly/monthly reporting",
+            "What-if analysis",
+            "Recovery programs"
+        ]),
+        ("04", "Claim & Dispute", [
+            "Site work survey",
+            "Agreement analysis",
+            "Mutual settlements",
+            "Legal support"
+        ]),
+        ("05", "Risk Management", [
+            "Risk identification",
+            "Risk assessment",
+            "Response planning",
+            "Monitor & control"
+        ]),
+        ("06", "Quality Assurance", [
+            "Quality control",
+            "Performance verification",
+            "Contract management",
+            "Best practices audit"
+        ])
+    ])
+
+    lifecycle_subtitle: str = "S-Urban adds value throughout the complete lifecycle"
+    phases: list = field(default_factory=lambda: [
+        ("01", "CONCEPT", "Identify needs,", "feasibility, master plans"),
+        ("02", "PLANNING", "Architectural plans,", "BOQ, scheduling"),
+        ("03", "EXECUTION", "Working drawings,", "contractor management"),
+        ("04", "MONITORING", "Quality control,", "performance check"),
+        ("05", "CLOSING", "Final reviews,", "handover, docs")
+    ])
+    reasons: list = field(default_factory=lambda: [
+        ("01", "We Are Creative", "Advanced technology and innovative methods developed through extensive project experience."),
+        ("02", "Honest & Dependable", "Highly trained teams selected specifically for each client, solving problems creatively."),
+        ("03", "Quality & Time", "Delivering quality work within the given time frame with full commitment."),
+        ("04", "Always Improving", "Meeting today's needs without jeopardizing the world of tomorrow.")
+    ])
+
+    clients_subtitle: str = "Partnering with leading organizations across India"
+    # (image file in IMAGES_DIR, display name)
+    clients: list = field(default_factory=lambda: [
+        ("param-infraspace.jpeg", "PARAM Infraspace"),
+        ("elleys.jpeg", "Elleys"),
+        ("v-trans.jpeg", "V-Trans"),
+        ("gamma-consultants.jpeg", "1.5 Gamma Consultants"),
+        ("loparex.jpeg", "Loparex"),
+        ("aadhar-equipments.jpeg", "Aadhar Equipments")
+    ])
+
+    founder_name: str = "Suryakesh Kumar Singh"
+    founder_role: str = "Civil Engineer (B.Tech) | Founder"
+    founder_photo: str = "founder.jpeg"
+    founder_bio: str = "Over 8+ years of experience managing construction projects including Big Industrial Projects - RCC Building, PEB Sheds, Outside Developments, RCC Roads, Drainage, High-Rise Towers, Commercial Complexes, Villas."
+    founder_stats: list = field(default_factory=lambda: [("8+", "Years"), ("30+", "Projects"), ("3", "Regions")])
+
+    contact_title: str = "Let's Build Something Great"
+    contact_subtitle: str = "Ready to start your project? Contact us today for a consultation."
+    contact_person: str = "Suryakesh Kumar Singh"
+    phone: str = "+91-7408703061"
+    email: str = "suryakesh422@gmail.com"
+    address: list = field(default_factory=lambda: [
+        "Row House no: G-33, Shivay Bungalows",
+        "Poniya Road, Behind New Mamlatdar Office",
+        "Killa Pardi, Valsad, Gujarat - 396125"
+    ])
+    website: str = "s-urbanconsultancy.in"
+
+    # SQLite project database (see PORTFOLIO); None leaves the portfolio out
+    portfolio: str = None
+    # Placeholders: any of PORTFOLIO_SUBTITLE_FIELDS, with an optional format spec
+    portfolio_subtitle: str = "{projects:,} completed projects since {first_year}"
+
+CONTENT_FIELDS = frozenset(f.name for f in fields(ProfileContent))
+# The PortfolioStats figures portfolio_subtitle may refer to
+PORTFOLIO_SUBTITLE_FIELDS = ('projects', 'first_year', 'clients', 'regions')
+
+def _check_portfolio_subtitle(template):
+    """Raise ValueError unless template formats with only PORTFOLIO_SUBTITLE_FIELDS"""
+    sample = dict.fromkeys(PORTFOLIO_SUBTITLE_FIELDS, 0)
+    try:
+        for _, name, _, _ in string.Formatter().parse(template):
+            if name is not None and name not in sample:
+                raise ValueError(f"unknown placeholder {{{name}}}; use one of {', '.join(PORTFOLIO_SUBTITLE_FIELDS)}")
+        template.format(**sample)
+    except ValueError as exc:
+        raise ValueError(f"Bad portfolio_subtitle: {exc}") from None
+
+def resolve_content(overrides=None):
+    """Build a ProfileContent from a dict of field overrides (or pass one through)"""
+    if isinstance(overrides, ProfileContent):
+        return overrides
+    overrides = overrides or {}
+    unknown = set(overrides) - CONTENT_FIELDS
+    if unknown:
+        raise ValueError(f"Unknown content field: {sorted(unknown)[0]!r}")
+    if 'portfolio_subtitle' in overrides:
+        _check_portfolio_subtitle(overrides['portfolio_subtitle'])
+    return replace(ProfileContent(), **overrides)
+
+def content_key(content):
+    """Stable hash of a profile's content, used to key cached layouts"""
+    data = json.dumps(asdict(resolve_content(content)), sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+# ==================== PORTFOLIO ====================
+#
+# Completed projects live in a SQLite database named by the content's
+# portfolio field. Headline figures come from aggregate queries the indexes
+# answer without scanning the table, and project cards are read in keyset
+# batches, so a catalogue of any size is laid out holding one batch of rows.
+
+sqlite3 = _LazyModule('sqlite3')
+
+PORTFOLIO_SCHEMA = """
+CREATE TABLE IF NOT EXISTS projects (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    category TEXT NOT NULL DEFAULT '',
+    client TEXT NOT NULL DEFAULT '',
+    location TEXT NOT NULL DEFAULT '',
+    region TEXT NOT NULL DEFAULT '',
+    year INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS projects_year ON projects (year, id);
+CREATE INDEX IF NOT EXISTS projects_category ON projects (category);
+CREATE INDEX IF NOT EXISTS projects_client ON projects (client);
+CREATE INDEX IF NOT EXISTS projects_region ON projects (region);
+"""
+PORTFOLIO_FIELDS = ('name', 'category', 'client', 'location', 'region', 'year')
+# Rows fetched per query while streaming project cards
+PORTFOLIO_BATCH = 256
+
+class Project(NamedTuple):
+    id: int
+    name: str
+    category: str
+    client: str
+    location: str
+    region: str
+    year: int
+
+class PortfolioStats(NamedTuple):
+    projects: int
+    first_year: int
+    clients: int
+    regions: int
+    categories: list    # (category, count), largest first
+
+def open_portfolio(path, create=False):
+    """Connect to a portfolio database, read-only unless create is set"""
+    if create:
+        db = sqlite3.connect(path)
+        db.executescript(PORTFOLIO_SCHEMA)
+        return db
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"{path}: no such portfolio database")
+    return sqlite3.connect(f"file:{urllib_parse.quote(os.path.abspath(path))}?mode=ro", uri=True)
+
+def _project_row(row):
+    name = (row.get('name') or '').strip()
+    if not name:
+        raise ValueError(f"Project without a name: {row!r}")
+    return (name, *((row.get(f) or '').strip() for f in PORTFOLIO_FIELDS[1:-1]), int(row['year']))
+
+def import_projects(path, rows, clear=False):
+    """Add project rows (dicts keyed by PORTFOLIO_FIELDS) to path; returns how many were added.
+
+    rows may be any iterable, such as a csv.DictReader; it is consumed
+    without being collected. All rows go in one transaction; clear first
+    deletes the projects already there.
+    """
+    db = open_portfolio(path, create=True)
+    try:
+        with db:
+            if clear:
+                db.execute("DELETE FROM projects")
+            before = db.total_changes
+            db.executemany(f"INSERT INTO projects ({', '.join(PORTFOLIO_FIELDS)}) VALUES (?, ?, ?, ?, ?, ?)",
+                           map(_project_row, rows))
+            added = db.total_changes - before
+        db.execute("ANALYZE")
+    finally:
+        db.close()
+    return added
+
+def portfolio_stamp(path):
+    # Writes may still sit in the write-ahead log, so it is part of the stamp
+    return f"{_file_stamp(path)}/{_file_stamp(path + '-wal')}"
+
+@lru_cache(maxsize=16)
+def _portfolio_stats(path, stamp):
+    db = open_portfolio(path)
+    try:
+        (projects,), = db.execute("SELECT COUNT(*) FROM projects")
+        (first_year,), = db.execute("SELECT MIN(year) FROM projects")
+        (clients,), = db.execute("SELECT COUNT(DISTINCT client) FROM projects WHERE client != ''")
+        (regions,), = db.execute("SELECT COUNT(DISTINCT region) FROM projects WHERE region != ''")
+        categories = db.execute("SELECT category, COUNT(*) FROM projects WHERE category != '' "
+                                "GROUP BY category ORDER BY 2 DESC, 1").fetchall()
+    finally:
+        db.close()
+    return PortfolioStats(projects, first_year, clients, regions, categories)
+
+def portfolio_stats(path):
+    """Aggregate figures of a portfolio database, memoised until the file changes"""
+    path = os.path.abspath(path)
+    return _portfolio_stats(path, portfolio_stamp(path))
+
+def iter_projects(path, batch=PORTFOLIO_BATCH):
+    """Yield every Project in path, newest first, batch rows per query.
+
+    Each query resumes after the last (year, id) returned, which the year
+    index seeks to directly, so no query reads rows it does not return and
+    no cursor stays open between batches.
+    """
+    columns = ', '.join(Project._fields)
+    db = open_portfolio(path)
+    try:
+        rows = db.execute(f"SELECT {columns} FROM projects ORDER BY year DESC, id DESC LIMIT ?",
+                          (batch,)).fetchall()
+        while rows:
+            count_event('portfolio_batches')
+            yield from map(Project._make, rows)
+            last = rows[-1]
+            rows = db.execute(f"SELECT {columns} FROM projects WHERE (year, id) < (?, ?) "
+                              "ORDER BY year DESC, id DESC LIMIT ?", (last[-1], last[0], batch)).fetchall()
+    finally:
+        db.close()
+
+def _stat_figure(n):
+    """Headline form of a count: exact below 100, else rounded down to two figures with a '+'"""
+    if n < 100:
+        return str(n)
+    step = 10 ** (len(str(n)) - 2)
+    return f"{n // step * step:,}" + ('+' if n % step else '')
+
+def portfolio_content(content):
+    """content with its years, projects, clients and regions figures taken from its portfolio.
+
+    Stats are matched on their labels, so reworded or extra stats are left
+    as they are; without a portfolio (or an empty one) nothing changes.
+    """
+    content = resolve_content(content)
+    if not content.portfolio:
+        return content
+    stats = portfolio_stats(content.portfolio)
+    if not stats.projects:
+        return content
+    year = int(content.year) if str(content.year).isdigit() else time.localtime().tm_year
+    figures = {'Years': f"{max(year - stats.first_year, 1)}+", 'Projects': _stat_figure(stats.projects)}
+    if stats.clients:
+        figures['Clients'] = _stat_figure(stats.clients)
+    if stats.regions:
+        figures['Regions'] = _stat_figure(stats.regions)
+
+    def figure(number, *labels):
+        return next((figures[label] for label in labels if label in figures), number)
+
+    return replace(content,
+                   stats=[(figure(number, a, b), a, b) for number, a, b in content.stats],
+                   founder_stats=[(figure(number, label), label) for number, label in content.founder_stats])
+
+# ==================== INSTRUMENTATION ====================
+#
+# Opt-in timing and counters. Nothing is recorded unless the run is wrapped
+# in `with instrumented() as inst:`; until then span() and count_event()
+# cost a global lookup. Hooks are called as hook(kind, name, value, attrs)
+# with kind 'span' (value in seconds) or 'count', for forwarding elsewhere.
+
+_INSTRUMENT = None
+_NO_SPAN = contextlib.nullcontext()
+
+class Instrumentation:
+    """Spans, counters and per-page figures collected during one run"""
+
+    def __init__(self, hooks=()):
+        self.hooks = list(hooks)
+        self.origin = time.perf_counter()
+        self.spans = []  # (name, category, start, seconds, attrs)
+        self.counters = {}
+        self.pages = []
+
+    def add_span(self, name, category, start, seconds, attrs):
+        self.spans.append((name, category, start - self.origin, seconds, attrs))
+        for hook in self.hooks:
+            hook('span', name, seconds, attrs)
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+        for hook in self.hooks:
+            hook('count', name, n, {})
+
+    def report(self):
+        """Span totals by name, counters and per-page figures as a JSON-ready dict"""
+        totals = {}
+        for name, category, _, seconds, _ in self.spans:
+            entry = totals.setdefault(name, {'category': category, 'calls': 0, 'total_ms': 0.0, 'max_ms': 0.0})
+            entry['calls'] += 1
+            entry['total_ms'] += seconds * 1000
+            entry['max_ms'] = max(entry['max_ms'], seconds * 1000)
+        return {'spans': totals, 'counters': dict(sorted(self.counters.items())), 'pages': self.pages}
+
+    def write_report(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.report(), f, indent=2)
+
+    def write_trace(self, path):
+        """Chrome trace-event file (chrome://tracing, Perfetto)"""
+        pid = os.getpid()
+        events = [{'name': name, 'cat': category, 'ph': 'X', 'pid': pid, 'tid': 0,
+                   'ts': round(start * 1e6, 3), 'dur': round(seconds * 1e6, 3), 'args': attrs}
+                  for name, category, start, seconds, attrs in self.spans]
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+
+class _Span:
+    __slots__ = ('inst', 'name', 'category', 'attrs', 'start')
+
+    def __init__(self, inst, name, category, attrs):
+        self.inst, self.name, self.category, self.attrs = inst, name, category, attrs
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.inst.add_span(self.name, self.category, self.start, time.perf_counter() - self.start, self.attrs)
+
+@contextlib.contextmanager
+def instrumented(hooks=()):
+    """Record spans and counters for everything rendered inside the block"""
+    global _INSTRUMENT
+    previous = _INSTRUMENT
+    inst = _INSTRUMENT = Instrumentation(hooks)
+    try:
+        yield inst
+    finally:
+        _INSTRUMENT = previous
+
+def span(name, category='render', **attrs):
+    inst = _INSTRUMENT
+    return _NO_SPAN if inst is None else _Span(inst, name, category, attrs)
+
+def count_event(name, n=1):
+    if _INSTRUMENT is not None:
+        _INSTRUMENT.count(name, n)
+
+# ==================== DRAWING HELPERS ====================
+
+@lru_cache(maxsize=None)
+def _color(value):
+    """reportlab colour for a '#rrggbb' brand/plan colour"""
+    return colors.HexColor(value)
+
+# Encoded image XObjects, built at most once per process. Encoding the images
+# dominates render time, so batch workers keep these across documents.
+_IMAGE_XOBJECTS = {}
+
+def load_image_xobject(img_path, cache_dir=XOBJECT_CACHE_DIR):
+    """Return (name, xobject, smask) for an image file.
+
+    Encoded XObjects are kept per process and, keyed by the file's content
+    hash, on disk under cache_dir, so a fresh process re-rendering a page
+    does not have to re-encode its images.
+    """
+    entry = _IMAGE_XOBJECTS.get(img_path)
+    if entry is None:
+        # Same naming scheme as canvas.drawImage(filename, mask='auto')
+        name = pdfdoc._digester(f"{img_path}auto".encode('utf-8'))
+        cache_path = None
+        if cache_dir:
+            cache_path = os.path.join(cache_dir, f"{file_digest(img_path)}-{reportlab.Version}-{rl_config.useA85}.pickle")
+        try:
+            with span('image_load', 'image', path=os.path.basename(img_path)), open(cache_path, 'rb') as f:
+                xobj, smask = pickle.load(f)
+        except (TypeError, OSError, pickle.UnpicklingError, EOFError):
+            count_event('image_decodes')
+            with span('image_decode', 'image', path=os.path.basename(img_path)):
+                xobj = pdfdoc.PDFImageXObject(name, img_path, mask='auto')
+            smask = getattr(xobj, '_smask', None)
+            if smask is not None:
+                del xobj._smask
+            if cache_path:
+                os.makedirs(cache_dir, exist_ok=True)
+                tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+                with open(tmp_path, 'wb') as f:
+                    pickle.dump((xobj, smask), f, pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp_path, cache_path)
+        xobj.name = name
+        entry = _IMAGE_XOBJECTS[img_path] = (name, xobj, smask)
+    return entry
+
+def preload_image(c, img_path):
+    """Register the cached XObject for img_path on the canvas so drawImage reuses it"""
+    name, template, smask = load_image_xobject(img_path)
+    doc = getattr(c, '_doc', None)
+    if doc is None:
+        return  # a RecordingCanvas: the image is embedded when the list is replayed
+    reg_name = doc.getXObjectName(name)
+    if reg_name in doc.idToObject:
+        return
+    count_event('image_embeds')
+    # Registration tags objects with a per-document name, so register copies
+    xobj = copy.copy(template)
+    c._setXObjects(xobj)
+    doc.Reference(xobj, reg_name)
+    doc.addForm(name, xobj)
+    if smask is not None:
+        mask_name = doc.getXObjectName(smask.name)
+        if mask_name in doc.idToObject:
+            xobj.smask = pdfdoc.PDFObjectReference(mask_name)
+        else:
+            mask_obj = copy.copy(smask)
+            c._setXObjects(mask_obj)
+            xobj.smask = doc.Reference(mask_obj, mask_name)
+
+def _load_image_quietly(img_path):
+    with contextlib.suppress(Exception):
+        load_image_xobject(img_path)
+
+def prefetch_images(paths, workers=8):
+    """Load the XObjects for paths on a thread pool before they are drawn.
+
+    Pillow and zlib release the GIL while decoding and compressing, so a
+    page of many not-yet-cached logos decodes in parallel. Unreadable files
+    are skipped here and left to the draw helpers' fallbacks.
+    """
+    missing = [path for path in dict.fromkeys(paths) if path not in _IMAGE_XOBJECTS]
+    if len(missing) < 2:
+        return
+    with futures.ThreadPoolExecutor(max_workers=min(workers, len(missing))) as pool:
+        list(pool.map(_load_image_quietly, missing))
+
+@lru_cache(maxsize=None)
+def _image_size(img_path, mtime_ns, size):
+    with Image.open(img_path) as im:
+        return im.size
+
+def image_size(img_path):
+    """(width, height) in pixels from the file header, or None if unreadable"""
+    try:
+        st = os.stat(img_path)
+        return _image_size(img_path, st.st_mtime_ns, st.st_size)
+    except OSError:
+        return None
+
+def measure_images(paths, workers=8):
+    """image_size() for each path, reading the headers concurrently"""
+    if len(paths) < 2:
+        return [image_size(path) for path in paths]
+    with futures.ThreadPoolExecutor(max_workers=min(workers, len(paths))) as pool:
+        return list(pool.map(image_size, paths))
+
+def rounded_rect_path(p, x, y, width, height, radius):
+    """Add the outline draw_rounded_rect fills to path object p"""
     p.moveTo(x + radius, y)
     p.lineTo(x + width - radius, y)
     p.arcTo(x + width - radius, y, x + width, y + radius, 90)
@@ -50,6 +611,18 @@ def draw_rounded_rect(c, x, y, width, height, radius, fill_color=None, stroke_co
     p.lineTo(x, y + radius)
     p.arcTo(x, y, x + radius, y + radius, 180)
     p.close()
+
+def draw_rounded_rect(c, x, y, width, height, radius, fill_color=None, stroke_color=None, stroke_width=1):
+    """Draw a rounded rectangle"""
+    c.saveState()
+    if fill_color:
+        c.setFillColor(fill_color)
+    if stroke_color:
+        c.setStrokeColor(stroke_color)
+        c.setLineWidth(stroke_width)
+    
+    p = c.beginPath()
+    rounded_rect_path(p, x, y, width, height, radius)
     
     if fill_color and stroke_color:
         c.drawPath(p, fill=1, stroke=1)
@@ -70,38 +643,47 @@ def draw_circular_image(c, img_path, x, y, diameter):
     
     # Draw image
     try:
+        preload_image(c, img_path)
         c.drawImage(img_path, x, y, width=diameter, height=diameter, preserveAspectRatio=True, mask='auto')
     except:
         # Fallback if image fails
-        c.setFillColor(ACCENT_YELLOW)
+        c.setFillColor(_color(ACCENT_YELLOW))
         c.circle(x + diameter/2, y + diameter/2, diameter/2, fill=1, stroke=0)
     
     c.restoreState()
     
     # Draw border
-    c.setStrokeColor(ACCENT_YELLOW)
+    c.setStrokeColor(_color(ACCENT_YELLOW))
     c.setLineWidth(3)
     c.circle(x + diameter/2, y + diameter/2, diameter/2, fill=0, stroke=1)
 
+# Inset of a client logo inside its white card
+CLIENT_LOGO_PADDING = 5*mm
+
+def client_logo_padding(height):
+    """Logo inset for a card of this height; small cards on a crowded wall get less"""
+    return min(CLIENT_LOGO_PADDING, height / 6)
+
 def draw_client_logo(c, img_path, x, y, width, height, name):
     """Draw a client logo centered in a white card"""
     # White background card
-    c.setFillColor(WHITE)
-    draw_rounded_rect(c, x, y, width, height, 4*mm, fill_color=WHITE)
+    c.setFillColor(_color(WHITE))
+    draw_rounded_rect(c, x, y, width, height, 4*mm, fill_color=_color(WHITE))
     
     # Draw logo centered
     try:
         # Calculate padding for centering
-        padding = 5*mm
+        padding = client_logo_padding(height)
         img_width = width - 2*padding
         img_height = height - 2*padding
         
+        preload_image(c, img_path)
         c.drawImage(img_path, x + padding, y + padding, 
                    width=img_width, height=img_height, 
                    preserveAspectRatio=True, mask='auto')
     except Exception as e:
         # Fallback text if image fails
-        c.setFillColor(MID_GRAY)
+        c.setFillColor(_color(MID_GRAY))
         c.setFont("Helvetica-Bold", 9)
         c.drawCentredString(x + width/2, y + height/2 - 3*mm, name)
 
@@ -110,10 +692,10 @@ def draw_surban_logo(c, center_x, center_y, scale=1.0, dark_bg=True):
     c.saveState()
 
     # Colors matching the logo exactly
-    yellow = HexColor('#E8B829')  # Golden yellow
-    gray_face = HexColor('#9E9E9E')  # Gray for face
-    gray_handle = HexColor('#BDBDBD')  # Lighter gray for handles
-    text_color = WHITE if dark_bg else HexColor('#1a1a1a')
+    yellow = colors.HexColor('#E8B829')  # Golden yellow
+    gray_face = colors.HexColor('#9E9E9E')  # Gray for face
+    gray_handle = colors.HexColor('#BDBDBD')  # Lighter gray for handles
+    text_color = _color(WHITE) if dark_bg else colors.HexColor('#1a1a1a')
 
     s = scale
 
@@ -143,7 +725,7 @@ def draw_surban_logo(c, center_x, center_y, scale=1.0, dark_bg=True):
 
     # Folder notch on top left
     c.setFillColor(yellow)
-    c.setStrokeColor(HexColor('#1a1a1a') if dark_bg else HexColor('#333333'))
+    c.setStrokeColor(colors.HexColor('#1a1a1a') if dark_bg else colors.HexColor('#333333'))
     c.setLineWidth(1.5*s)
     # Draw a small notch line
     c.line(center_x - 30*s, center_y + 32*s, center_x - 30*s, center_y + 22*s)
@@ -169,647 +751,4808 @@ def draw_surban_logo(c, center_x, center_y, scale=1.0, dark_bg=True):
 
     c.restoreState()
 
-def create_profile_pdf(output_path):
-    c = canvas.Canvas(output_path, pagesize=A4)
-    
+# ==================== TEXT LAYOUT ====================
+#
+# Greedy line breaking over cached per-word widths. Widths are measured once
+# per (font, word) in font units and scaled to the requested size, and line
+# widths come from prefix sums, so breaking a paragraph is linear in its
+# word count. Nothing here draws: layout_text() returns line boxes.
+
+class LineBox(NamedTuple):
+    x: float            # baseline start, already offset for alignment
+    y: float            # baseline
+    width: float        # natural width of the text (before justification)
+    text: str
+    word_space: float   # extra space per inter-word gap when justified
+
+class TextLayout(NamedTuple):
+    lines: list
+    height: float       # leading * number of lines
+    overflow: bool      # True if text was cut off by max_lines
+
+@lru_cache(maxsize=65536)
+def _word_units(font, word):
+    """Width of word in 1/1000 em"""
+    return pdfmetrics.stringWidth(word, font, 1000)
+
+def _truncate(words, widths, font, max_units, ellipsis):
+    """Fit as many words as possible, then the ellipsis, within max_units"""
+    space = _word_units(font, ' ')
+    budget = max_units - _word_units(font, ellipsis)
+    used = 0.0
+    kept = []
+    for word, w in zip(words, widths):
+        extra = w + (space if kept else 0)
+        if used + extra > budget:
+            break
+        kept.append(word)
+        used += extra
+    if not kept:
+        # Not even one word fits: cut the first word down character by character
+        word = words[0]
+        used = 0.0
+        for i, ch in enumerate(word):
+            used += _word_units(font, ch)
+            if used > budget:
+                return word[:i] + ellipsis
+        return word + ellipsis
+    return ' '.join(kept) + ellipsis
+
+def layout_text(text, font, size, max_width, x=0, y=0, leading=None, align='left',
+                max_lines=None, ellipsis='...'):
+    """Break text into lines no wider than max_width.
+
+    Lines are placed from baseline y downwards, leading apart (default
+    1.2 x size). align is 'left', 'centre', 'right' or 'justify' (every
+    line but the last is stretched to max_width via word spacing). With
+    max_lines, the last kept line ends in ellipsis and overflow is set.
+    A single word wider than max_width gets a line to itself.
+    """
+    if leading is None:
+        leading = size * 1.2
+    words = text.split()
+    if not words:
+        return TextLayout([], 0, False)
+    count_event('text_layouts')
+    count_event('words_measured', len(words))
+
+    scale = size / 1000.0
+    max_units = max_width / scale
+    space = _word_units(font, ' ')
+    widths = [_word_units(font, w) for w in words]
+    prefix = [0.0]
+    for w in widths:
+        prefix.append(prefix[-1] + w)
+
+    # Greedy breaks: (start, end) word ranges
+    breaks = []
+    start = 0
+    n = len(words)
+    while start < n:
+        end = start + 1
+        while end < n and prefix[end + 1] - prefix[start] + space * (end - start) < max_units:
+            end += 1
+        breaks.append((start, end))
+        start = end
+
+    overflow = max_lines is not None and len(breaks) > max_lines
+    if overflow:
+        breaks = breaks[:max_lines]
+
+    lines = []
+    last = len(breaks) - 1
+    for i, (start, end) in enumerate(breaks):
+        if overflow and i == last:
+            line_text = _truncate(words[start:], widths[start:], font, max_units, ellipsis)
+            units = _word_units(font, line_text)
+        else:
+            line_text = ' '.join(words[start:end])
+            units = prefix[end] - prefix[start] + space * (end - start - 1)
+        width = units * scale
+        line_x = x
+        word_space = 0.0
+        if align == 'centre':
+            line_x = x + (max_width - width) / 2
+        elif align == 'right':
+            line_x = x + max_width - width
+        elif align == 'justify' and i != last and end - start > 1:
+            word_space = (max_width - width) / (end - start - 1)
+        lines.append(LineBox(line_x, y - i * leading, width, line_text, word_space))
+    return TextLayout(lines, leading * len(lines), overflow)
+
+# ==================== LAYOUT ====================
+#
+# Layout turns a ProfileContent into a render plan: a list of pages, each a
+# flat list of positioned primitives (plain tuples of numbers and strings, so
+# a plan serialises to JSON). replay_plan() draws a plan onto a canvas without
+# repeating any of the layout arithmetic.
+
+# Bump whenever the layout code changes so cached plans are invalidated
+PLAN_VERSION = 6
+
+def _hex(color):
+    if isinstance(color, str):
+        return color
+    return '#' + color.hexval()[2:]
+
+class PageBuilder:
+    """Collects the positioned primitives for one page"""
+
+    def __init__(self):
+        self.ops = []
+        # Descriptions of text blocks cut short to fit their box
+        self.overflow = []
+
+    def rect(self, x, y, w, h, fill):
+        self.ops.append(('rect', x, y, w, h, _hex(fill)))
+
+    def rounded_rect(self, x, y, w, h, radius, fill):
+        self.ops.append(('rrect', x, y, w, h, radius, _hex(fill)))
+
+    def line(self, x1, y1, x2, y2, stroke, width=1, alpha=1):
+        self.ops.append(('line', x1, y1, x2, y2, _hex(stroke), width, alpha))
+
+    def circle(self, cx, cy, r, fill):
+        self.ops.append(('circle', cx, cy, r, _hex(fill)))
+
+    def text(self, x, y, text, font, size, color, align='left', word_space=0):
+        if word_space:
+            self.ops.append(('text', x, y, text, font, size, _hex(color), align, word_space))
+        else:
+            self.ops.append(('text', x, y, text, font, size, _hex(color), align))
+
+    def centred_text(self, x, y, text, font, size, color):
+        self.text(x, y, text, font, size, color, align='centre')
+
+    def paragraph(self, x, y, text, font, size, color, max_width, leading,
+                  align='left', max_lines=None, label='text'):
+        """Lay out and place a wrapped text block; returns its TextLayout"""
+        block = layout_text(text, font, size, max_width, x, y, leading, align, max_lines)
+        for line in block.lines:
+            self.text(line.x, line.y, line.text, font, size, color, word_space=line.word_space)
+        if block.overflow:
+            self.overflow.append(f"{label}: truncated to {max_lines} line(s)")
+        return block
+
+    def logo(self, img_path, x, y, w, h, fallback_x, fallback_y, fallback_scale):
+        """Brand logo image, falling back to the vector mark if it can't be loaded"""
+        self.ops.append(('logo', img_path, x, y, w, h, fallback_x, fallback_y, fallback_scale))
+
+    def photo(self, img_path, x, y, diameter):
+        self.ops.append(('photo', img_path, x, y, diameter))
+
+    def client_logo(self, img_path, x, y, w, h, name):
+        self.ops.append(('client_logo', img_path, x, y, w, h, name))
+
+    def watermark(self, x, y, text, font, size, color, alpha, angle):
+        """Translucent text centred on (x, y), rotated angle degrees anticlockwise"""
+        self.ops.append(('watermark', x, y, text, font, size, _hex(color), alpha, angle))
+
+    def page_background(self):
+        """Full-page dark background with the brown top accent bar"""
+        self.ops.append(('chrome',))
+
+    def section_header(self, x, y, label, underline_w):
+        """Small yellow caps label with its underline bar"""
+        self.text(x, y, label, "Helvetica-Bold", 11, ACCENT_YELLOW)
+        self.rect(x, y - 3*mm, underline_w, 2*mm, ACCENT_YELLOW)
+
+def layout_cover(content):
     # ==================== PAGE 1 - HERO COVER ====================
-    
-    # Full page dark background
-    c.setFillColor(DARKER_BG)
-    c.rect(0, 0, WIDTH, HEIGHT, fill=1, stroke=0)
-    
-    # Top accent bar (brown/maroon like website header)
-    c.setFillColor(HexColor('#5d4037'))
-    c.rect(0, HEIGHT - 6*mm, WIDTH, 6*mm, fill=1, stroke=0)
-    
+    page = PageBuilder()
+    page.page_background()
+
     # Decorative diagonal lines (subtle)
-    c.setStrokeColor(ACCENT_YELLOW)
-    c.setStrokeAlpha(0.1)
-    c.setLineWidth(1)
     for i in range(8):
-        c.line(WIDTH - 100 + i*15, HEIGHT, WIDTH - 50 + i*15, HEIGHT - 150)
-    c.setStrokeAlpha(1)
-    
-    # Company Logo - use the logo image
-    logo_path = os.path.join(IMAGES_DIR, 'logo_full.png')
-    try:
-        c.drawImage(logo_path, 25*mm, HEIGHT - 95*mm, width=60*mm, height=60*mm,
-                   preserveAspectRatio=True, mask='auto')
-    except:
-        # Fallback to drawn logo
-        draw_surban_logo(c, 55*mm, HEIGHT - 55*mm, scale=1.0, dark_bg=True)
+        page.line(WIDTH - 100 + i*15, HEIGHT, WIDTH - 50 + i*15, HEIGHT - 150, ACCENT_YELLOW, 1, 0.1)
 
-    # Tagline
-    c.setFillColor(MID_GRAY)
-    c.setFont("Helvetica-Oblique", 12)
-    c.drawString(30*mm, HEIGHT - 105*mm, "From Queries to Solutions")
-    
-    # Yellow accent line
-    c.setFillColor(ACCENT_YELLOW)
-    c.rect(30*mm, HEIGHT - 112*mm, 50*mm, 2*mm, fill=1, stroke=0)
+    # Company Logo - falls back to the drawn logo
+    page.logo(os.path.join(IMAGES_DIR, 'logo_full.png'), 25*mm, HEIGHT - 95*mm, 60*mm, 60*mm,
+              55*mm, HEIGHT - 55*mm, 1.0)
+
+    # Tagline and yellow accent line
+    page.text(30*mm, HEIGHT - 105*mm, content.tagline, "Helvetica-Oblique", 12, MID_GRAY)
+    page.rect(30*mm, HEIGHT - 112*mm, 50*mm, 2*mm, ACCENT_YELLOW)
 
     # Main Title
-    c.setFillColor(WHITE)
-    c.setFont("Helvetica-Bold", 42)
-    c.drawString(30*mm, HEIGHT - 145*mm, "BUSINESS")
-    c.drawString(30*mm, HEIGHT - 163*mm, "PROFILE")
-    
-    # Year badge - Updated to 2026
-    c.setFillColor(ACCENT_YELLOW)
-    draw_rounded_rect(c, 30*mm, HEIGHT - 185*mm, 35*mm, 14*mm, 4*mm, fill_color=ACCENT_YELLOW)
-    c.setFillColor(DARK_BG)
-    c.setFont("Helvetica-Bold", 16)
-    c.drawCentredString(47.5*mm, HEIGHT - 180*mm, "2026")
-    
+    page.text(30*mm, HEIGHT - 145*mm, "BUSINESS", "Helvetica-Bold", 42, WHITE)
+    page.text(30*mm, HEIGHT - 163*mm, "PROFILE", "Helvetica-Bold", 42, WHITE)
+
+    # Year badge
+    page.rounded_rect(30*mm, HEIGHT - 185*mm, 35*mm, 14*mm, 4*mm, ACCENT_YELLOW)
+    page.centred_text(47.5*mm, HEIGHT - 180*mm, content.year, "Helvetica-Bold", 16, DARK_BG)
+
     # PAN India Services tag
-    c.setFillColor(CARD_BG)
-    draw_rounded_rect(c, WIDTH - 80*mm, HEIGHT - 95*mm, 50*mm, 10*mm, 3*mm, fill_color=CARD_BG)
-    c.setFillColor(ACCENT_YELLOW)
-    c.setFont("Helvetica-Bold", 10)
-    c.drawCentredString(WIDTH - 55*mm, HEIGHT - 91*mm, "PAN India Services")
-    
+    page.rounded_rect(WIDTH - 80*mm, HEIGHT - 95*mm, 50*mm, 10*mm, 3*mm, CARD_BG)
+    page.centred_text(WIDTH - 55*mm, HEIGHT - 91*mm, content.coverage_tag, "Helvetica-Bold", 10, ACCENT_YELLOW)
+
     # Stats boxes at bottom
-    stats = [
-        ("8+", "Years", "Experience"),
-        ("30+", "Projects", "Completed"),
-        ("15+", "Happy", "Clients"),
-        ("PAN", "India", "Coverage")
-    ]
-    
     box_width = 38*mm
     box_height = 42*mm
     start_x = 18*mm
     y_pos = 22*mm
-    
-    for i, (number, label1, label2) in enumerate(stats):
+
+    for i, (number, label1, label2) in enumerate(content.stats):
         x = start_x + i * (box_width + 6*mm)
-        
-        # Box background
-        c.setFillColor(CARD_BG)
-        draw_rounded_rect(c, x, y_pos, box_width, box_height, 5*mm, fill_color=CARD_BG)
-        
-        # Yellow accent on top
-        c.setFillColor(ACCENT_YELLOW)
-        c.rect(x + 8*mm, y_pos + box_height - 3*mm, 22*mm, 3*mm, fill=1, stroke=0)
-        
-        # Number
-        c.setFillColor(ACCENT_YELLOW)
-        c.setFont("Helvetica-Bold", 28)
-        c.drawCentredString(x + box_width/2, y_pos + 22*mm, number)
-        
-        # Label
-        c.setFillColor(WHITE)
-        c.setFont("Helvetica", 10)
-        c.drawCentredString(x + box_width/2, y_pos + 12*mm, label1)
-        c.setFillColor(MID_GRAY)
-        c.setFont("Helvetica", 9)
-        c.drawCentredString(x + box_width/2, y_pos + 5*mm, label2)
-    
-    c.showPage()
-    
+        page.rounded_rect(x, y_pos, box_width, box_height, 5*mm, CARD_BG)
+        page.rect(x + 8*mm, y_pos + box_height - 3*mm, 22*mm, 3*mm, ACCENT_YELLOW)
+        page.centred_text(x + box_width/2, y_pos + 22*mm, number, "Helvetica-Bold", 28, ACCENT_YELLOW)
+        page.centred_text(x + box_width/2, y_pos + 12*mm, label1, "Helvetica", 10, WHITE)
+        page.centred_text(x + box_width/2, y_pos + 5*mm, label2, "Helvetica", 9, MID_GRAY)
+
+    return page
+
+def layout_about(content):
     # ==================== PAGE 2 - ABOUT US ====================
-    
-    # Dark background
-    c.setFillColor(DARKER_BG)
-    c.rect(0, 0, WIDTH, HEIGHT, fill=1, stroke=0)
-    
-    # Top accent bar
-    c.setFillColor(HexColor('#5d4037'))
-    c.rect(0, HEIGHT - 6*mm, WIDTH, 6*mm, fill=1, stroke=0)
-    
-    # Section header
-    c.setFillColor(ACCENT_YELLOW)
-    c.setFont("Helvetica-Bold", 11)
-    c.drawString(30*mm, HEIGHT - 25*mm, "ABOUT US")
-    
-    # Yellow underline
-    c.rect(30*mm, HEIGHT - 28*mm, 25*mm, 2*mm, fill=1, stroke=0)
-    
+    page = PageBuilder()
+    page.page_background()
+
+    page.section_header(30*mm, HEIGHT - 25*mm, "ABOUT US", 25*mm)
+
     # Main title
-    c.setFillColor(WHITE)
-    c.setFont("Helvetica-Bold", 26)
-    c.drawString(30*mm, HEIGHT - 48*mm, "Building Excellence")
-    c.drawString(30*mm, HEIGHT - 60*mm, "Through Expertise")
-    
-    # About text
+    for i, title_line in enumerate(content.about_title):
+        page.text(30*mm, HEIGHT - 48*mm - i*12*mm, title_line, "Helvetica-Bold", 26, WHITE)
+
+    # About text, kept clear of the core values header
     y_cursor = HEIGHT - 80*mm
-    
-    about_paragraphs = [
-        "S-Urban Consultancy is an emerging Project Management Company driven by a robust workforce of Project Managers, Team Leaders, Engineers, and multi-skilled technical resources.",
-        "At S-Urban, our governing principle is to maintain equality, diversity, and integrity in each project. We provide One Stop for Project Management Services with commitment to on-time delivery within budget.",
-        "We specialize in managing Big Industrial Projects including RCC Buildings, PEB Sheds, Outside Developments, RCC Roads, Drainage, High-Rise Towers, Commercial Complexes, and Villas across South Gujarat, Daman & Diu, and Dadra & Nagar Haveli."
-    ]
-    
-    c.setFillColor(LIGHT_GRAY)
-    c.setFont("Helvetica", 11)
-    
-    for para in about_paragraphs:
-        words = para.split()
-        line = ""
-        for word in words:
-            test_line = line + " " + word if line else word
-            if c.stringWidth(test_line, "Helvetica", 11) < 150*mm:
-                line = test_line
-            else:
-                c.drawString(30*mm, y_cursor, line)
-                y_cursor -= 6*mm
-                line = word
-        if line:
-            c.drawString(30*mm, y_cursor, line)
-            y_cursor -= 6*mm
-        y_cursor -= 6*mm
-    
+    for i, para in enumerate(content.about_paragraphs):
+        room = int((y_cursor - 106*mm) // (6*mm)) + 1
+        if room < 1:
+            page.overflow.append(f"about paragraph {i + 1}: no room left")
+            break
+        block = page.paragraph(30*mm, y_cursor, para, "Helvetica", 11, LIGHT_GRAY, 150*mm, 6*mm,
+                               max_lines=room, label=f"about paragraph {i + 1}")
+        y_cursor -= block.height + 6*mm
+
     # Core Values section
     y_cursor = 90*mm
-    
-    c.setFillColor(ACCENT_YELLOW)
-    c.setFont("Helvetica-Bold", 11)
-    c.drawString(30*mm, y_cursor + 10*mm, "CORE VALUES")
-    c.rect(30*mm, y_cursor + 7*mm, 25*mm, 2*mm, fill=1, stroke=0)
-    
-    values = [
-        ("Efficient Delivery", "On-time completion within budget"),
-        ("Quality Focus", "Precision in every detail"),
-        ("Client First", "Complete satisfaction guaranteed"),
-        ("Innovation", "Advanced methods & technology")
-    ]
-    
+    page.section_header(30*mm, y_cursor + 10*mm, "CORE VALUES", 25*mm)
+
     box_w = 75*mm
     box_h = 28*mm
-    
-    for i, (title, desc) in enumerate(values):
+
+    for i, (title, desc) in enumerate(content.core_values):
         x = 25*mm + (i % 2) * (box_w + 8*mm)
         y = y_cursor - 10*mm - (i // 2) * (box_h + 8*mm)
-        
-        # Card background
-        c.setFillColor(CARD_BG)
-        draw_rounded_rect(c, x, y - box_h, box_w, box_h, 4*mm, fill_color=CARD_BG)
-        
-        # Left yellow accent
-        c.setFillColor(ACCENT_YELLOW)
-        c.rect(x, y - box_h + 5*mm, 3*mm, box_h - 10*mm, fill=1, stroke=0)
-        
-        # Title
-        c.setFillColor(WHITE)
-        c.setFont("Helvetica-Bold", 12)
-        c.drawString(x + 8*mm, y - 10*mm, title)
-        
-        # Description
-        c.setFillColor(MID_GRAY)
-        c.setFont("Helvetica", 10)
-        c.drawString(x + 8*mm, y - 20*mm, desc)
-    
-    c.showPage()
-    
+
+        page.rounded_rect(x, y - box_h, box_w, box_h, 4*mm, CARD_BG)
+        page.rect(x, y - box_h + 5*mm, 3*mm, box_h - 10*mm, ACCENT_YELLOW)
+        page.text(x + 8*mm, y - 10*mm, title, "Helvetica-Bold", 12, WHITE)
+        page.text(x + 8*mm, y - 20*mm, desc, "Helvetica", 10, MID_GRAY)
+
+    return page
+
+def layout_services(content):
     # ==================== PAGE 3 - SERVICES ====================
-    
-    # Dark background
-    c.setFillColor(DARKER_BG)
-    c.rect(0, 0, WIDTH, HEIGHT, fill=1, stroke=0)
-    
-    # Top accent
-    c.setFillColor(HexColor('#5d4037'))
-    c.rect(0, HEIGHT - 6*mm, WIDTH, 6*mm, fill=1, stroke=0)
-    
-    # Header
-    c.setFillColor(ACCENT_YELLOW)
-    c.setFont("Helvetica-Bold", 11)
-    c.drawString(30*mm, HEIGHT - 22*mm, "AREA OF EXPERTISE")
-    c.rect(30*mm, HEIGHT - 25*mm, 35*mm, 2*mm, fill=1, stroke=0)
-    
-    c.setFillColor(WHITE)
-    c.setFont("Helvetica-Bold", 26)
-    c.drawString(30*mm, HEIGHT - 42*mm, "Our Services")
-    
-    c.setFillColor(MID_GRAY)
-    c.setFont("Helvetica", 12)
-    c.drawString(30*mm, HEIGHT - 52*mm, "Comprehensive project management solutions")
-    
+    page = PageBuilder()
+    page.page_background()
+
+    page.section_header(30*mm, HEIGHT - 22*mm, "AREA OF EXPERTISE", 35*mm)
+    page.text(30*mm, HEIGHT - 42*mm, "Our Services", "Helvetica-Bold", 26, WHITE)
+    page.text(30*mm, HEIGHT - 52*mm, content.services_subtitle, "Helvetica", 12, MID_GRAY)
+
     # Services grid
-    services = [
-        ("01", "Project Consultancy", [
-            "Client objectives & constraints",
-            "Strategic planning process",
-            "Engineering deliverables",
-            "Value engineering solutions"
-        ]),
-        ("02", "Project Management", [
-            "Document control procedure",
-            "Design deliverables",
-            "Cost module & parameters",
-            "Migration strategy"
-        ]),
-        ("03", "Planning Services", [
-            "Planning packages",
-            "Weekly/monthly reporting",
-            "What-if analysis",
-            "Recovery programs"
-        ]),
-        ("04", "Claim & Dispute", [
-            "Site work survey",
-            "Agreement analysis",
-            "Mutual settlements",
-            "Legal support"
-        ]),
-        ("05", "Risk Management", [
-            "Risk identification",
-            "Risk assessment",
-            "Response planning",
-            "Monitor & control"
-        ]),
-        ("06", "Quality Assurance", [
-            "Quality control",
-            "Performance verification",
-            "Contract management",
-            "Best practices audit"
-        ])
-    ]
-    
     card_w = 80*mm
     card_h = 58*mm
     start_x = 17*mm
     start_y = HEIGHT - 70*mm
-    
-    for i, (num, title, bullets) in enumerate(services):
+
+    for i, (num, title, bullets) in enumerate(content.services):
         col = i % 2
         row = i // 2
-        
+
         x = start_x + col * (card_w + 8*mm)
         y = start_y - row * (card_h + 6*mm)
-        
-        # Card background
-        c.setFillColor(CARD_BG)
-        draw_rounded_rect(c, x, y - card_h, card_w, card_h, 5*mm, fill_color=CARD_BG)
-        
+
+        page.rounded_rect(x, y - card_h, card_w, card_h, 5*mm, CARD_BG)
+
         # Number badge
-        c.setFillColor(ACCENT_YELLOW)
-        draw_rounded_rect(c, x + 6*mm, y - 14*mm, 14*mm, 10*mm, 2*mm, fill_color=ACCENT_YELLOW)
-        c.setFillColor(DARK_BG)
-        c.setFont("Helvetica-Bold", 12)
-        c.drawCentredString(x + 13*mm, y - 10*mm, num)
-        
-        # Title
-        c.setFillColor(WHITE)
-        c.setFont("Helvetica-Bold", 13)
-        c.drawString(x + 24*mm, y - 11*mm, title)
-        
-        # Bullets
-        c.setFont("Helvetica", 9)
+        page.rounded_rect(x + 6*mm, y - 14*mm, 14*mm, 10*mm, 2*mm, ACCENT_YELLOW)
+        page.centred_text(x + 13*mm, y - 10*mm, num, "Helvetica-Bold", 12, DARK_BG)
+
+        page.text(x + 24*mm, y - 11*mm, title, "Helvetica-Bold", 13, WHITE)
+
         for j, bullet in enumerate(bullets):
-            c.setFillColor(ACCENT_YELLOW)
-            c.circle(x + 10*mm, y - 24*mm - j*8*mm, 1.5*mm, fill=1, stroke=0)
-            c.setFillColor(LIGHT_GRAY)
-            c.drawString(x + 14*mm, y - 26*mm - j*8*mm, bullet)
-    
-    c.showPage()
-    
+            page.circle(x + 10*mm, y - 24*mm - j*8*mm, 1.5*mm, ACCENT_YELLOW)
+            page.text(x + 14*mm, y - 26*mm - j*8*mm, bullet, "Helvetica", 9, LIGHT_GRAY)
+
+    return page
+
+def layout_lifecycle(content):
     # ==================== PAGE 4 - PROJECT LIFECYCLE ====================
-    
-    # Dark background
-    c.setFillColor(DARKER_BG)
-    c.rect(0, 0, WIDTH, HEIGHT, fill=1, stroke=0)
-    
-    # Top accent
-    c.setFillColor(HexColor('#5d4037'))
-    c.rect(0, HEIGHT - 6*mm, WIDTH, 6*mm, fill=1, stroke=0)
-    
-    # Header
-    c.setFillColor(ACCENT_YELLOW)
-    c.setFont("Helvetica-Bold", 11)
-    c.drawString(30*mm, HEIGHT - 22*mm, "OUR PROCESS")
-    c.rect(30*mm, HEIGHT - 25*mm, 25*mm, 2*mm, fill=1, stroke=0)
-    
-    c.setFillColor(WHITE)
-    c.setFont("Helvetica-Bold", 26)
-    c.drawString(30*mm, HEIGHT - 42*mm, "Project Lifecycle")
-    
-    c.setFillColor(MID_GRAY)
-    c.setFont("Helvetica", 12)
-    c.drawString(30*mm, HEIGHT - 52*mm, "S-Urban adds value throughout the complete lifecycle")
-    
+    page = PageBuilder()
+    page.page_background()
+
+    page.section_header(30*mm, HEIGHT - 22*mm, "OUR PROCESS", 25*mm)
+    page.text(30*mm, HEIGHT - 42*mm, "Project Lifecycle", "Helvetica-Bold", 26, WHITE)
+    page.text(30*mm, HEIGHT - 52*mm, content.lifecycle_subtitle, "Helvetica", 12, MID_GRAY)
+
     # Timeline visualization
-    phases = [
-        ("01", "CONCEPT", "Identify needs,", "feasibility, master plans"),
-        ("02", "PLANNING", "Architectural plans,", "BOQ, scheduling"),
-        ("03", "EXECUTION", "Working drawings,", "contractor management"),
-        ("04", "MONITORING", "Quality control,", "performance check"),
-        ("05", "CLOSING", "Final reviews,", "handover, docs")
-    ]
-    
     timeline_y = HEIGHT - 100*mm
     phase_width = 32*mm
-    
-    # Draw connecting line
-    c.setStrokeColor(ACCENT_YELLOW)
-    c.setLineWidth(3)
-    c.line(28*mm, timeline_y, WIDTH - 28*mm, timeline_y)
-    
-    for i, (num, title, desc1, desc2) in enumerate(phases):
+
+    page.line(28*mm, timeline_y, WIDTH - 28*mm, timeline_y, ACCENT_YELLOW, 3)
+
+    for i, (num, title, desc1, desc2) in enumerate(content.phases):
         x = 22*mm + i * phase_width
-        
-        # Circle node
-        c.setFillColor(ACCENT_YELLOW)
-        c.circle(x + 14*mm, timeline_y, 10*mm, fill=1, stroke=0)
-        
-        # Number in circle
-        c.setFillColor(DARK_BG)
-        c.setFont("Helvetica-Bold", 12)
-        c.drawCentredString(x + 14*mm, timeline_y - 3*mm, num)
-        
-        # Phase title
-        c.setFillColor(WHITE)
-        c.setFont("Helvetica-Bold", 10)
-        c.drawCentredString(x + 14*mm, timeline_y - 18*mm, title)
-        
-        # Description
-        c.setFillColor(MID_GRAY)
-        c.setFont("Helvetica", 8)
-        c.drawCentredString(x + 14*mm, timeline_y - 28*mm, desc1)
-        c.drawCentredString(x + 14*mm, timeline_y - 35*mm, desc2)
-    
+
+        page.circle(x + 14*mm, timeline_y, 10*mm, ACCENT_YELLOW)
+        page.centred_text(x + 14*mm, timeline_y - 3*mm, num, "Helvetica-Bold", 12, DARK_BG)
+        page.centred_text(x + 14*mm, timeline_y - 18*mm, title, "Helvetica-Bold", 10, WHITE)
+        page.centred_text(x + 14*mm, timeline_y - 28*mm, desc1, "Helvetica", 8, MID_GRAY)
+        page.centred_text(x + 14*mm, timeline_y - 35*mm, desc2, "Helvetica", 8, MID_GRAY)
+
     # Why Choose Us section
     y_cursor = HEIGHT - 165*mm
 
-    c.setFillColor(ACCENT_YELLOW)
-    c.setFont("Helvetica-Bold", 11)
-    c.drawString(30*mm, y_cursor, "WHY CHOOSE US")
-    c.rect(30*mm, y_cursor - 3*mm, 30*mm, 2*mm, fill=1, stroke=0)
-
-    c.setFillColor(WHITE)
-    c.setFont("Helvetica-Bold", 22)
-    c.drawString(30*mm, y_cursor - 18*mm, "What Sets Us Apart")
+    page.section_header(30*mm, y_cursor, "WHY CHOOSE US", 30*mm)
+    page.text(30*mm, y_cursor - 18*mm, "What Sets Us Apart", "Helvetica-Bold", 22, WHITE)
 
     y_cursor -= 35*mm
 
-    reasons = [
-        ("01", "We Are Creative", "Advanced technology and innovative methods developed through extensive project experience."),
-        ("02", "Honest & Dependable", "Highly trained teams selected specifically for each client, solving problems creatively."),
-        ("03", "Quality & Time", "Delivering quality work within the given time frame with full commitment."),
-        ("04", "Always Improving", "Meeting today's needs without jeopardizing the world of tomorrow.")
-    ]
-
-    for i, (num, title, desc) in enumerate(reasons):
+    for i, (num, title, desc) in enumerate(content.reasons):
         y_box = y_cursor - i * 25*mm
-        
-        # Number badge
-        c.setFillColor(ACCENT_YELLOW)
-        draw_rounded_rect(c, 30*mm, y_box - 8*mm, 14*mm, 14*mm, 3*mm, fill_color=ACCENT_YELLOW)
-        
-        c.setFillColor(DARK_BG)
-        c.setFont("Helvetica-Bold", 12)
-        c.drawCentredString(37*mm, y_box - 3*mm, num)
-        
-        # Title
-        c.setFillColor(WHITE)
-        c.setFont("Helvetica-Bold", 13)
-        c.drawString(50*mm, y_box, title)
-        
-        # Description
-        c.setFillColor(MID_GRAY)
-        c.setFont("Helvetica", 10)
-        # Wrap text
-        words = desc.split()
-        line = ""
-        y_text = y_box - 12*mm
-        for word in words:
-            test = line + " " + word if line else word
-            if c.stringWidth(test, "Helvetica", 10) < 125*mm:
-                line = test
-            else:
-                c.drawString(50*mm, y_text, line)
-                y_text -= 5*mm
-                line = word
-        if line:
-            c.drawString(50*mm, y_text, line)
-    
-    c.showPage()
-    
+
+        page.rounded_rect(30*mm, y_box - 8*mm, 14*mm, 14*mm, 3*mm, ACCENT_YELLOW)
+        page.centred_text(37*mm, y_box - 3*mm, num, "Helvetica-Bold", 12, DARK_BG)
+        page.text(50*mm, y_box, title, "Helvetica-Bold", 13, WHITE)
+
+        page.paragraph(50*mm, y_box - 12*mm, desc, "Helvetica", 10, MID_GRAY, 125*mm, 5*mm,
+                       max_lines=2, label=f"reason {num}")
+
+    return page
+
+# Project card grid: cards per row, card height, gap, and the grid area on
+# the first portfolio page and on the pages it flows onto
+PORTFOLIO_GRID_COLUMNS = 3
+PORTFOLIO_CARD_H = 32*mm
+PORTFOLIO_CARD_GAP = 5*mm
+PORTFOLIO_GRID_TOP = HEIGHT - 80*mm
+PORTFOLIO_GRID_MORE_TOP = HEIGHT - 58*mm
+PORTFOLIO_GRID_BOTTOM = 20*mm
+
+def _fit_line(page, x, y, text, font, size, color, width):
+    """Place text cut to one line of width; returns True if it was cut"""
+    block = layout_text(text, font, size, width, x, y, max_lines=1)
+    for line in block.lines:
+        page.text(line.x, line.y, line.text, font, size, color)
+    return block.overflow
+
+def _project_card(page, project, x, y, w):
+    """Draw one project card hanging from y; returns how many of its lines were cut short"""
+    h = PORTFOLIO_CARD_H
+    page.rounded_rect(x, y - h, w, h, 3*mm, CARD_BG)
+    page.rect(x, y - h + 5*mm, 2*mm, h - 10*mm, ACCENT_YELLOW)
+    text_w = w - 10*mm
+    cut = _fit_line(page, x + 6*mm, y - 7*mm, project.category.upper(), "Helvetica-Bold", 7, ACCENT_YELLOW, text_w)
+    name = layout_text(project.name, "Helvetica-Bold", 10, text_w, x + 6*mm, y - 13*mm, 4.5*mm, max_lines=2)
+    for line in name.lines:
+        page.text(line.x, line.y, line.text, "Helvetica-Bold", 10, WHITE)
+    place = ' | '.join(str(part) for part in (project.location, project.year) if part)
+    cut += name.overflow
+    cut += _fit_line(page, x + 6*mm, y - h + 9*mm, place, "Helvetica", 8, MID_GRAY, text_w)
+    cut += _fit_line(page, x + 6*mm, y - h + 4*mm, project.client, "Helvetica", 8, LIGHT_GRAY, text_w)
+    return cut
+
+def layout_portfolio(content):
+    # ==================== PORTFOLIO (flows over as many pages as needed) ====================
+    # A generator: each page is laid out only once the one before it is taken
+    if not content.portfolio:
+        return
+    stats = portfolio_stats(content.portfolio)
+    if not stats.projects:
+        return
+    page = PageBuilder()
+    page.page_background()
+
+    page.section_header(30*mm, HEIGHT - 22*mm, "PORTFOLIO", 25*mm)
+    page.text(30*mm, HEIGHT - 42*mm, "Our Projects", "Helvetica-Bold", 26, WHITE)
+    subtitle = content.portfolio_subtitle.format(**{name: getattr(stats, name) for name in PORTFOLIO_SUBTITLE_FIELDS})
+    page.text(30*mm, HEIGHT - 52*mm, subtitle, "Helvetica", 12, MID_GRAY)
+
+    # Project count per category, largest first, as many chips as fit the line
+    chip_x = 30*mm
+    for category, count in stats.categories:
+        number = f"{count:,}"
+        number_w = pdfmetrics.stringWidth(number, "Helvetica-Bold", 9)
+        chip_w = number_w + pdfmetrics.stringWidth(category, "Helvetica", 9) + 10*mm
+        if chip_x + chip_w > WIDTH - 20*mm:
+            break
+        page.rounded_rect(chip_x, HEIGHT - 69*mm, chip_w, 8*mm, 2*mm, CARD_BG)
+        page.text(chip_x + 4*mm, HEIGHT - 66*mm, number, "Helvetica-Bold", 9, ACCENT_YELLOW)
+        page.text(chip_x + 6*mm + number_w, HEIGHT - 66*mm, category, "Helvetica", 9, WHITE)
+        chip_x += chip_w + 3*mm
+
+    # Cards stream from the database in rows; a row that would cross the
+    # bottom margin starts a continuation page
+    cols = PORTFOLIO_GRID_COLUMNS
+    card_w = (WIDTH - 40*mm - (cols - 1) * PORTFOLIO_CARD_GAP) / cols
+    y, col, cut = PORTFOLIO_GRID_TOP, 0, 0
+    for project in iter_projects(content.portfolio):
+        if col == cols:
+            y, col = y - PORTFOLIO_CARD_H - PORTFOLIO_CARD_GAP, 0
+        if col == 0 and y - PORTFOLIO_CARD_H < PORTFOLIO_GRID_BOTTOM:
+            yield page
+            page = PageBuilder()
+            page.page_background()
+            page.section_header(30*mm, HEIGHT - 22*mm, "PORTFOLIO", 25*mm)
+            page.text(30*mm, HEIGHT - 42*mm, "Our Projects", "Helvetica-Bold", 26, WHITE)
+            y = PORTFOLIO_GRID_MORE_TOP
+        cut += _project_card(page, project, 20*mm + col * (card_w + PORTFOLIO_CARD_GAP), y, card_w)
+        col += 1
+    if cut:
+        page.overflow.append(f"portfolio: {cut} project card line(s) truncated")
+    yield page
+
+# Card heights tried for the client wall, largest first; the smallest one is
+# used (flowing onto extra pages) when even it cannot fit the space on page 5
+CLIENT_ROW_HEIGHTS = (30*mm, 24*mm, 18*mm, 14*mm)
+# Most a short row's cards are widened to fill the line
+CLIENT_ROW_MAX_STRETCH = 1.5
+# Logo wall area on continuation pages
+CLIENT_WALL_MORE_TOP = HEIGHT - 58*mm
+CLIENT_WALL_MORE_BOTTOM = 20*mm
+
+def _logo_card_width(size, height):
+    """Natural width of a card height tall that shows a logo of size (w, h) px"""
+    padding = client_logo_padding(height)
+    aspect = size[0] / size[1] if size else 0
+    return min(max(aspect * (height - 2*padding) + 2*padding, 1.25*height), 3.5*height)
+
+def pack_rows(widths, row_width, gap):
+    """Split card widths into as few rows as fit row_width, then as evenly filled as possible.
+
+    A small dynamic programme over (rows, summed squared slack); a row only
+    ever holds a handful of cards, so this is linear in the number of cards.
+    Returns a list of rows, each a list of indices into widths.
+    """
+    n = len(widths)
+    best = [(0, 0.0)] + [(math.inf, math.inf)] * n
+    start = [0] * (n + 1)
+    for end in range(1, n + 1):
+        used = -gap
+        for begin in range(end - 1, -1, -1):
+            used += widths[begin] + gap
+            if used > row_width and begin < end - 1:
+                break
+            rows, slack = best[begin]
+            cost = (rows + 1, slack + (row_width - used) ** 2)
+            if cost < best[end]:
+                best[end], start[end] = cost, begin
+    rows = []
+    while n:
+        rows.append(list(range(start[n], n)))
+        n = start[n]
+    return rows[::-1]
+
+def layout_logo_wall(sizes, x, width, top, bottom):
+    """Place one card per logo size (None for unreadable) in justified rows.
+
+    The first page's wall spans top..bottom; the largest CLIENT_ROW_HEIGHTS
+    entry that fits it is used. Rows that still don't fit go to
+    continuation pages. Returns (page offset, x, y, w, h, index) per card.
+    """
+    for height in CLIENT_ROW_HEIGHTS:
+        gap = height / 3
+        widths = [_logo_card_width(size, height) for size in sizes]
+        rows = pack_rows(widths, width, gap)
+        if len(rows) * (height + gap) - gap <= top - bottom:
+            break
+    placed = []
+    page_no, y = 0, top
+    for row in rows:
+        if y - height < bottom:
+            page_no, y, bottom = page_no + 1, CLIENT_WALL_MORE_TOP, CLIENT_WALL_MORE_BOTTOM
+        natural = sum(widths[i] for i in row)
+        stretch = min((width - gap * (len(row) - 1)) / natural, CLIENT_ROW_MAX_STRETCH)
+        cx = x + (width - natural * stretch - gap * (len(row) - 1)) / 2
+        for i in row:
+            placed.append((page_no, cx, y - height, widths[i] * stretch, height, i))
+            cx += widths[i] * stretch + gap
+        y -= height + gap
+    return placed
+
+def layout_clients(content):
     # ==================== PAGE 5 - CLIENTS ====================
-    
-    # Dark background
-    c.setFillColor(DARKER_BG)
-    c.rect(0, 0, WIDTH, HEIGHT, fill=1, stroke=0)
-    
-    # Top accent
-    c.setFillColor(HexColor('#5d4037'))
-    c.rect(0, HEIGHT - 6*mm, WIDTH, 6*mm, fill=1, stroke=0)
-    
-    # Header
-    c.setFillColor(ACCENT_YELLOW)
-    c.setFont("Helvetica-Bold", 11)
-    c.drawString(30*mm, HEIGHT - 22*mm, "TRUSTED BY")
-    c.rect(30*mm, HEIGHT - 25*mm, 25*mm, 2*mm, fill=1, stroke=0)
-    
-    c.setFillColor(WHITE)
-    c.setFont("Helvetica-Bold", 26)
-    c.drawString(30*mm, HEIGHT - 42*mm, "Our Clients")
-    
-    c.setFillColor(MID_GRAY)
-    c.setFont("Helvetica", 12)
-    c.drawString(30*mm, HEIGHT - 52*mm, "Partnering with leading organizations across India")
-    
-    # Client logos - 6 clients + "more" indicator
-    clients = [
-        (os.path.join(IMAGES_DIR, "param-infraspace.jpeg"), "PARAM Infraspace"),
-        (os.path.join(IMAGES_DIR, "elleys.jpeg"), "Elleys"),
-        (os.path.join(IMAGES_DIR, "v-trans.jpeg"), "V-Trans"),
-        (os.path.join(IMAGES_DIR, "gamma-consultants.jpeg"), "1.5 Gamma Consultants"),
-        (os.path.join(IMAGES_DIR, "loparex.jpeg"), "Loparex"),
-        (os.path.join(IMAGES_DIR, "aadhar-equipments.jpeg"), "Aadhar Equipments")
-    ]
-
-    # Grid layout: 3 columns x 3 rows (6 logos + 1 "more" card)
-    logo_w = 50*mm
-    logo_h = 30*mm
-    margin_x = 20*mm
-    gap_x = 12*mm
-    gap_y = 10*mm
-    start_y = HEIGHT - 68*mm
-
-    for i, (img_path, name) in enumerate(clients):
-        col = i % 3
-        row = i // 3
-
-        x = margin_x + col * (logo_w + gap_x)
-        y = start_y - row * (logo_h + gap_y)
-
-        draw_client_logo(c, img_path, x, y - logo_h, logo_w, logo_h, name)
+    page = PageBuilder()
+    page.page_background()
+
+    page.section_header(30*mm, HEIGHT - 22*mm, "TRUSTED BY", 25*mm)
+    page.text(30*mm, HEIGHT - 42*mm, "Our Clients", "Helvetica-Bold", 26, WHITE)
+    page.text(30*mm, HEIGHT - 52*mm, content.clients_subtitle, "Helvetica", 12, MID_GRAY)
+
+    # Logo wall between the subtitle and the founder section; rows that
+    # don't fit continue on extra pages placed after this one
+    pages = [page]
+    logos = [(os.path.join(IMAGES_DIR, img), name) for img, name in content.clients]
+    wall = layout_logo_wall(measure_images([path for path, _ in logos]), 20*mm, WIDTH - 40*mm,
+                            HEIGHT - 68*mm, HEIGHT - 142*mm)
+    for page_no, x, y, w, h, i in wall:
+        while page_no >= len(pages):
+            more = PageBuilder()
+            more.page_background()
+            more.section_header(30*mm, HEIGHT - 22*mm, "TRUSTED BY", 25*mm)
+            more.text(30*mm, HEIGHT - 42*mm, "Our Clients", "Helvetica-Bold", 26, WHITE)
+            pages.append(more)
+        pages[page_no].client_logo(logos[i][0], x, y, w, h, logos[i][1])
 
     # ==================== FOUNDER SECTION ====================
 
     founder_y = HEIGHT - 160*mm
-    
-    c.setFillColor(ACCENT_YELLOW)
-    c.setFont("Helvetica-Bold", 11)
-    c.drawString(30*mm, founder_y, "LEADERSHIP")
-    c.rect(30*mm, founder_y - 3*mm, 25*mm, 2*mm, fill=1, stroke=0)
-    
-    c.setFillColor(WHITE)
-    c.setFont("Helvetica-Bold", 22)
-    c.drawString(30*mm, founder_y - 18*mm, "Meet Our Founder")
-    
+
+    page.section_header(30*mm, founder_y, "LEADERSHIP", 25*mm)
+    page.text(30*mm, founder_y - 18*mm, "Meet Our Founder", "Helvetica-Bold", 22, WHITE)
+
     # Founder card
     card_y = founder_y - 35*mm
     card_h = 80*mm
-    
-    c.setFillColor(CARD_BG)
-    draw_rounded_rect(c, 25*mm, card_y - card_h, WIDTH - 50*mm, card_h, 6*mm, fill_color=CARD_BG)
-    
+
+    page.rounded_rect(25*mm, card_y - card_h, WIDTH - 50*mm, card_h, 6*mm, CARD_BG)
+
     # Founder photo (circular)
-    photo_diameter = 50*mm
-    photo_x = 35*mm
-    photo_y = card_y - card_h + 15*mm
-    
-    draw_circular_image(c, os.path.join(IMAGES_DIR, 'founder.jpeg'), photo_x, photo_y, photo_diameter)
-    
+    page.photo(os.path.join(IMAGES_DIR, content.founder_photo), 35*mm, card_y - card_h + 15*mm, 50*mm)
+
     # Founder details
-    c.setFillColor(WHITE)
-    c.setFont("Helvetica-Bold", 18)
-    c.drawString(95*mm, card_y - 18*mm, "Suryakesh Kumar Singh")
-    
-    c.setFillColor(ACCENT_YELLOW)
-    c.setFont("Helvetica-Bold", 11)
-    c.drawString(95*mm, card_y - 30*mm, "Civil Engineer (B.Tech) | Founder")
-    
-    c.setFillColor(LIGHT_GRAY)
-    c.setFont("Helvetica", 9)
-    
-    founder_desc = "Over 8+ years of experience managing construction projects including Big Industrial Projects - RCC Building, PEB Sheds, Outside Developments, RCC Roads, Drainage, High-Rise Towers, Commercial Complexes, Villas."
-    
-    words = founder_desc.split()
-    line = ""
-    y_text = card_y - 45*mm
-    for word in words:
-        test = line + " " + word if line else word
-        if c.stringWidth(test, "Helvetica", 9) < 85*mm:
-            line = test
-        else:
-            c.drawString(95*mm, y_text, line)
-            y_text -= 5*mm
-            line = word
-    if line:
-        c.drawString(95*mm, y_text, line)
-    
+    page.text(95*mm, card_y - 18*mm, content.founder_name, "Helvetica-Bold", 18, WHITE)
+    page.text(95*mm, card_y - 30*mm, content.founder_role, "Helvetica-Bold", 11, ACCENT_YELLOW)
+
+    page.paragraph(95*mm, card_y - 45*mm, content.founder_bio, "Helvetica", 9, LIGHT_GRAY, 85*mm, 5*mm,
+                   max_lines=4, label="founder bio")
+
     # Stats
-    founder_stats = [("8+", "Years"), ("30+", "Projects"), ("3", "Regions")]
     stat_y = card_y - 72*mm
-    
-    for i, (num, label) in enumerate(founder_stats):
+    for i, (num, label) in enumerate(content.founder_stats):
         x = 95*mm + i * 30*mm
-        
-        c.setFillColor(ACCENT_YELLOW)
-        c.setFont("Helvetica-Bold", 18)
-        c.drawString(x, stat_y + 5*mm, num)
-        
-        c.setFillColor(MID_GRAY)
-        c.setFont("Helvetica", 9)
-        c.drawString(x, stat_y - 3*mm, label)
-    
-    c.showPage()
-    
-    # ==================== PAGE 6 - CONTACT (FIXED LAYOUT) ====================
-
-    # Dark background
-    c.setFillColor(DARKER_BG)
-    c.rect(0, 0, WIDTH, HEIGHT, fill=1, stroke=0)
-
-    # Top accent
-    c.setFillColor(HexColor('#5d4037'))
-    c.rect(0, HEIGHT - 6*mm, WIDTH, 6*mm, fill=1, stroke=0)
+        page.text(x, stat_y + 5*mm, num, "Helvetica-Bold", 18, ACCENT_YELLOW)
+        page.text(x, stat_y - 3*mm, label, "Helvetica", 9, MID_GRAY)
 
-    # Header section
-    c.setFillColor(ACCENT_YELLOW)
-    c.setFont("Helvetica-Bold", 11)
-    c.drawCentredString(WIDTH/2, HEIGHT - 25*mm, "GET IN TOUCH")
+    return pages
 
-    # Yellow underline centered
-    c.rect(WIDTH/2 - 20*mm, HEIGHT - 28*mm, 40*mm, 2*mm, fill=1, stroke=0)
+def layout_contact(content):
+    # ==================== PAGE 6 - CONTACT (FIXED LAYOUT) ====================
+    page = PageBuilder()
+    page.page_background()
 
-    # Main title
-    c.setFillColor(WHITE)
-    c.setFont("Helvetica-Bold", 28)
-    c.drawCentredString(WIDTH/2, HEIGHT - 48*mm, "Let's Build Something Great")
+    # Header section with centred underline
+    page.centred_text(WIDTH/2, HEIGHT - 25*mm, "GET IN TOUCH", "Helvetica-Bold", 11, ACCENT_YELLOW)
+    page.rect(WIDTH/2 - 20*mm, HEIGHT - 28*mm, 40*mm, 2*mm, ACCENT_YELLOW)
 
-    # Subtitle
-    c.setFillColor(MID_GRAY)
-    c.setFont("Helvetica", 12)
-    c.drawCentredString(WIDTH/2, HEIGHT - 62*mm, "Ready to start your project? Contact us today for a consultation.")
+    page.centred_text(WIDTH/2, HEIGHT - 48*mm, content.contact_title, "Helvetica-Bold", 28, WHITE)
+    page.centred_text(WIDTH/2, HEIGHT - 62*mm, content.contact_subtitle, "Helvetica", 12, MID_GRAY)
 
-    # Contact card - properly formatted
+    # Contact card
     card_x = 30*mm
     card_y = HEIGHT - 80*mm
     card_w = WIDTH - 60*mm
     card_h = 105*mm
 
-    # Card background with rounded corners
-    c.setFillColor(CARD_BG)
-    draw_rounded_rect(c, card_x, card_y - card_h, card_w, card_h, 8*mm, fill_color=CARD_BG)
+    page.rounded_rect(card_x, card_y - card_h, card_w, card_h, 8*mm, CARD_BG)
+    page.rect(card_x, card_y - card_h + 12*mm, 4*mm, card_h - 24*mm, ACCENT_YELLOW)
 
-    # Yellow accent bar on left side of card
-    c.setFillColor(ACCENT_YELLOW)
-    c.rect(card_x, card_y - card_h + 12*mm, 4*mm, card_h - 24*mm, fill=1, stroke=0)
-
-    # Content inside card
     content_x = card_x + 18*mm
     content_y = card_y - 12*mm
 
     # CONTACT PERSON
-    c.setFillColor(ACCENT_YELLOW)
-    c.setFont("Helvetica-Bold", 10)
-    c.drawString(content_x, content_y, "CONTACT PERSON")
-
-    c.setFillColor(WHITE)
-    c.setFont("Helvetica", 14)
-    c.drawString(content_x, content_y - 10*mm, "Suryakesh Kumar Singh")
+    page.text(content_x, content_y, "CONTACT PERSON", "Helvetica-Bold", 10, ACCENT_YELLOW)
+    page.text(content_x, content_y - 10*mm, content.contact_person, "Helvetica", 14, WHITE)
 
     # Row with PHONE and EMAIL
     row2_y = content_y - 28*mm
-
-    c.setFillColor(ACCENT_YELLOW)
-    c.setFont("Helvetica-Bold", 10)
-    c.drawString(content_x, row2_y, "PHONE")
-    c.drawString(content_x + 70*mm, row2_y, "EMAIL")
-
-    c.setFillColor(WHITE)
-    c.setFont("Helvetica", 12)
-    c.drawString(content_x, row2_y - 10*mm, "+91-7408703061")
-    c.drawString(content_x + 70*mm, row2_y - 10*mm, "suryakesh422@gmail.com")
+    page.text(content_x, row2_y, "PHONE", "Helvetica-Bold", 10, ACCENT_YELLOW)
+    page.text(content_x + 70*mm, row2_y, "EMAIL", "Helvetica-Bold", 10, ACCENT_YELLOW)
+    page.text(content_x, row2_y - 10*mm, content.phone, "Helvetica", 12, WHITE)
+    page.text(content_x + 70*mm, row2_y - 10*mm, content.email, "Helvetica", 12, WHITE)
 
     # Row with ADDRESS and WEBSITE
     row3_y = content_y - 58*mm
+    page.text(content_x, row3_y, "OFFICE ADDRESS", "Helvetica-Bold", 10, ACCENT_YELLOW)
+    page.text(content_x + 70*mm, row3_y, "WEBSITE", "Helvetica-Bold", 10, ACCENT_YELLOW)
+    for i, address_line in enumerate(content.address):
+        page.text(content_x, row3_y - 10*mm - i*9*mm, address_line, "Helvetica", 10, WHITE)
+    page.text(content_x + 70*mm, row3_y - 10*mm, content.website, "Helvetica", 12, WHITE)
+
+    # Footer logo below the card
+    logo_w = 45*mm
+    logo_h = 45*mm
+    page.logo(os.path.join(IMAGES_DIR, 'logo_full.png'), WIDTH/2 - logo_w/2, 25*mm, logo_w, logo_h,
+              WIDTH/2, 52*mm, 0.7)
+
+    page.centred_text(WIDTH/2, 15*mm, content.tagline, "Helvetica-Oblique", 11, MID_GRAY)
 
-    c.setFillColor(ACCENT_YELLOW)
-    c.setFont("Helvetica-Bold", 10)
-    c.drawString(content_x, row3_y, "OFFICE ADDRESS")
-    c.drawString(content_x + 70*mm, row3_y, "WEBSITE")
+    return page
 
-    c.setFillColor(WHITE)
-    c.setFont("Helvetica", 10)
-    c.drawString(content_x, row3_y - 10*mm, "Row House no: G-33, Shivay Bungalows")
-    c.drawString(content_x, row3_y - 19*mm, "Poniya Road, Behind New Mamlatdar Office")
-    c.drawString(content_x, row3_y - 28*mm, "Killa Pardi, Valsad, Gujarat - 396125")
+# Per-recipient fields. compile_plan draws them over the finished pages, so a
+# variant's plan is its base plan (these fields unset) plus the stamp ops
+STAMP_FIELDS = ('recipient', 'reference', 'watermark')
 
-    c.setFont("Helvetica", 12)
-    c.drawString(content_x + 70*mm, row3_y - 10*mm, "s-urbanconsultancy.in")
+def layout_page_stamp(content, index):
+    """Ops for the stamp fields on page index, as a PageBuilder (None if they leave it alone)"""
+    stamp = None
+    if index == 0 and (content.recipient or content.reference):
+        stamp = PageBuilder()
+        # Personalised recipient line, between the year badge and the stats
+        if content.recipient:
+            stamp.text(30*mm, HEIGHT - 197*mm, "PREPARED FOR", "Helvetica-Bold", 9, MID_GRAY)
+            stamp.text(30*mm, HEIGHT - 205*mm, content.recipient, "Helvetica-Bold", 14, WHITE)
+        if content.reference:
+            stamp.text(30*mm, HEIGHT - 213*mm, f"REF {content.reference}", "Helvetica", 9, MID_GRAY)
+    if content.watermark:
+        stamp = stamp or PageBuilder()
+        stamp.watermark(WIDTH/2, HEIGHT/2, content.watermark, "Helvetica-Bold", 72, WHITE, 0.08,
+                        math.degrees(math.atan2(HEIGHT, WIDTH)))
+    return stamp
 
-    # Footer with logo - positioned below card with proper spacing
-    logo_path = os.path.join(IMAGES_DIR, 'logo_full.png')
+def layout_stamps(content, page_count):
+    """Ops for the stamp fields, as {page index: PageBuilder} for the pages they touch"""
+    stamps = {}
+    for i in range(page_count):
+        stamp = layout_page_stamp(content, i)
+        if stamp is not None:
+            stamps[i] = stamp
+    return stamps
+
+PAGE_LAYOUTS = [layout_cover, layout_about, layout_services, layout_lifecycle, layout_portfolio, layout_clients,
+                layout_contact]
+
+def iter_plan_pages(content=None):
+    """Lay out a profile page by page, stamps included; yields a PageBuilder per page"""
+    content = portfolio_content(content)
+    index = 0
+    for layout in PAGE_LAYOUTS:
+        # A layout returns its page, or an iterable when its content flows onto more
+        with span(layout.__name__, 'layout'):
+            laid_out = layout(content)
+        for page in [laid_out] if isinstance(laid_out, PageBuilder) else laid_out:
+            stamp = layout_page_stamp(content, index)
+            if stamp is not None:
+                page.ops.extend(stamp.ops)
+            yield page
+            index += 1
+
+def compile_plan(content=None):
+    """Resolve the layout of a profile into a serialisable render plan.
+
+    plan['overflow'] lists any text that had to be truncated to fit.
+    """
+    pages = list(iter_plan_pages(content))
+    return {
+        'version': PLAN_VERSION,
+        'pagesize': [WIDTH, HEIGHT],
+        'pages': [page.ops for page in pages],
+        'overflow': [note for page in pages for note in page.overflow],
+    }
+
+def lazy_plan(content=None, dpi=None, jpeg_quality=90):
+    """A plan whose pages are laid out as they are iterated, for catalogues too long to hold.
+
+    'pages' is a one-shot generator and 'overflow' fills in as it runs, so
+    only the page being written is in memory. With a dpi, a first pass
+    over the layout finds each image's largest placement, as
+    prepare_assets does for a compiled plan.
+    """
+    content = portfolio_content(content)
+    mapping = asset_mapping((page.ops for page in iter_plan_pages(content)), dpi, jpeg_quality) if dpi else {}
+    overflow = []
+
+    def pages():
+        for page in iter_plan_pages(content):
+            overflow.extend(page.overflow)
+            yield with_assets(page.ops, mapping) if mapping else page.ops
+
+    return {'version': PLAN_VERSION, 'pagesize': [WIDTH, HEIGHT], 'pages': pages(), 'overflow': overflow}
+
+# ==================== PLAN CACHE ====================
+
+# Compiled plans kept in memory, most recently used last
+_PLAN_CACHE = OrderedDict()
+_PLAN_CACHE_SIZE = 64
+
+def _file_stamp(path):
     try:
-        logo_w = 45*mm
-        logo_h = 45*mm
-        c.drawImage(logo_path, WIDTH/2 - logo_w/2, 25*mm, width=logo_w, height=logo_h,
-                   preserveAspectRatio=True, mask='auto')
-    except:
-        draw_surban_logo(c, WIDTH/2, 52*mm, scale=0.7, dark_bg=True)
+        st = os.stat(path)
+    except OSError:
+        return '-'
+    return f"{st.st_mtime_ns}:{st.st_size}"
 
-    # Tagline at bottom
-    c.setFillColor(MID_GRAY)
-    c.setFont("Helvetica-Oblique", 11)
-    c.drawCentredString(WIDTH/2, 15*mm, "From Queries to Solutions")
-    
+def plan_key(content):
+    # Logo proportions shape the client wall, so the logo files are part of the key
+    content = resolve_content(content)
+    logos = ','.join(_file_stamp(os.path.join(IMAGES_DIR, img)) for img, _ in content.clients)
+    # So is the portfolio database, whose rows and figures end up on the pages
+    portfolio = portfolio_stamp(os.path.abspath(content.portfolio)) if content.portfolio else '-'
+    data = f"{PLAN_VERSION}:{IMAGES_DIR}:{content_key(content)}:{logos}:{portfolio}"
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+def save_plan(plan, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(plan, f, separators=(',', ':'))
+
+def load_plan(path):
+    with open(path, encoding='utf-8') as f:
+        plan = json.load(f)
+    if plan.get('version') != PLAN_VERSION:
+        raise ValueError(f"{path}: plan version {plan.get('version')} != {PLAN_VERSION}")
+    return plan
+
+def get_plan(content=None, cache_dir=None):
+    """Return the render plan for content, compiling only on a cache miss.
+
+    Plans are looked up in memory first, then under cache_dir on disk when
+    one is given (the CLI uses PLAN_CACHE_DIR).
+    """
+    key = plan_key(content)
+    plan = _PLAN_CACHE.get(key)
+    if plan is not None:
+        _PLAN_CACHE.move_to_end(key)
+        count_event('plan_cache_hits')
+        return plan
+    count_event('plan_cache_misses')
+    path = os.path.join(cache_dir, key + '.json') if cache_dir else None
+    if path and os.path.exists(path):
+        try:
+            plan = load_plan(path)
+        except (OSError, ValueError):
+            plan = None
+    if plan is None:
+        plan = compile_plan(content)
+        if path:
+            os.makedirs(cache_dir, exist_ok=True)
+            # Write then rename so concurrent workers never read a partial plan
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            save_plan(plan, tmp_path)
+            os.replace(tmp_path, path)
+    _PLAN_CACHE[key] = plan
+    if len(_PLAN_CACHE) > _PLAN_CACHE_SIZE:
+        _PLAN_CACHE.popitem(last=False)
+    return plan
+
+# ==================== ASSET PIPELINE ====================
+#
+# Images are embedded at whatever resolution they have on disk. For a given
+# plan and target DPI, each source image is resampled once to the largest
+# box it is placed in and cached under a name derived from the source hash,
+# box size, DPI and JPEG quality, so repeat builds never reopen it with Pillow.
+
+IMAGE_OPS = ('logo', 'photo', 'client_logo')
+
+# (path, mtime, size) -> sha256 of the file contents
+_FILE_DIGESTS = {}
+
+def file_digest(path):
+    """sha256 of a file, memoised on its path, mtime and size"""
+    st = os.stat(path)
+    key = (path, st.st_mtime_ns, st.st_size)
+    digest = _FILE_DIGESTS.get(key)
+    if digest is None:
+        with open(path, 'rb') as f:
+            digest = _FILE_DIGESTS[key] = hashlib.sha256(f.read()).hexdigest()
+    return digest
+
+def placed_images(ops):
+    """Yield (img_path, box_w, box_h) in points for every image primitive on a page"""
+    for op in ops:
+        kind = op[0]
+        if kind == 'logo':
+            yield op[1], op[4], op[5]
+        elif kind == 'photo':
+            yield op[1], op[4], op[4]
+        elif kind == 'client_logo':
+            padding = client_logo_padding(op[5])
+            yield op[1], op[4] - 2*padding, op[5] - 2*padding
+
+def prepared_asset(img_path, box_w, box_h, dpi, jpeg_quality=90, cache_dir=ASSET_CACHE_DIR):
+    """Return the path of img_path resampled to fit box_w x box_h points at dpi.
+
+    Images are only ever downsampled. Opaque images are stored as JPEG,
+    anything with alpha as optimised PNG.
+    """
+    px_w = max(1, math.ceil(box_w * dpi / 72.0))
+    px_h = max(1, math.ceil(box_h * dpi / 72.0))
+    stem = f"{file_digest(img_path)[:32]}-{px_w}x{px_h}@{dpi}q{jpeg_quality}"
+    for ext in ('.jpg', '.png'):
+        cached = os.path.join(cache_dir, stem + ext)
+        if os.path.exists(cached):
+            return cached
+
+    os.makedirs(cache_dir, exist_ok=True)
+    with Image.open(img_path) as im:
+        im.load()
+        source_format = im.format
+        has_alpha = im.mode in ('RGBA', 'LA') or (im.mode == 'P' and 'transparency' in im.info)
+        resize = im.width > px_w or im.height > px_h
+        if resize:
+            im = im.convert('RGBA' if has_alpha else 'RGB')
+            im.thumbnail((px_w, px_h), Image.LANCZOS)
+        ext = '.png' if has_alpha else '.jpg'
+        cached = os.path.join(cache_dir, stem + ext)
+        # Write then rename so concurrent batch workers never see partial files
+        tmp_path = f"{cached}.{os.getpid()}.tmp"
+        if has_alpha:
+            im.convert('RGBA').save(tmp_path, 'PNG', optimize=True)
+        else:
+            im.convert('RGB').save(tmp_path, 'JPEG', quality=jpeg_quality, optimize=True)
+    # Keep the source bytes when re-encoding didn't pay off (e.g. a JPEG only
+    # a few pixels over the target size)
+    same_format = source_format == ('PNG' if has_alpha else 'JPEG')
+    if same_format and os.path.getsize(tmp_path) >= os.path.getsize(img_path):
+        with open(img_path, 'rb') as src, open(tmp_path, 'wb') as dst:
+            dst.write(src.read())
+    os.replace(tmp_path, cached)
+    return cached
+
+def asset_mapping(pages, dpi, jpeg_quality=90, cache_dir=ASSET_CACHE_DIR):
+    """{image path: DPI-matched cached asset} for the images placed on pages (iterable of ops).
+
+    An image placed several times is prepared once, at its largest
+    placement, so the PDF still embeds it only once.
+    """
+    boxes = {}
+    for ops in pages:
+        for img_path, w, h in placed_images(ops):
+            bw, bh = boxes.get(img_path, (0, 0))
+            boxes[img_path] = (max(bw, w), max(bh, h))
+
+    mapping = {}
+    for img_path, (w, h) in boxes.items():
+        try:
+            mapping[img_path] = prepared_asset(img_path, w, h, dpi, jpeg_quality, cache_dir)
+        except OSError:
+            pass  # missing/unreadable: leave it to the draw helpers' fallback
+    return mapping
+
+def with_assets(ops, mapping):
+    """ops with image paths swapped for their entries in mapping"""
+    return [(op[0], mapping.get(op[1], op[1])) + tuple(op[2:]) if op[0] in IMAGE_OPS else op for op in ops]
+
+def prepare_assets(plan, dpi, jpeg_quality=90, cache_dir=ASSET_CACHE_DIR):
+    """Return a copy of plan whose images point at DPI-matched cached assets (see asset_mapping)"""
+    mapping = asset_mapping(plan['pages'], dpi, jpeg_quality, cache_dir)
+    return dict(plan, pages=[with_assets(ops, mapping) for ops in plan['pages']])
+
+# ==================== SHARED FORMS ====================
+#
+# Elements repeated on every page (or drawn from dozens of path operators)
+# are emitted once per document as Form XObjects and referenced with a
+# single "Do" wherever they appear.
+
+CHROME_FORM = 'Chrome'
+LOGO_MARK_FORM = 'LogoMark'
+
+def draw_page_chrome(c):
+    """Full-page dark background with the brown top accent bar"""
+    c.setFillColor(_color(DARKER_BG))
+    c.rect(0, 0, WIDTH, HEIGHT, fill=1, stroke=0)
+    c.setFillColor(colors.HexColor('#5d4037'))
+    c.rect(0, HEIGHT - 6*mm, WIDTH, 6*mm, fill=1, stroke=0)
+
+def define_shared_form(c, name):
+    """Emit one of the shared forms into the document if not already there"""
+    if c.hasForm(name):
+        return
+    if name == CHROME_FORM:
+        c.beginForm(name, 0, 0, WIDTH, HEIGHT)
+        draw_page_chrome(c)
+    elif name == LOGO_MARK_FORM:
+        # Drawn at unit scale around the origin; placements translate/scale it
+        c.beginForm(name, -60, -70, 60, 85)
+        draw_surban_logo(c, 0, 0, scale=1.0, dark_bg=True)
+    else:
+        raise ValueError(f"Unknown shared form: {name!r}")
+    c.endForm()
+
+# ==================== SAVING ====================
+#
+# c.save() deflates every page and form stream one after another while it
+# serialises the document, then wraps each in ASCII85, which without the
+# rl_accel extension is pure Python and costs more than the deflate itself.
+# save_canvas() deflates those streams up front on a thread pool (zlib
+# releases the GIL) and hands reportlab the finished bytes: the decoded
+# streams are exactly the ones c.save() writes, minus the ASCII85 layer.
+# Image streams are already encoded when the images are loaded.
+
+class SaveOptions(NamedTuple):
+    compress_level: int  # zlib level for page and form streams
+    threads: int         # deflate threads; 1 compresses inline
+
+# reportlab itself deflates at zlib's default level
+SAVE_OPTIONS = SaveOptions(compress_level=zlib.Z_DEFAULT_COMPRESSION, threads=min(4, os.cpu_count() or 1))
+# Below this much stream data (the six-page profile has ~40 KiB) handing it
+# to the pool costs more than deflating it inline
+SAVE_PARALLEL_MIN_BYTES = 256 << 10
+
+# (pid, threads, executor): threads do not survive a fork, so each process starts its own pool
+_SAVE_POOL = None
+
+def configure_save(compress_level=None, threads=None):
+    """Set the SaveOptions of later save_canvas() calls in this process and the workers it forks"""
+    global SAVE_OPTIONS
+    changes = {'compress_level': compress_level, 'threads': threads}
+    SAVE_OPTIONS = SAVE_OPTIONS._replace(**{k: v for k, v in changes.items() if v is not None})
+
+def _save_pool(threads):
+    global _SAVE_POOL
+    pid = os.getpid()
+    if _SAVE_POOL is None or _SAVE_POOL[:2] != (pid, threads):
+        if _SAVE_POOL is not None and _SAVE_POOL[0] == pid:
+            _SAVE_POOL[2].shutdown(wait=False)
+        _SAVE_POOL = (pid, threads, futures.ThreadPoolExecutor(max_workers=threads, thread_name_prefix='deflate'))
+    return _SAVE_POOL[2]
+
+def save_canvas(c, options=None):
+    """c.save(), with the page and form streams deflated in parallel first (see SAVE_OPTIONS)"""
+    options = options or SAVE_OPTIONS
+    pending = [obj for obj in c._doc.idToObject.values()
+               if isinstance(obj, (pdfdoc.PDFPage, pdfdoc.PDFFormXObject))
+               and getattr(obj, 'compression', 0) and not obj.Contents and obj.stream]
+    if pending:
+        # Encoded the way reportlab's own Flate filter encodes them
+        data = [obj.stream.encode('utf-8') if isinstance(obj.stream, str) else obj.stream for obj in pending]
+        levels = [options.compress_level] * len(data)
+        if options.threads > 1 and len(data) > 1 and sum(map(len, data)) >= SAVE_PARALLEL_MIN_BYTES:
+            deflated = list(_save_pool(options.threads).map(zlib.compress, data, levels))
+        else:
+            deflated = list(map(zlib.compress, data, levels))
+        count_event('streams_deflated', len(deflated))
+        for obj, body in zip(pending, deflated):
+            # A stream that already names its Filter is written as it is
+            stream = pdfdoc.PDFStream(content=body)
+            stream.dictionary['Filter'] = pdfdoc.PDFArray([pdfdoc.PDFName('FlateDecode')])
+            stream.__Comment__ = "page stream" if isinstance(obj, pdfdoc.PDFPage) else "xobject form stream"
+            obj.Contents = stream
     c.save()
-    print(f"PDF created successfully: {output_path}")
+
+# ==================== REPLAY ====================
+
+class PlanReplayer:
+    """Draws plan primitives onto a canvas, skipping redundant state changes"""
+
+    def __init__(self, c, use_forms=True):
+        self.c = c
+        self.use_forms = use_forms
+        self.reset()
+
+    def reset(self):
+        """Start of a page: the canvas is back to its default graphics state"""
+        self.fill = self.stroke = self.font = self.line_width = None
+        # None of the helpers touch alpha, so this one is tracked exactly
+        self.stroke_alpha = 1
+
+    def invalidate(self):
+        """Forget tracked state after a helper changed it behind our back"""
+        self.fill = self.stroke = self.font = self.line_width = None
+
+    def set_fill(self, value):
+        if value != self.fill:
+            self.c.setFillColor(_color(value))
+            self.fill = value
+
+    def set_font(self, font, size):
+        if (font, size) != self.font:
+            self.c.setFont(font, size)
+            self.font = (font, size)
+
+    def set_stroke(self, value, width, alpha):
+        c = self.c
+        if value != self.stroke:
+            # Setting an opaque colour also resets the stroke alpha to 1
+            c.setStrokeColor(_color(value))
+            self.stroke = value
+            self.stroke_alpha = 1
+        if width != self.line_width:
+            c.setLineWidth(width)
+            self.line_width = width
+        if alpha != self.stroke_alpha:
+            c.setStrokeAlpha(alpha)
+            self.stroke_alpha = alpha
+
+    def op_rect(self, x, y, w, h, fill):
+        self.set_fill(fill)
+        self.c.rect(x, y, w, h, fill=1, stroke=0)
+
+    def op_rrect(self, x, y, w, h, radius, fill):
+        # draw_rounded_rect saves/restores state, so tracked state survives
+        draw_rounded_rect(self.c, x, y, w, h, radius, fill_color=_color(fill))
+
+    def op_line(self, x1, y1, x2, y2, stroke, width, alpha):
+        self.set_stroke(stroke, width, alpha)
+        self.c.line(x1, y1, x2, y2)
+
+    def op_circle(self, cx, cy, r, fill):
+        self.set_fill(fill)
+        self.c.circle(cx, cy, r, fill=1, stroke=0)
+
+    def op_text(self, x, y, text, font, size, color, align, word_space=0):
+        self.set_fill(color)
+        self.set_font(font, size)
+        if align == 'centre':
+            self.c.drawCentredString(x, y, text)
+        elif word_space:
+            self.c.drawString(x, y, text, wordSpace=word_space)
+        else:
+            self.c.drawString(x, y, text)
+
+    def op_chrome(self):
+        if self.use_forms:
+            define_shared_form(self.c, CHROME_FORM)
+            self.c.doForm(CHROME_FORM)
+        else:
+            draw_page_chrome(self.c)
+            self.invalidate()
+
+    def op_logo(self, img_path, x, y, w, h, fallback_x, fallback_y, fallback_scale):
+        # The image itself is a single shared XObject however often it is placed
+        c = self.c
+        try:
+            preload_image(c, img_path)
+            c.drawImage(img_path, x, y, width=w, height=h, preserveAspectRatio=True, mask='auto')
+        except Exception:
+            if self.use_forms:
+                define_shared_form(c, LOGO_MARK_FORM)
+                # Forms inherit the caller's graphics state; the mark assumes opaque strokes
+                if self.stroke_alpha != 1:
+                    c.setStrokeAlpha(1)
+                    self.stroke_alpha = 1
+                c.saveState()
+                c.translate(fallback_x, fallback_y)
+                c.scale(fallback_scale, fallback_scale)
+                c.doForm(LOGO_MARK_FORM)
+                c.restoreState()
+            else:
+                draw_surban_logo(c, fallback_x, fallback_y, scale=fallback_scale, dark_bg=True)
+
+    def op_photo(self, img_path, x, y, diameter):
+        draw_circular_image(self.c, img_path, x, y, diameter)
+        self.invalidate()
+
+    def op_client_logo(self, img_path, x, y, w, h, name):
+        draw_client_logo(self.c, img_path, x, y, w, h, name)
+        self.invalidate()
+
+    def op_watermark(self, x, y, text, font, size, color, alpha, angle):
+        # Colour, alpha and font are all restored with the state, so tracked state survives
+        c = self.c
+        c.saveState()
+        c.setFillColor(_color(color))
+        c.setFillAlpha(alpha)
+        c.translate(x, y)
+        c.rotate(angle)
+        c.setFont(font, size)
+        c.drawCentredString(0, -size / 3, text)
+        c.restoreState()
+
+    def draw_page(self, ops):
+        self.reset()
+        prefetch_images([img_path for img_path, _, _ in placed_images(ops)])
+        inst = _INSTRUMENT
+        if inst is None:
+            for op in ops:
+                getattr(self, 'op_' + op[0])(*op[1:])
+            return
+        start = time.perf_counter()
+        for op in ops:
+            with _Span(inst, 'op_' + op[0], 'draw', {}):
+                getattr(self, 'op_' + op[0])(*op[1:])
+            inst.count('ops.' + op[0])
+        seconds = time.perf_counter() - start
+        page = len(inst.pages) + 1
+        inst.add_span('page', 'page', start, seconds, {'page': page, 'ops': len(ops)})
+        # content_bytes is the page's uncompressed content stream; output_bytes
+        # (streamed renders only) is what the page added to the file, resources included
+        inst.pages.append({'page': page, 'ops': len(ops), 'ms': seconds * 1000,
+                           'content_bytes': sum(len(line) + 1 for line in getattr(self.c, '_code', ()))})
+
+def replay_plan(c, plan, use_forms=True):
+    """Draw every page of a compiled plan onto the canvas"""
+    replayer = PlanReplayer(c, use_forms)
+    for ops in plan['pages']:
+        replayer.draw_page(ops)
+        c.showPage()
+
+def create_profile_pdf(output_path, content=None, verbose=True, plan=None, dpi=None, use_forms=True):
+    """Render the profile to output_path (a file path or writable binary stream).
+
+    Pass a precompiled plan to skip layout entirely; otherwise the plan for
+    content is fetched from the plan cache (compiled on first use). Content
+    with a portfolio, whose length is open-ended, is instead laid out page
+    by page while it is written (see lazy_plan). With a dpi, images are
+    embedded via the resampled asset cache. Streams are written page by
+    page (see stream_profile_pdf).
+    """
+    if plan is None and resolve_content(content).portfolio:
+        plan = lazy_plan(content, dpi)
+        if isinstance(output_path, str):
+            with open(output_path, 'wb') as f:
+                stream_profile_pdf(f, plan=plan, use_forms=use_forms)
+        else:
+            stream_profile_pdf(output_path, plan=plan, use_forms=use_forms)
+        if verbose:
+            report_render(plan, output_path)
+        return
+    if plan is None:
+        plan = get_plan(content)
+    if dpi:
+        plan = prepare_assets(plan, dpi)
+    if isinstance(output_path, str):
+        c = canvas.Canvas(output_path, pagesize=tuple(plan['pagesize']))
+        replay_plan(c, plan, use_forms)
+        with span('save', 'save'):
+            save_canvas(c)
+    else:
+        stream_profile_pdf(output_path, plan=plan, use_forms=use_forms)
+    if verbose:
+        report_render(plan, output_path)
+
+def render_pdf_bytes(content=None, plan=None, dpi=None, use_forms=True):
+    """Render the profile in memory and return the PDF bytes"""
+    if plan is None:
+        plan = get_plan(content)
+    if dpi:
+        plan = prepare_assets(plan, dpi)
+    buf = io.BytesIO()
+    c = canvas.Canvas(buf, pagesize=tuple(plan['pagesize']))
+    replay_plan(c, plan, use_forms)
+    with span('save', 'save'):
+        save_canvas(c)
+    return buf.getvalue()
+
+def report_render(plan, output_path, detail=''):
+    """Print overflow warnings and the success line; to stderr when the PDF itself goes to a stream"""
+    out = sys.stdout if isinstance(output_path, str) else sys.stderr
+    for note in plan.get('overflow', ()):
+        print(f"Warning: {note}", file=sys.stderr)
+    name = output_path if isinstance(output_path, str) else getattr(output_path, 'name', '<stream>')
+    print(f"PDF created successfully: {name}{detail}", file=out)
+
+# ==================== DISPLAY LIST ====================
+#
+# `record` replays a plan onto a RecordingCanvas, which stands in for a
+# reportlab canvas and keeps the calls the drawing helpers make. The result
+# is a display list: per page, a list of (canvas method, *args) with colours
+# as '#rrggbb' and every path already flattened to its PDF path code, plus
+# the shared forms. Replaying it onto a real canvas skips layout, the plan
+# helpers and the arc/bezier maths, and --display-list with --profile
+# re-outputs it under that profile's stream compression. Stored lists are
+# zlib-compressed JSON.
+
+DISPLAY_LIST_VERSION = 1
+
+def _hex_color(color):
+    return '#' + color.hexval()[2:]
+
+class RecordingCanvas:
+    """The subset of canvas.Canvas the drawing code uses, recorded instead of drawn"""
+
+    def __init__(self, pagesize):
+        self.pagesize = tuple(pagesize)
+        self.pages = []
+        self.forms = {}
+        self.ops = self._page_ops = []
+
+    def _record(self, *op):
+        self.ops.append(op)
+
+    def setFillColor(self, color):
+        self._record('setFillColor', _hex_color(color))
+
+    def setStrokeColor(self, color):
+        self._record('setStrokeColor', _hex_color(color))
+
+    def setStrokeAlpha(self, alpha):
+        self._record('setStrokeAlpha', alpha)
+
+    def setFillAlpha(self, alpha):
+        self._record('setFillAlpha', alpha)
+
+    def setLineWidth(self, width):
+        self._record('setLineWidth', width)
+
+    def setFont(self, font, size):
+        self._record('setFont', font, size)
+
+    def saveState(self):
+        self._record('saveState')
+
+    def restoreState(self):
+        self._record('restoreState')
+
+    def translate(self, dx, dy):
+        self._record('translate', dx, dy)
+
+    def scale(self, x, y):
+        self._record('scale', x, y)
+
+    def rotate(self, theta):
+        self._record('rotate', theta)
+
+    def rect(self, x, y, width, height, stroke=1, fill=0):
+        self._record('rect', x, y, width, height, stroke, fill)
+
+    def line(self, x1, y1, x2, y2):
+        self._record('line', x1, y1, x2, y2)
+
+    def ellipse(self, x1, y1, x2, y2, stroke=1, fill=0):
+        self._record('ellipse', x1, y1, x2, y2, stroke, fill)
+
+    def circle(self, x_cen, y_cen, r, stroke=1, fill=0):
+        self._record('circle', x_cen, y_cen, r, stroke, fill)
+
+    def beginPath(self):
+        return pathobject.PDFPathObject()
+
+    def drawPath(self, path, stroke=1, fill=0):
+        self._record('drawPath', path.getCode(), stroke, fill)
+
+    def clipPath(self, path, stroke=1, fill=0):
+        self._record('clipPath', path.getCode(), stroke, fill)
+
+    def drawString(self, x, y, text, wordSpace=None):
+        if wordSpace:
+            self._record('drawString', x, y, text, wordSpace)
+        else:
+            self._record('drawString', x, y, text)
+
+    def drawCentredString(self, x, y, text):
+        self._record('drawCentredString', x, y, text)
+
+    def drawImage(self, img_path, x, y, width=None, height=None, preserveAspectRatio=False, mask=None):
+        self._record('drawImage', img_path, x, y, width, height, preserveAspectRatio, mask)
+
+    def hasForm(self, name):
+        return name in self.forms
+
+    def beginForm(self, name, lowerx=0, lowery=0, upperx=None, uppery=None):
+        self.ops = []
+        self.forms[name] = {'bbox': [lowerx, lowery, upperx, uppery], 'ops': self.ops}
+
+    def endForm(self):
+        self.ops = self._page_ops
+
+    def doForm(self, name):
+        self._record('doForm', name)
+
+    def showPage(self):
+        self.pages.append(self._page_ops)
+        self.ops = self._page_ops = []
+
+def record_display_list(plan, use_forms=True):
+    """Replay plan onto a RecordingCanvas and return the display list"""
+    c = RecordingCanvas(plan['pagesize'])
+    replay_plan(c, plan, use_forms)
+    return {'version': DISPLAY_LIST_VERSION, 'pagesize': list(c.pagesize), 'forms': c.forms, 'pages': c.pages,
+            'overflow': plan.get('overflow', [])}
+
+def save_display_list(display_list, path):
+    data = zlib.compress(json.dumps(display_list, separators=(',', ':')).encode('utf-8'), 9)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+def load_display_list(path):
+    with open(path, 'rb') as f:
+        display_list = json.loads(zlib.decompress(f.read()))
+    if display_list.get('version') != DISPLAY_LIST_VERSION:
+        raise ValueError(f"{path}: display list version {display_list.get('version')} != {DISPLAY_LIST_VERSION}")
+    return display_list
+
+def _play_ops(c, ops, forms):
+    for op in ops:
+        name = op[0]
+        if name == 'drawPath' or name == 'clipPath':
+            getattr(c, name)(pathobject.PDFPathObject(code=[op[1]]), stroke=op[2], fill=op[3])
+        elif name == 'setFillColor' or name == 'setStrokeColor':
+            getattr(c, name)(_color(op[1]))
+        elif name == 'drawString' and len(op) == 5:
+            c.drawString(op[1], op[2], op[3], wordSpace=op[4])
+        elif name == 'drawImage':
+            preload_image(c, op[1])
+            c.drawImage(op[1], op[2], op[3], width=op[4], height=op[5], preserveAspectRatio=op[6], mask=op[7])
+        elif name == 'doForm':
+            form_name = op[1]
+            if not c.hasForm(form_name):
+                form = forms[form_name]
+                c.beginForm(form_name, *form['bbox'])
+                _play_ops(c, form['ops'], forms)
+                c.endForm()
+            c.doForm(form_name)
+        else:
+            getattr(c, name)(*op[1:])
+
+def replay_display_list(c, display_list):
+    """Draw every page of a display list onto a canvas"""
+    for ops in display_list['pages']:
+        _play_ops(c, ops, display_list['forms'])
+        c.showPage()
+
+def render_display_list(output_path, display_list, profile=None, verbose=True):
+    """Write a display list out as a PDF, re-encoded for an output profile if one is given"""
+    buf = io.BytesIO()
+    c = canvas.Canvas(buf, pagesize=tuple(display_list['pagesize']))
+    replay_display_list(c, display_list)
+    with span('save', 'save'):
+        save_canvas(c)
+    data = buf.getvalue()
+    if profile:
+        settings = OUTPUT_PROFILES[profile]
+        data = optimize_pdf(data, settings.compress_level, settings.linearize)
+    if isinstance(output_path, str):
+        with open(output_path, 'wb') as f:
+            f.write(data)
+    else:
+        output_path.write(data)
+        output_path.flush()
+    if verbose:
+        report_render(display_list, output_path, f" (from display list{f', {profile} profile' if profile else ''})")
+    return len(data)
+
+# ==================== SVG EXPORT ====================
+#
+# --svg-dir writes every page of a display list as a standalone SVG in the
+# same pass that writes the PDF. Geometry stays vector (paths as recorded,
+# circles and ellipses as native elements), text is set in Helvetica with
+# its width pinned to the PDF's Helvetica metrics so substitute fonts cannot
+# reflow it, and images are embedded resampled to SVG_IMAGE_DPI. The page is
+# drawn in a y-flipped group so the recorded PDF coordinates are used as is.
+
+SVG_IMAGE_DPI = 144
+SVG_FONTS = {
+    'Helvetica': '',
+    'Helvetica-Bold': ' font-weight="bold"',
+    'Helvetica-Oblique': ' font-style="italic"',
+    'Helvetica-BoldOblique': ' font-weight="bold" font-style="italic"',
+}
+_SVG_PATH_OPS = {'m': 'M', 'l': 'L', 'c': 'C', 'h': 'Z'}
+
+def _svg_num(value):
+    text = f"{value:.2f}".rstrip('0').rstrip('.')
+    return '0' if text == '-0' else text
+
+def svg_path_data(code):
+    """SVG path data for PDF path code (m/l/c/h/re operators)"""
+    parts, args = [], []
+    for token in code.split():
+        if token == 're':
+            x, y, w, h = args
+            parts.append(f"M{_svg_num(x)} {_svg_num(y)}h{_svg_num(w)}v{_svg_num(h)}h{_svg_num(-w)}Z")
+        elif token in _SVG_PATH_OPS:
+            parts.append(_SVG_PATH_OPS[token] + ' '.join(_svg_num(v) for v in args))
+        elif token[0] not in 'nfSBW':
+            args.append(float(token))
+            continue
+        args = []
+    return ''.join(parts)
+
+@lru_cache(maxsize=None)
+def _svg_image_href(img_path, box_w, box_h, dpi):
+    """data: URI of img_path resampled to its placed size at dpi"""
+    path = prepared_asset(img_path, box_w, box_h, dpi)
+    mime = 'image/png' if path.endswith('.png') else 'image/jpeg'
+    with open(path, 'rb') as f:
+        return f"data:{mime};base64,{base64.b64encode(f.read()).decode('ascii')}"
+
+class SvgWriter:
+    """Replays display list ops as SVG elements"""
+
+    def __init__(self, forms, image_dpi=SVG_IMAGE_DPI):
+        self.forms = forms
+        self.image_dpi = image_dpi
+        self.defs = {}
+        self.clips = 0
+
+    def page(self, ops, pagesize):
+        """The complete SVG document for one page"""
+        width, height = pagesize
+        body = self.elements(ops)
+        defs = f"<defs>{''.join(self.defs.values())}</defs>" if self.defs else ''
+        return (f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {_svg_num(width)} {_svg_num(height)}" '
+                f'width="{_svg_num(width)}" height="{_svg_num(height)}" xml:space="preserve">{defs}'
+                f'<g transform="matrix(1 0 0 -1 0 {_svg_num(height)})">{body}</g></svg>\n')
+
+    def elements(self, ops):
+        out = []
+        state = {'fill': '#000000', 'fill_alpha': 1, 'stroke': '#000000', 'stroke_alpha': 1, 'line_width': 1,
+                 'font': ('Helvetica', 12)}
+        # One entry per saveState: the state to restore and the groups opened since
+        stack = []
+        groups = 0
+
+        def paint(stroke, fill):
+            attrs = f' fill="{state["fill"]}"' if fill else ' fill="none"'
+            if fill and state['fill_alpha'] != 1:
+                attrs += f' fill-opacity="{_svg_num(state["fill_alpha"])}"'
+            if stroke:
+                attrs += f' stroke="{state["stroke"]}"'
+                if state['line_width'] != 1:
+                    attrs += f' stroke-width="{_svg_num(state["line_width"])}"'
+                if state['stroke_alpha'] != 1:
+                    attrs += f' stroke-opacity="{_svg_num(state["stroke_alpha"])}"'
+            return attrs
+
+        for op in ops:
+            name = op[0]
+            if name == 'setFillColor':
+                state['fill'] = op[1]
+                state['fill_alpha'] = 1
+            elif name == 'setFillAlpha':
+                state['fill_alpha'] = op[1]
+            elif name == 'setStrokeColor':
+                state['stroke'] = op[1]
+                state['stroke_alpha'] = 1
+            elif name == 'setStrokeAlpha':
+                state['stroke_alpha'] = op[1]
+            elif name == 'setLineWidth':
+                state['line_width'] = op[1]
+            elif name == 'setFont':
+                state['font'] = (op[1], op[2])
+            elif name == 'saveState':
+                stack.append((dict(state), groups))
+                groups = 0
+            elif name == 'restoreState':
+                out.append('</g>' * groups)
+                state, groups = stack.pop()
+            elif name == 'translate':
+                out.append(f'<g transform="translate({_svg_num(op[1])} {_svg_num(op[2])})">')
+                groups += 1
+            elif name == 'scale':
+                out.append(f'<g transform="scale({_svg_num(op[1])} {_svg_num(op[2])})">')
+                groups += 1
+            elif name == 'rotate':
+                out.append(f'<g transform="rotate({_svg_num(op[1])})">')
+                groups += 1
+            elif name == 'rect':
+                x, y, w, h, stroke, fill = op[1:]
+                out.append(f'<rect x="{_svg_num(x)}" y="{_svg_num(y)}" width="{_svg_num(w)}" '
+                           f'height="{_svg_num(h)}"{paint(stroke, fill)}/>')
+            elif name == 'line':
+                x1, y1, x2, y2 = op[1:]
+                out.append(f'<path d="M{_svg_num(x1)} {_svg_num(y1)}L{_svg_num(x2)} {_svg_num(y2)}"{paint(1, 0)}/>')
+            elif name == 'circle':
+                cx, cy, r, stroke, fill = op[1:]
+                out.append(f'<circle cx="{_svg_num(cx)}" cy="{_svg_num(cy)}" r="{_svg_num(r)}"{paint(stroke, fill)}/>')
+            elif name == 'ellipse':
+                x1, y1, x2, y2, stroke, fill = op[1:]
+                out.append(f'<ellipse cx="{_svg_num((x1 + x2) / 2)}" cy="{_svg_num((y1 + y2) / 2)}" '
+                           f'rx="{_svg_num(abs(x2 - x1) / 2)}" ry="{_svg_num(abs(y2 - y1) / 2)}"{paint(stroke, fill)}/>')
+            elif name == 'drawPath':
+                out.append(f'<path d="{svg_path_data(op[1])}"{paint(op[2], op[3])}/>')
+            elif name == 'clipPath':
+                self.clips += 1
+                clip_id = f"c{self.clips}"
+                self.defs[clip_id] = f'<clipPath id="{clip_id}"><path d="{svg_path_data(op[1])}"/></clipPath>'
+                out.append(f'<g clip-path="url(#{clip_id})">')
+                groups += 1
+            elif name in ('drawString', 'drawCentredString'):
+                out.append(self.text(name, op, state))
+            elif name == 'drawImage':
+                img_path, x, y, w, h, preserve, _ = op[1:]
+                size = image_size(img_path)
+                if preserve and size:
+                    # Fit and centre in the box as drawImage does, so no viewer has to
+                    scale = min(w / size[0], h / size[1])
+                    x, y = x + (w - size[0] * scale) / 2, y + (h - size[1] * scale) / 2
+                    w, h = size[0] * scale, size[1] * scale
+                href = _svg_image_href(img_path, w, h, self.image_dpi)
+                out.append(f'<image transform="matrix(1 0 0 -1 {_svg_num(x)} {_svg_num(y + h)})" '
+                           f'width="{_svg_num(w)}" height="{_svg_num(h)}" preserveAspectRatio="none" href="{href}"/>')
+            elif name == 'doForm':
+                form_id = f"form-{op[1]}"
+                if form_id not in self.defs:
+                    self.defs[form_id] = f'<g id="{form_id}">{self.elements(self.forms[op[1]]["ops"])}</g>'
+                out.append(f'<use href="#{form_id}"/>')
+        out.append('</g>' * groups)
+        return ''.join(out)
+
+    def text(self, name, op, state):
+        x, y, text = op[1:4]
+        word_space = op[4] if len(op) > 4 else 0
+        font, size = state['font']
+        width = pdfmetrics.stringWidth(text, font, size) + word_space * text.count(' ')
+        if name == 'drawCentredString':
+            x -= width / 2
+        attrs = f' word-spacing="{_svg_num(word_space)}"' if word_space else ''
+        if state['fill_alpha'] != 1:
+            attrs += f' fill-opacity="{_svg_num(state["fill_alpha"])}"'
+        return (f'<text transform="matrix(1 0 0 -1 {_svg_num(x)} {_svg_num(y)})" font-family="Helvetica,Arial,sans-serif"'
+                f'{SVG_FONTS.get(font, "")} font-size="{_svg_num(size)}" fill="{state["fill"]}"{attrs} '
+                f'textLength="{_svg_num(width)}" lengthAdjust="spacingAndGlyphs">{html.escape(text, quote=False)}</text>')
+
+def export_svgs(display_list, out_dir, image_dpi=SVG_IMAGE_DPI):
+    """Write page-N.svg for every page of a display list, plus the logo mark; returns the paths"""
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+    pages = list(display_list['pages'])
+    names = [f"page-{i}.svg" for i in range(1, len(pages) + 1)]
+    # The vector logo mark on its own, drawn the way the LogoMark form draws it
+    mark = RecordingCanvas(display_list['pagesize'])
+    draw_surban_logo(mark, 0, 0, scale=1.0, dark_bg=True)
+    pages.append([('translate', 60, 70)] + mark.ops)
+    names.append('logo-mark.svg')
+    for name, ops in zip(names, pages):
+        size = (120, 155) if name == 'logo-mark.svg' else display_list['pagesize']
+        svg = SvgWriter(display_list['forms'], image_dpi).page(ops, size)
+        path = os.path.join(out_dir, name)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(svg)
+        os.replace(tmp_path, path)
+        paths.append(path)
+    return paths
+
+# ==================== PDF OBJECTS ====================
+#
+# A small reader/writer for the PDF files reportlab produces (classic xref
+# tables, no object streams). It is enough to pull pages out of one PDF and
+# write them into another, which reportlab itself cannot do.
+
+class PdfRef(NamedTuple):
+    num: int
+    gen: int = 0
+
+class PdfName(str):
+    """A PDF name, stored without its leading slash"""
+
+class PdfString(bytes):
+    """A PDF string (literal or hex), stored as its decoded bytes"""
+
+class PdfStream:
+    """A stream object: its dictionary plus the still-encoded data"""
+
+    def __init__(self, dictionary, data):
+        self.dict = dictionary
+        self.data = data
+
+class PdfError(ValueError):
+    pass
+
+_PDF_WHITESPACE = b'\x00\t\n\x0c\r '
+_PDF_DELIMITERS = b'()<>[]{}/%'
+_PDF_NUMBER = re.compile(rb'[+-]?(?:\d+\.?\d*|\.\d+)')
+_PDF_REF_TAIL = re.compile(rb'\s+(\d+)\s+R(?=[\s/\[\]<>()%]|$)')
+_PDF_ESCAPES = {ord('n'): b'\n', ord('r'): b'\r', ord('t'): b'\t', ord('b'): b'\b',
+                ord('f'): b'\f', ord('('): b'(', ord(')'): b')', ord('\\'): b'\\'}
+
+class PdfParser:
+    """Recursive-descent parser for PDF object syntax over a bytes buffer"""
+
+    def __init__(self, data, pos=0):
+        self.data = data
+        self.pos = pos
+
+    def skip_space(self):
+        data, pos, n = self.data, self.pos, len(self.data)
+        while pos < n:
+            ch = data[pos]
+            if ch in _PDF_WHITESPACE:
+                pos += 1
+            elif ch == 0x25:  # % comment runs to end of line
+                while pos < n and data[pos] not in b'\r\n':
+                    pos += 1
+            else:
+                break
+        self.pos = pos
+
+    def _regular(self):
+        data, pos, n = self.data, self.pos, len(self.data)
+        start = pos
+        while pos < n and data[pos] not in _PDF_WHITESPACE and data[pos] not in _PDF_DELIMITERS:
+            pos += 1
+        self.pos = pos
+        return data[start:pos]
+
+    def keyword(self):
+        self.skip_space()
+        return self._regular()
+
+    def parse(self):
+        self.skip_space()
+        data = self.data
+        ch = data[self.pos:self.pos + 1]
+        if ch == b'/':
+            self.pos += 1
+            raw = self._regular()
+            if b'#' in raw:
+                raw = re.sub(rb'#([0-9A-Fa-f]{2})', lambda m: bytes([int(m.group(1), 16)]), raw)
+            return PdfName(raw.decode('latin-1'))
+        if ch == b'<':
+            if data[self.pos + 1:self.pos + 2] == b'<':
+                return self._dict()
+            end = data.index(b'>', self.pos)
+            digits = re.sub(rb'\s', b'', data[self.pos + 1:end])
+            self.pos = end + 1
+            if len(digits) % 2:
+                digits += b'0'
+            return PdfString(bytes.fromhex(digits.decode('ascii')))
+        if ch == b'[':
+            self.pos += 1
+            items = []
+            while True:
+                self.skip_space()
+                if data[self.pos:self.pos + 1] == b']':
+                    self.pos += 1
+                    return items
+                items.append(self.parse())
+        if ch == b'(':
+            return self._literal_string()
+        m = _PDF_NUMBER.match(data, self.pos)
+        if m:
+            token = m.group()
+            self.pos = m.end()
+            if b'.' in token:
+                return float(token)
+            # "num gen R" is an indirect reference
+            ref = _PDF_REF_TAIL.match(data, self.pos)
+            if ref:
+                self.pos = ref.end()
+                return PdfRef(int(token), int(ref.group(1)))
+            return int(token)
+        word = self._regular()
+        if word == b'true':
+            return True
+        if word == b'false':
+            return False
+        if word == b'null':
+            return None
+        raise PdfError(f"Unexpected token {word[:20]!r} at offset {self.pos}")
+
+    def _dict(self):
+        self.pos += 2
+        result = {}
+        data = self.data
+        while True:
+            self.skip_space()
+            if data[self.pos:self.pos + 2] == b'>>':
+                self.pos += 2
+                return result
+            key = self.parse()
+            if not isinstance(key, PdfName):
+                raise PdfError(f"Dictionary key {key!r} is not a name at offset {self.pos}")
+            result[key] = self.parse()
+
+    def _literal_string(self):
+        data = self.data
+        pos = self.pos + 1
+        depth = 1
+        out = bytearray()
+        while True:
+            ch = data[pos]
+            if ch == 0x5c:  # backslash
+                nxt = data[pos + 1]
+                if nxt in _PDF_ESCAPES:
+                    out += _PDF_ESCAPES[nxt]
+                    pos += 2
+                elif 0x30 <= nxt <= 0x37:
+                    m = re.match(rb'[0-7]{1,3}', data[pos + 1:pos + 4])
+                    out.append(int(m.group(), 8) & 0xff)
+                    pos += 1 + len(m.group())
+                elif nxt in b'\r\n':
+                    # Line continuation
+                    pos += 3 if data[pos + 1:pos + 3] == b'\r\n' else 2
+                else:
+                    out.append(nxt)
+                    pos += 2
+                continue
+            if ch == 0x28:
+                depth += 1
+            elif ch == 0x29:
+                depth -= 1
+                if not depth:
+                    self.pos = pos + 1
+                    return PdfString(bytes(out))
+            out.append(ch)
+            pos += 1
+
+def _pdf_number(value):
+    if isinstance(value, int):
+        return str(value).encode('ascii')
+    text = ('%.6f' % value).rstrip('0').rstrip('.')
+    return (text if text not in ('', '-', '-0') else '0').encode('ascii')
+
+def _pdf_name(name):
+    out = bytearray(b'/')
+    for b in name.encode('latin-1'):
+        if b < 0x21 or b > 0x7e or b in _PDF_DELIMITERS or b == 0x23:
+            out += b'#%02X' % b
+        else:
+            out.append(b)
+    return bytes(out)
+
+def serialize_pdf(obj):
+    """Encode a parsed PDF object back to PDF syntax"""
+    if isinstance(obj, PdfName):
+        return _pdf_name(obj)
+    if isinstance(obj, PdfRef):
+        return b'%d %d R' % obj
+    if isinstance(obj, bool):
+        return b'true' if obj else b'false'
+    if isinstance(obj, (int, float)):
+        return _pdf_number(obj)
+    if isinstance(obj, PdfString):
+        return b'(' + obj.replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)').replace(b'\r', b'\\r') + b')'
+    if isinstance(obj, dict):
+        return b'<<' + b''.join(_pdf_name(k) + b' ' + serialize_pdf(v) for k, v in obj.items()) + b'>>'
+    if isinstance(obj, list):
+        return b'[' + b' '.join(serialize_pdf(v) for v in obj) + b']'
+    if isinstance(obj, PdfStream):
+        dictionary = dict(obj.dict)
+        dictionary[PdfName('Length')] = len(obj.data)
+        return serialize_pdf(dictionary) + b'\nstream\n' + obj.data + b'\nendstream'
+    if obj is None:
+        return b'null'
+    if isinstance(obj, str):
+        return serialize_pdf(PdfString(obj.encode('latin-1')))
+    raise TypeError(f"Cannot serialise {type(obj).__name__} as PDF")
+
+class PdfReader:
+    """Random access to the objects of a PDF with a classic xref table"""
+
+    def __init__(self, data):
+        self.data = data
+        tail = data.rfind(b'startxref')
+        if tail < 0:
+            raise PdfError("No startxref: not a PDF, or truncated")
+        self.version = data[5:8].decode('ascii', 'replace')
+        self.offsets = {}
+        self.trailer = {}
+        xref_pos = self.startxref = int(data[tail + 9:].split()[0])
+        while xref_pos is not None:
+            xref_pos = self._read_xref(xref_pos)
+        self._objects = {}
+
+    def _read_xref(self, pos):
+        parser = PdfParser(self.data, pos)
+        if parser.keyword() != b'xref':
+            raise PdfError("Cross-reference streams are not supported")
+        while True:
+            word = parser.keyword()
+            if word == b'trailer':
+                break
+            start, count = int(word), int(parser.keyword())
+            parser.skip_space()
+            for i in range(count):
+                entry = self.data[parser.pos:parser.pos + 20].split()
+                parser.pos += 20
+                if entry[2] == b'n' and start + i not in self.offsets:
+                    self.offsets[start + i] = int(entry[0])
+        trailer = parser.parse()
+        for key, value in trailer.items():
+            self.trailer.setdefault(key, value)
+        return trailer.get('Prev')
+
+    def get(self, ref):
+        """The object a reference points to (streams come back as PdfStream)"""
+        obj = self._objects.get(ref.num)
+        if obj is None and ref.num not in self._objects:
+            obj = self._objects[ref.num] = self._parse_object(ref.num)
+        return obj
+
+    def resolve(self, obj):
+        return self.get(obj) if isinstance(obj, PdfRef) else obj
+
+    def _parse_object(self, num):
+        offset = self.offsets.get(num)
+        if offset is None:
+            return None
+        parser = PdfParser(self.data, offset)
+        parser.keyword(), parser.keyword()
+        if parser.keyword() != b'obj':
+            raise PdfError(f"Object {num} not found at offset {offset}")
+        obj = parser.parse()
+        if isinstance(obj, dict) and parser.keyword() == b'stream':
+            data = self.data
+            start = parser.pos
+            start += 2 if data[start:start + 2] == b'\r\n' else 1
+            length = self.resolve(obj.get('Length'))
+            if not isinstance(length, int) or data[start + length:start + length + 20].strip()[:9] != b'endstream':
+                length = data.index(b'endstream', start) - start
+                while length and data[start + length - 1] in b'\r\n':
+                    length -= 1
+            obj = PdfStream(obj, data[start:start + length])
+        return obj
+
+    @property
+    def root(self):
+        return self.resolve(self.trailer['Root'])
+
+    def pages(self):
+        """Page dictionaries in order, with inherited attributes filled in"""
+        inheritable = ('Resources', 'MediaBox', 'CropBox', 'Rotate')
+        result = []
+        stack = [(self.root['Pages'], {})]
+        while stack:
+            node_ref, inherited = stack.pop()
+            node = self.resolve(node_ref)
+            if node.get('Type') == 'Pages':
+                inherited = dict(inherited, **{k: node[k] for k in inheritable if k in node})
+                stack.extend((kid, inherited) for kid in reversed(node['Kids']))
+            else:
+                page = dict(inherited)
+                page.update(node)
+                result.append(page)
+        return result
+
+    def page_refs(self):
+        """References to the page objects, in the same order as pages()"""
+        result = []
+        stack = [self.root['Pages']]
+        while stack:
+            ref = stack.pop()
+            node = self.resolve(ref)
+            if node.get('Type') == 'Pages':
+                stack.extend(reversed(node['Kids']))
+            else:
+                result.append(ref)
+        return result
+
+class PdfWriter:
+    """Writes objects to a binary stream as they are added, then the xref"""
+
+    def __init__(self, f, version='1.4'):
+        self.f = f
+        self.pos = 0
+        self.offsets = {}
+        self.next_num = 1
+        self._write(b'%%PDF-%s\n%%\xe2\xe3\xcf\xd3\n' % version.encode('ascii'))
+
+    def _write(self, data):
+        self.f.write(data)
+        self.pos += len(data)
+
+    def reserve(self):
+        """Allocate an object number to be written later"""
+        ref = PdfRef(self.next_num)
+        self.next_num += 1
+        return ref
+
+    def write_serialized(self, data, ref=None):
+        if ref is None:
+            ref = self.reserve()
+        self.offsets[ref.num] = self.pos
+        self._write(b'%d 0 obj\n' % ref.num + data + b'\nendobj\n')
+        return ref
+
+    def write(self, obj, ref=None):
+        return self.write_serialized(serialize_pdf(obj), ref)
+
+    def close(self, root, info=None, file_id=None):
+        """Write the xref table and trailer"""
+        xref_pos = self.pos
+        size = self.next_num
+        lines = [b'xref\n0 %d\n' % size, b'0000000000 65535 f \n']
+        for num in range(1, size):
+            offset = self.offsets.get(num)
+            lines.append(b'%010d 00000 n \n' % offset if offset is not None else b'0000000000 65535 f \n')
+        trailer = {PdfName('Root'): root, PdfName('Size'): size}
+        if info is not None:
+            trailer[PdfName('Info')] = info
+        if file_id is not None:
+            trailer[PdfName('ID')] = [PdfString(file_id), PdfString(file_id)]
+        lines.append(b'trailer\n' + serialize_pdf(trailer) + b'\nstartxref\n%d\n%%%%EOF\n' % xref_pos)
+        self._write(b''.join(lines))
+
+def pdf_date(timestamp=None):
+    """A PDF date string in UTC"""
+    return time.strftime("D:%Y%m%d%H%M%S+00'00'", time.gmtime(timestamp))
+
+class PdfUpdate:
+    """An incremental update to an existing PDF.
+
+    Objects written here (new ones, or new versions of the reader's) are
+    appended after the original bytes with an xref section that chains to
+    the original one through /Prev, so the original file is reused as is.
+    """
+
+    def __init__(self, reader):
+        self.reader = reader
+        self.next_num = reader.trailer['Size']
+        self.objects = {}
+
+    def reserve(self):
+        ref = PdfRef(self.next_num)
+        self.next_num += 1
+        return ref
+
+    def write_serialized(self, data, ref=None):
+        if ref is None:
+            ref = self.reserve()
+        self.objects[ref.num] = data
+        return ref
+
+    def write(self, obj, ref=None):
+        return self.write_serialized(serialize_pdf(obj), ref)
+
+    def tail(self):
+        """The bytes to append to the original file"""
+        base = len(self.reader.data)
+        out = bytearray(b'' if self.reader.data.endswith(b'\n') else b'\n')
+        offsets = {}
+        for num, data in self.objects.items():
+            offsets[num] = base + len(out)
+            out += b'%d 0 obj\n' % num + data + b'\nendobj\n'
+        xref_pos = base + len(out)
+        out += b'xref\n'
+        nums = sorted(offsets)
+        start = 0
+        while start < len(nums):
+            end = start + 1
+            while end < len(nums) and nums[end] == nums[end - 1] + 1:
+                end += 1
+            out += b'%d %d\n' % (nums[start], end - start)
+            out += b''.join(b'%010d 00000 n \n' % offsets[num] for num in nums[start:end])
+            start = end
+        trailer = {k: v for k, v in self.reader.trailer.items() if k not in ('Prev', 'XRefStm')}
+        trailer[PdfName('Size')] = self.next_num
+        trailer[PdfName('Prev')] = self.reader.startxref
+        if 'ID' in trailer:
+            # Same document, new revision: keep the permanent half of the ID
+            trailer[PdfName('ID')] = [trailer['ID'][0], PdfString(hashlib.md5(out).digest())]
+        out += b'trailer\n' + serialize_pdf(trailer) + b'\nstartxref\n%d\n%%%%EOF\n' % xref_pos
+        return bytes(out)
+
+class PdfCopier:
+    """Copies objects out of PdfReaders into a PdfWriter (or PdfUpdate).
+
+    Objects are written depth-first and keyed by a hash of their serialised
+    bytes, so identical fonts, images and forms coming from different
+    source files are written once and shared (fonts ignoring their
+    obsolete /Name). transform, if given, is
+    applied to every stream before it is written (see recompress_stream).
+    """
+
+    def __init__(self, writer, transform=None):
+        self.writer = writer
+        self.transform = transform
+        self._written = {}
+
+    def copy(self, reader, obj, mapping):
+        """obj with every reference it holds copied over; mapping records what went where"""
+        if isinstance(obj, PdfRef):
+            return self._import(reader, obj, mapping)
+        if isinstance(obj, dict):
+            # A font's /Name is the per-file resource name ReportLab picked
+            # (F1, F2, ...); it is obsolete and would keep equal fonts apart
+            font = obj.get('Type') == 'Font'
+            return {k: self.copy(reader, v, mapping) for k, v in obj.items()
+                    if not (font and k == 'Name')}
+        if isinstance(obj, list):
+            return [self.copy(reader, v, mapping) for v in obj]
+        if isinstance(obj, PdfStream):
+            if obj.dict.get('Subtype') == 'Form':
+                obj = _prune_form_fonts(reader, obj)
+            stream = PdfStream(self.copy(reader, obj.dict, mapping), obj.data)
+            return self.transform(stream) if self.transform else stream
+        return obj
+
+    def _import(self, reader, ref, mapping):
+        if ref in mapping:
+            new = mapping[ref]
+            if new is None:
+                raise PdfError(f"Reference cycle through object {ref.num}")
+            return new
+        mapping[ref] = None
+        data = serialize_pdf(self.copy(reader, reader.get(ref), mapping))
+        key = hashlib.sha256(data).digest()
+        new = self._written.get(key)
+        if new is None:
+            new = self._written[key] = self.writer.write_serialized(data)
+        mapping[ref] = new
+        return new
+
+_TF_OPERATOR = re.compile(rb'/([^\s/\[\]()<>{}%]+)\s+[-+\d.]+\s+Tf\b')
+
+def _prune_form_fonts(reader, stream):
+    """stream with its font resources cut down to the fonts it selects.
+
+    ReportLab points every form at the whole font dictionary of its file,
+    which differs from one single-page PDF to the next even when the form
+    itself does not; without pruning the same form is written per page.
+    """
+    resources = reader.resolve(stream.dict.get('Resources'))
+    fonts = reader.resolve(resources.get('Font')) if isinstance(resources, dict) else None
+    if not isinstance(fonts, dict):
+        return stream
+    decoded = decode_stream(stream)
+    if decoded is None or decoded[1]:
+        return stream
+    used = {PdfName(name.decode('latin-1')) for name in _TF_OPERATOR.findall(decoded[0])}
+    resources = dict(resources)
+    resources[PdfName('Font')] = {k: v for k, v in fonts.items() if k in used}
+    dictionary = dict(stream.dict)
+    dictionary[PdfName('Resources')] = resources
+    return PdfStream(dictionary, stream.data)
+
+class PdfMerger(PdfCopier):
+    """Copies pages from any number of PDFs into a PdfWriter, sharing identical objects"""
+
+    def __init__(self, writer, transform=None):
+        super().__init__(writer, transform)
+        self.pages_ref = writer.reserve()
+        self.page_refs = []
+
+    def add_page(self, reader, page):
+        mapping = {}
+        page = {k: v for k, v in page.items() if k != 'Parent'}
+        page = self.copy(reader, page, mapping)
+        page[PdfName('Parent')] = self.pages_ref
+        # Page objects are never shared: each occurrence is its own page
+        ref = self.writer.write(page)
+        self.page_refs.append(ref)
+        return ref
+
+    def add_document(self, reader):
+        for page in reader.pages():
+            self.add_page(reader, page)
+
+    def close(self, info=None):
+        writer = self.writer
+        writer.write({PdfName('Type'): PdfName('Pages'), PdfName('Kids'): self.page_refs,
+                      PdfName('Count'): len(self.page_refs)}, self.pages_ref)
+        root = writer.write({PdfName('Type'): PdfName('Catalog'), PdfName('Pages'): self.pages_ref})
+        if info is None:
+            now = PdfString(pdf_date().encode('ascii'))
+            info = {PdfName('Producer'): PdfString(b'ReportLab PDF Library - www.reportlab.com'),
+                    PdfName('CreationDate'): now, PdfName('ModDate'): now}
+        info_ref = writer.write(info)
+        file_id = hashlib.md5(b''.join(b'%d' % r.num for r in self.page_refs) + b'%d' % writer.pos).digest()
+        writer.close(root, info_ref, file_id)
+
+# ==================== PAGE CACHE ====================
+#
+# Incremental builds: every page is rendered on its own to a one-page PDF
+# and cached under a fingerprint of its plan primitives and the images they
+# use. A rebuild re-renders only pages whose fingerprint changed and
+# stitches the rest back together from the cache.
+
+# Bump when replay would draw the same primitives differently
+PAGE_FORMAT_VERSION = 2
+
+def page_fingerprint(ops, use_forms=True, compress_level=None):
+    """Hash of everything that determines a rendered page (compress_level defaults to SAVE_OPTIONS')"""
+    if compress_level is None:
+        compress_level = SAVE_OPTIONS.compress_level
+    h = hashlib.sha256(f"{PLAN_VERSION}:{PAGE_FORMAT_VERSION}:{reportlab.Version}:{int(use_forms)}:"
+                       f"{compress_level}".encode('utf-8'))
+    h.update(json.dumps(ops, separators=(',', ':')).encode('utf-8'))
+    for img_path, _, _ in placed_images(ops):
+        try:
+            h.update(file_digest(img_path).encode('ascii'))
+        except OSError:
+            h.update(b'missing')
+    return h.hexdigest()
+
+def render_page_pdf(ops, pagesize, use_forms=True):
+    """Render one plan page as a standalone one-page PDF"""
+    buf = io.BytesIO()
+    c = canvas.Canvas(buf, pagesize=tuple(pagesize))
+    PlanReplayer(c, use_forms).draw_page(ops)
+    c.showPage()
+    with span('save', 'save'):
+        save_canvas(c)
+    return buf.getvalue()
+
+def cached_page_pdf(ops, pagesize, use_forms=True, cache_dir=PAGE_CACHE_DIR):
+    """Return (pdf_bytes, rendered) for a page, rendering it only on a cache miss"""
+    path = os.path.join(cache_dir, page_fingerprint(ops, use_forms) + '.pdf')
+    try:
+        with open(path, 'rb') as f:
+            return f.read(), False
+    except FileNotFoundError:
+        pass
+    data = render_page_pdf(ops, pagesize, use_forms)
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return data, True
+
+def merge_pdfs(sources, output):
+    """Concatenate the pages of several PDFs (bytes) into output (path or binary stream)"""
+    readers = [PdfReader(data) for data in sources]
+    version = max(reader.version for reader in readers)
+    f = open(output, 'wb') if isinstance(output, str) else output
+    try:
+        merger = PdfMerger(PdfWriter(f, version))
+        for reader in readers:
+            merger.add_document(reader)
+        merger.close()
+    finally:
+        if f is not output:
+            f.close()
+
+def _binary_writer(output):
+    """Sockets are written through a buffered file wrapper; anything else with write() is used as is"""
+    if not hasattr(output, 'write') and hasattr(output, 'makefile'):
+        return output.makefile('wb')
+    return output
+
+def stream_profile_pdf(output, content=None, plan=None, dpi=None, use_forms=True, cache_dir=None):
+    """Write the profile to a binary stream (file object, stdout, pipe, socket) page by page.
+
+    Each page is rendered to its own one-page PDF, copied into the output and
+    flushed before the next page is started, so memory is bounded by a single
+    page and a reader at the other end sees bytes as soon as page one is done.
+    Objects shared between pages (forms, fonts, images) are written once. With
+    a cache_dir, unchanged pages are taken from the page cache. Without a
+    plan, the pages of content are laid out as they are written (lazy_plan).
+
+    Returns the number of pages that actually had to be rendered.
+    """
+    if plan is None:
+        plan = lazy_plan(content, dpi)
+    elif dpi:
+        plan = prepare_assets(plan, dpi)
+    f = _binary_writer(output)
+    flush = getattr(f, 'flush', None)
+    writer = PdfWriter(f)
+    merger = PdfMerger(writer)
+    inst = _INSTRUMENT
+    rendered = 0
+    for ops in plan['pages']:
+        if cache_dir is None:
+            data, fresh = render_page_pdf(ops, plan['pagesize'], use_forms), True
+        else:
+            data, fresh = cached_page_pdf(ops, plan['pagesize'], use_forms, cache_dir)
+        pos = writer.pos
+        with span('merge_page', 'save'):
+            merger.add_document(PdfReader(data))
+        rendered += fresh
+        if inst is not None:
+            count_event('pages_from_cache', not fresh)
+            if fresh and inst.pages:
+                inst.pages[-1]['output_bytes'] = writer.pos - pos
+        del data
+        if flush is not None:
+            flush()
+    merger.close()
+    if flush is not None:
+        flush()
+    return rendered
+
+def build_profile_pdf(output_path, content=None, verbose=True, plan=None, dpi=None, use_forms=True,
+                      cache_dir=PAGE_CACHE_DIR):
+    """Incrementally render the profile, reusing cached pages.
+
+    Returns the number of pages that actually had to be rendered.
+    """
+    if plan is None:
+        plan = get_plan(content)
+    if dpi:
+        plan = prepare_assets(plan, dpi)
+    if isinstance(output_path, str):
+        with open(output_path, 'wb') as f:
+            rendered = stream_profile_pdf(f, plan=plan, use_forms=use_forms, cache_dir=cache_dir)
+    else:
+        rendered = stream_profile_pdf(output_path, plan=plan, use_forms=use_forms, cache_dir=cache_dir)
+    if verbose:
+        report_render(plan, output_path, f" ({rendered} of {len(plan['pages'])} pages rendered)")
+    return rendered
+
+# ==================== OUTPUT PROFILES ====================
+#
+# --profile trades size against fidelity. Images are resampled through the
+# asset cache, then the rendered PDF goes back through PdfReader/PdfMerger:
+# streams are re-encoded (reportlab's ASCII85 layer dropped, Flate at the
+# profile's level), identical objects are written once, and the web profile
+# is linearized so a viewer can show page one before the rest has arrived.
+
+class OutputProfile(NamedTuple):
+    dpi: int             # resample placed images to this resolution
+    jpeg_quality: int
+    compress_level: int  # zlib level for re-encoded streams
+    linearize: bool
+
+OUTPUT_PROFILES = {
+    'print': OutputProfile(dpi=300, jpeg_quality=95, compress_level=9, linearize=False),
+    'web': OutputProfile(dpi=150, jpeg_quality=85, compress_level=9, linearize=True),
+    'email': OutputProfile(dpi=110, jpeg_quality=75, compress_level=9, linearize=False),
+}
+
+_REENCODABLE_FILTERS = ('ASCII85Decode', 'FlateDecode')
+
+def decode_stream(stream):
+    """(data, filters left) after undoing a stream's leading ASCII85/Flate layers.
+
+    None for streams with decode parameters or that fail to decode.
+    """
+    if 'DecodeParms' in stream.dict:
+        return None
+    filters = stream.dict.get('Filter') or []
+    if not isinstance(filters, list):
+        filters = [filters]
+    data = stream.data
+    try:
+        while filters and filters[0] in _REENCODABLE_FILTERS:
+            if filters[0] == 'ASCII85Decode':
+                data = base64.a85decode(data.strip(), adobe=True)
+            else:
+                data = zlib.decompress(data)
+            filters = filters[1:]
+    except (ValueError, zlib.error):
+        return None
+    return data, filters
+
+def recompress_stream(stream, level=9):
+    """Undo ASCII85/Flate layers and deflate again at level.
+
+    Image data under another filter (DCTDecode) keeps that filter without
+    the text encoding. Streams with decode parameters, or that would not
+    get smaller, are returned unchanged.
+    """
+    decoded = decode_stream(stream)
+    if decoded is None:
+        return stream
+    data, filters = decoded
+    if not filters:
+        data = zlib.compress(data, level)
+        filters = [PdfName('FlateDecode')]
+    if len(data) >= len(stream.data):
+        return stream
+    dictionary = dict(stream.dict)
+    dictionary[PdfName('Filter')] = filters[0] if len(filters) == 1 else filters
+    return PdfStream(dictionary, data)
+
+def optimize_pdf(data, compress_level=9, linearize=False):
+    """Re-encode streams, write identical objects once and optionally linearize"""
+    reader = PdfReader(data)
+    buf = io.BytesIO()
+    merger = PdfMerger(PdfWriter(buf, reader.version), lambda stream: recompress_stream(stream, compress_level))
+    merger.add_document(reader)
+    info = reader.resolve(reader.trailer.get('Info'))
+    merger.close(merger.copy(reader, info, {}) if info else None)
+    return linearize_pdf(buf.getvalue()) if linearize else buf.getvalue()
+
+def _pdf_refs(obj):
+    """References held by an object, in serialisation order (Parent links excluded)"""
+    if isinstance(obj, PdfRef):
+        yield obj
+    elif isinstance(obj, dict):
+        for key, value in obj.items():
+            if key != 'Parent':
+                yield from _pdf_refs(value)
+    elif isinstance(obj, list):
+        for value in obj:
+            yield from _pdf_refs(value)
+    elif isinstance(obj, PdfStream):
+        yield from _pdf_refs(obj.dict)
+
+class _BitWriter:
+    """Big-endian bit packing for the linearization hint tables"""
+
+    def __init__(self):
+        self.value = 0
+        self.nbits = 0
+
+    def write(self, value, nbits):
+        self.value = (self.value << nbits) | value
+        self.nbits += nbits
+
+    def align(self):
+        self.write(0, -self.nbits % 8)
+
+    def getvalue(self):
+        self.align()
+        return self.value.to_bytes(self.nbits // 8, 'big')
+
+def _hint_tables(pages, first, shared, page_shared, offset, length, end_of_first_page):
+    """Page offset and shared object hint tables (PDF 1.7 Annex F.4).
+
+    pages lists each page's objects (page object first; for page one, the
+    whole first-page section), first/shared are the shared object table
+    entries, page_shared the table indices each page uses. offset/length
+    give each object's position ignoring the hint stream itself. Content
+    stream positions are approximated by the whole page, as qpdf does.
+    Returns (stream data, offset of the shared object table).
+    """
+    starts = [offset[objs[0]] for objs in pages]
+    ends = [end_of_first_page] + [offset[objs[-1]] + length[objs[-1]] for objs in pages[1:]]
+    counts = [len(objs) for objs in pages]
+    lengths = [end - start for start, end in zip(starts, ends)]
+    least_count, least_length = min(counts), min(lengths)
+    count_bits = (max(counts) - least_count).bit_length()
+    length_bits = (max(lengths) - least_length).bit_length()
+    nshared_bits = max(len(ids) for ids in page_shared).bit_length()
+    id_bits = max((i for ids in page_shared for i in ids), default=0).bit_length()
+
+    w = _BitWriter()
+    for value, nbits in ((least_count, 32), (starts[0], 32), (count_bits, 16), (least_length, 32),
+                         (length_bits, 16), (0, 32), (0, 16), (least_length, 32), (length_bits, 16),
+                         (nshared_bits, 16), (id_bits, 16), (0, 16), (4, 16)):
+        w.write(value, nbits)
+    for values, least, nbits in ((counts, least_count, count_bits), (lengths, least_length, length_bits),
+                                 ([len(ids) for ids in page_shared], 0, nshared_bits)):
+        for value in values:
+            w.write(value - least, nbits)
+        w.align()
+    for ids in page_shared:
+        for i in ids:
+            w.write(i, id_bits)
+    w.align()
+    # Fractional positions (0 bits each) and content stream offsets (0 bits each) take no space
+    for value in lengths:
+        w.write(value - least_length, length_bits)
+    page_table = w.getvalue()
+
+    groups = [length[ref] for ref in first + shared]
+    least_group = min(groups)
+    group_bits = (max(groups) - least_group).bit_length()
+    w = _BitWriter()
+    for value, nbits in ((shared[0] if shared else 0, 32), (offset[shared[0]] if shared else 0, 32),
+                         (len(first), 32), (len(groups), 32), (0, 16), (least_group, 32), (group_bits, 16)):
+        w.write(value, nbits)
+    for value in groups:
+        w.write(value - least_group, group_bits)
+    w.align()
+    for _ in groups:
+        w.write(0, 1)  # no MD5 signatures
+    w.align()
+    return page_table + w.getvalue(), len(page_table)
+
+def linearize_pdf(data):
+    """Rewrite a PDF with a flat page tree (as PdfMerger writes it) in linearized form.
+
+    Layout per PDF 1.7 Annex F: linearization dictionary, first-page xref
+    and trailer, catalog, hint stream, everything page one needs, then each
+    later page's own objects, objects shared between later pages, the rest,
+    and the main xref. The first-page section takes the highest object
+    numbers so the main xref covers 0..n.
+    """
+    reader = PdfReader(data)
+    root_ref = reader.trailer['Root']
+    pages_ref = reader.get(root_ref)['Pages']
+    page_refs = reader.get(pages_ref)['Kids']
+    if any(reader.get(ref).get('Type') != 'Page' for ref in page_refs):
+        raise PdfError("Linearization needs a flat page tree")
+
+    def reachable(start, seen):
+        order = []
+        stack = [start]
+        while stack:
+            ref = stack.pop()
+            if ref in seen or reader.get(ref) is None:
+                continue
+            seen.add(ref)
+            order.append(ref)
+            stack.extend(reversed(list(_pdf_refs(reader.get(ref)))))
+        return order
+
+    closures = [reachable(ref, {root_ref, pages_ref}) for ref in page_refs]
+    users = {}
+    for closure in closures:
+        for ref in closure:
+            users[ref] = users.get(ref, 0) + 1
+    first = closures[0]
+    placed = set(first)
+    private = []
+    for closure in closures[1:]:
+        private.append([ref for ref in closure if ref not in placed and users[ref] == 1])
+    placed.update(ref for objs in private for ref in objs)
+    shared = []
+    for closure in closures[1:]:
+        for ref in closure:
+            if ref not in placed:
+                placed.add(ref)
+                shared.append(ref)
+    # The catalog itself opens the first-page section
+    other = reachable(root_ref, placed)[1:]
+    info_ref = reader.trailer.get('Info')
+    if isinstance(info_ref, PdfRef):
+        other += reachable(info_ref, placed)
+
+    # Main section numbered 1..n-1, first-page section n.. in file order
+    main = [ref for objs in private for ref in objs] + shared + other
+    numbers = {ref: PdfRef(i) for i, ref in enumerate(main, 1)}
+    lin_ref = PdfRef(len(main) + 1)
+    numbers[root_ref] = PdfRef(len(main) + 2)
+    hint_ref = PdfRef(len(main) + 3)
+    for i, ref in enumerate(first, len(main) + 4):
+        numbers[ref] = PdfRef(i)
+    size = len(main) + 4 + len(first)
+
+    def renumber(obj):
+        if isinstance(obj, PdfRef):
+            return numbers.get(obj)
+        if isinstance(obj, dict):
+            return {k: renumber(v) for k, v in obj.items()}
+        if isinstance(obj, list):
+            return [renumber(v) for v in obj]
+        if isinstance(obj, PdfStream):
+            return PdfStream(renumber(obj.dict), obj.data)
+        return obj
+
+    def wrap(ref, body):
+        return b'%d 0 obj\n' % ref.num + body + b'\nendobj\n'
+
+    blobs = {numbers[ref]: wrap(numbers[ref], serialize_pdf(renumber(reader.get(ref))))
+             for ref in [root_ref] + first + main}
+    file_id = reader.trailer.get('ID')
+
+    def linearization_dict(length, hint, first_page, end, main_xref_item):
+        # Fixed-width numbers, so the section can be laid out before the values are known
+        return wrap(lin_ref, b'<< /Linearized 1 /L %10d /H [ %10d %10d ] /O %10d /E %10d /N %10d /T %10d >>'
+                    % (length, hint[0], hint[1], first_page, end, len(page_refs), main_xref_item))
+
+    def first_page_xref(offsets, prev):
+        lines = [b'xref\n%d %d\n' % (lin_ref.num, size - lin_ref.num)]
+        lines += [b'%010d 00000 n \n' % offsets[num] for num in range(lin_ref.num, size)]
+        trailer = {PdfName('Size'): size, PdfName('Root'): numbers[root_ref]}
+        if isinstance(info_ref, PdfRef):
+            trailer[PdfName('Info')] = numbers[info_ref]
+        if file_id is not None:
+            trailer[PdfName('ID')] = file_id
+        trailer = serialize_pdf(trailer)[:-2] + b' /Prev %10d >>' % prev
+        return b''.join(lines) + b'trailer\n' + trailer + b'\nstartxref\n0\n%%EOF\n'
+
+    header = b'%%PDF-%s\n%%\xe2\xe3\xcf\xd3\n' % reader.version.encode('ascii')
+    lin_pos = len(header)
+    xref1_pos = lin_pos + len(linearization_dict(0, (0, 0), 0, 0, 0))
+    catalog_pos = xref1_pos + len(first_page_xref({num: 0 for num in range(size)}, 0))
+    hint_pos = catalog_pos + len(blobs[numbers[root_ref]])
+
+    # Positions as if the hint stream were absent, as the hint tables require
+    offset, length = {}, {}
+    pos = hint_pos
+    for ref in first + main:
+        new = numbers[ref]
+        offset[new.num], length[new.num] = pos, len(blobs[new])
+        pos += length[new.num]
+    end_of_first_page = offset[numbers[main[0]].num] if main else pos
+    main_xref_pos = pos
+    pages = [[numbers[ref].num for ref in first]] + [[numbers[ref].num for ref in objs] for objs in private]
+    table_index = {numbers[ref].num: i for i, ref in enumerate(first + shared)}
+    page_shared = [[]] + [sorted(table_index[numbers[ref].num] for ref in closure if numbers[ref].num in table_index)
+                          for closure in closures[1:]]
+    hint_data, shared_table_pos = _hint_tables(
+        pages, [numbers[ref].num for ref in first], [numbers[ref].num for ref in shared],
+        page_shared, offset, length, end_of_first_page)
+    hint = wrap(hint_ref, serialize_pdf(PdfStream({PdfName('S'): shared_table_pos,
+                                                   PdfName('Filter'): PdfName('FlateDecode')},
+                                                  zlib.compress(hint_data, 9))))
+    shift = len(hint)
+
+    main_xref = [b'xref\n0 %d\n' % (len(main) + 1), b'0000000000 65535 f \n']
+    main_xref += [b'%010d 00000 n \n' % (offset[num] + shift) for num in range(1, len(main) + 1)]
+    main_trailer = {PdfName('Size'): len(main) + 1}
+    if file_id is not None:
+        main_trailer[PdfName('ID')] = file_id
+    tail = b''.join(main_xref) + b'trailer\n' + serialize_pdf(main_trailer) + b'\nstartxref\n%d\n%%%%EOF\n' % xref1_pos
+    main_xref_pos += shift
+    total = main_xref_pos + len(tail)
+
+    offsets = {lin_ref.num: lin_pos, numbers[root_ref].num: catalog_pos, hint_ref.num: hint_pos}
+    offsets.update((num, offset[num] + shift) for num in pages[0])
+    out = [header,
+           linearization_dict(total, (hint_pos, shift), numbers[page_refs[0]].num, end_of_first_page + shift,
+                              main_xref_pos + len(b'xref\n0 %d' % (len(main) + 1))),
+           first_page_xref(offsets, main_xref_pos), blobs[numbers[root_ref]], hint]
+    out += [blobs[numbers[ref]] for ref in first + main]
+    out.append(tail)
+    result = b''.join(out)
+    assert len(result) == total
+    return result
+
+def render_profile_pdf(output_path, profile, content=None, verbose=True, plan=None, dpi=None, use_forms=True):
+    """Render with one of OUTPUT_PROFILES; returns (size in bytes, seconds)"""
+    settings = OUTPUT_PROFILES[profile]
+    start = time.perf_counter()
+    if plan is None:
+        plan = get_plan(content)
+    plan = prepare_assets(plan, dpi or settings.dpi, settings.jpeg_quality)
+    data = optimize_pdf(render_pdf_bytes(plan=plan, use_forms=use_forms), settings.compress_level,
+                        settings.linearize)
+    if isinstance(output_path, str):
+        with open(output_path, 'wb') as f:
+            f.write(data)
+    else:
+        output_path.write(data)
+        output_path.flush()
+    seconds = time.perf_counter() - start
+    if verbose:
+        report_render(plan, output_path, f" ({profile} profile: {len(data) / 1024:.1f} KiB in {seconds * 1000:.0f} ms)")
+    return len(data), seconds
+
+# ==================== OUTPUT CACHE ====================
+#
+# --output-cache keeps finished PDFs on disk, keyed by a hash of every
+# page's fingerprint (plan primitives, image contents, renderer versions)
+# plus the output options, so a repeat request is a file read. Entries are
+# evicted least recently used (file mtime is the clock) once the directory
+# passes its size cap. Stores, eviction and the persisted hit/miss counters
+# run under an flock on the cache directory, so batch workers, the render
+# service and one-off renders can share one cache.
+
+OUTPUT_CACHE_DIR = os.path.join(CACHE_DIR, 'output')
+OUTPUT_CACHE_MAX_BYTES = 512 << 20
+# Bump when the same plan and options would produce a different file
+OUTPUT_CACHE_VERSION = 2
+
+fcntl = _LazyModule('fcntl')
+
+def output_key(plan, dpi=None, use_forms=True, profile=None, compress_level=None):
+    """Hash of everything that determines the finished PDF for plan and these options"""
+    if compress_level is None:
+        compress_level = SAVE_OPTIONS.compress_level
+    h = hashlib.sha256(f"{OUTPUT_CACHE_VERSION}:{dpi or 0}:{profile or '-'}:{compress_level}:"
+                       f"{plan['pagesize']}".encode('utf-8'))
+    for ops in plan['pages']:
+        h.update(page_fingerprint(ops, use_forms, compress_level).encode('ascii'))
+    return h.hexdigest()
+
+class OutputCache:
+    """Finished PDFs under cache_dir, evicted least recently used past max_bytes"""
+
+    STATS = ('hits', 'misses', 'stores', 'evictions')
+
+    def __init__(self, cache_dir=OUTPUT_CACHE_DIR, max_bytes=OUTPUT_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + '.pdf')
+
+    @contextlib.contextmanager
+    def _locked(self):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with open(os.path.join(self.cache_dir, '.lock'), 'a+b') as f:
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            except ImportError:
+                pass  # no flock on Windows; entries are still replaced atomically
+            yield
+
+    def _entries(self):
+        """(mtime_ns, size, path) for every cached PDF"""
+        entries = []
+        with contextlib.suppress(FileNotFoundError), os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if entry.name.endswith('.pdf'):
+                    with contextlib.suppress(FileNotFoundError):
+                        st = entry.stat()
+                        entries.append((st.st_mtime_ns, st.st_size, entry.path))
+        return entries
+
+    def _read_counters(self):
+        try:
+            with open(os.path.join(self.cache_dir, 'stats.json'), encoding='utf-8') as f:
+                counters = json.load(f)
+        except (OSError, ValueError):
+            counters = {}
+        return {name: counters.get(name, 0) for name in self.STATS}
+
+    def _add_counters(self, **counts):
+        """Add to the persisted counters; call with the lock held"""
+        counters = self._read_counters()
+        for name, n in counts.items():
+            counters[name] += n
+        path = os.path.join(self.cache_dir, 'stats.json')
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(counters, f)
+        os.replace(tmp_path, path)
+
+    def _record(self, **counts):
+        for name, n in counts.items():
+            count_event(f'output_cache_{name}', n)
+        with self._locked():
+            self._add_counters(**counts)
+
+    def _evict(self, max_bytes):
+        """Delete the least recently used entries until the total fits; call with the lock held"""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        evicted = 0
+        for _, size, path in entries:
+            if total <= max_bytes:
+                break
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(path)
+            total -= size
+            evicted += 1
+        return evicted
+
+    def get(self, key):
+        """The cached PDF bytes for key, or None"""
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            self._record(misses=1)
+            return None
+        # An entry evicted since the read just misses the next time
+        with contextlib.suppress(OSError):
+            os.utime(path)
+        self._record(hits=1)
+        return data
+
+    def put(self, key, data):
+        """Store data under key, then evict down to max_bytes. Returns the number of entries evicted."""
+        if len(data) > self.max_bytes:
+            return 0
+        path = self._path(key)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        with self._locked():
+            os.replace(tmp_path, path)
+            evicted = self._evict(self.max_bytes)
+            self._add_counters(stores=1, evictions=evicted)
+        count_event('output_cache_evictions', evicted)
+        return evicted
+
+    def prune(self, max_bytes=None):
+        """Evict down to max_bytes (default: the cache's own cap); returns the number of entries removed"""
+        with self._locked():
+            evicted = self._evict(self.max_bytes if max_bytes is None else max_bytes)
+            self._add_counters(evictions=evicted)
+        return evicted
+
+    def clear(self):
+        """Remove every entry and reset the counters"""
+        with self._locked():
+            for _, _, path in self._entries():
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(path)
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(os.path.join(self.cache_dir, 'stats.json'))
+
+    def stats(self):
+        with self._locked():
+            counters = self._read_counters()
+            entries = self._entries()
+        lookups = counters['hits'] + counters['misses']
+        return dict(counters, entries=len(entries), bytes=sum(size for _, size, _ in entries),
+                    max_bytes=self.max_bytes, hit_rate=counters['hits'] / lookups if lookups else 0.0)
+
+def render_cached(output_path, content=None, plan=None, dpi=None, use_forms=True, profile=None,
+                  cache=None, verbose=True):
+    """Render like create_profile_pdf (render_profile_pdf with a profile), reusing the output cache.
+
+    Returns True when the PDF came from the cache.
+    """
+    cache = cache or OutputCache()
+    if plan is None:
+        plan = get_plan(content)
+    key = output_key(plan, dpi, use_forms, profile)
+    data = cache.get(key)
+    hit = data is not None
+    if not hit:
+        if profile:
+            buf = io.BytesIO()
+            render_profile_pdf(buf, profile, plan=plan, dpi=dpi, use_forms=use_forms, verbose=False)
+            data = buf.getvalue()
+        else:
+            data = render_pdf_bytes(plan=plan, dpi=dpi, use_forms=use_forms)
+        cache.put(key, data)
+    if isinstance(output_path, str):
+        tmp_path = f"{output_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, output_path)
+    else:
+        output_path.write(data)
+        output_path.flush()
+    if verbose:
+        report_render(plan, output_path, ' (from output cache)' if hit else '')
+    return hit
+
+# ==================== SHARED IMAGE POOL ====================
+#
+# Each process pool worker used to load and encode the brand and client
+# images for itself, so memory and start-up work grew with the worker count.
+# The parent now loads every XObject once and copies the encoded streams into
+# a single shared memory block. Workers map that block and point their
+# XObjects at slices of it, so all of them share one copy of the bytes.
+
+shared_memory = _LazyModule('multiprocessing.shared_memory')
+
+# The mapped block in a pool worker. It stays open for the life of the
+# process because the cached XObjects hold views into it.
+_SHARED_BLOCK = None
+
+@lru_cache(maxsize=None)
+def _shared_xobject_class():
+    """PDFImageXObject whose streamContent is a memoryview into the shared block"""
+
+    class SharedImageXObject(pdfdoc.PDFImageXObject):
+        def format(self, document):
+            # Same object PDFImageXObject.format writes, but PDFStream only
+            # takes str/bytes, so the stream is spliced in from the view
+            content = self.streamContent
+            if not isinstance(document.encrypt, pdfdoc.NoEncryption):
+                content = document.encrypt.encode(bytes(content))
+            dictionary = pdfdoc.PDFDictionary({
+                'Type': pdfdoc.PDFName('XObject'),
+                'Subtype': pdfdoc.PDFName('Image'),
+                'Width': self.width,
+                'Height': self.height,
+                'BitsPerComponent': self.bitsPerComponent,
+                'ColorSpace': pdfdoc.PDFName(self.colorSpace),
+                'Filter': pdfdoc.PDFArray(map(pdfdoc.PDFName, self._filters)),
+                'Length': len(content),
+            })
+            if self.colorSpace == 'DeviceCMYK' and getattr(self, '_dotrans', 0):
+                dictionary['Decode'] = pdfdoc.PDFArray([1, 0, 1, 0, 1, 0, 1, 0])
+            elif getattr(self, '_decode', None):
+                dictionary['Decode'] = pdfdoc.PDFArray(self._decode)
+            if self.mask:
+                dictionary['Mask'] = pdfdoc.PDFArray(self.mask)
+            if getattr(self, 'smask', None):
+                dictionary['SMask'] = self.smask
+            return pdfdoc.format(dictionary, document) + b'\nstream\n' + content + b'endstream\n'
+
+    return SharedImageXObject
+
+def shared_image_paths(dpi=None):
+    """Images under IMAGES_DIR, plus the default plan's resampled assets at dpi"""
+    paths = [os.path.join(IMAGES_DIR, name) for name in sorted(os.listdir(IMAGES_DIR))
+             if name.lower().endswith(('.jpeg', '.jpg', '.png'))]
+    if dpi:
+        paths += [op[1] for ops in prepare_assets(get_plan(), dpi)['pages'] for op in ops if op[0] in IMAGE_OPS]
+    return list(dict.fromkeys(paths))
+
+class SharedImagePool:
+    """Encoded image XObjects for paths, held in one shared memory block.
+
+    Entries are (path, name, xobject, smask) where each object is a
+    (shell, offset, length) triple: the XObject without its stream, and
+    where the stream sits in the block. Unreadable images are left out.
+    """
+
+    def __init__(self, paths):
+        entries, chunks, size = [], [], 0
+        for path in paths:
+            try:
+                name, xobj, smask = load_image_xobject(path)
+            except Exception:
+                continue
+            parts = []
+            for obj in (xobj, smask):
+                if obj is None:
+                    parts.append(None)
+                    continue
+                data = pdfdoc.pdfdocEnc(obj.streamContent)
+                shell = copy.copy(obj)
+                shell.streamContent = None
+                parts.append((shell, size, len(data)))
+                chunks.append(data)
+                size += len(data)
+            entries.append((path, name, *parts))
+        self.block = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        offset = 0
+        for data in chunks:
+            self.block.buf[offset:offset + len(data)] = data
+            offset += len(data)
+        self.entries = entries
+        self.size = size
+
+    def initargs(self):
+        return (self.block.name, self.entries)
+
+    def close(self):
+        self.block.close()
+        self.block.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def _init_shared_worker(block_name, entries):
+    """Map the parent's image pool, then load anything it did not cover as usual"""
+    global _SHARED_BLOCK
+    try:
+        # Workers share the parent's resource tracker, which unlinks the
+        # block only if the parent never gets to
+        _SHARED_BLOCK = shared_memory.SharedMemory(name=block_name)
+    except OSError:
+        entries = ()
+    else:
+        cls = _shared_xobject_class()
+        for path, name, *parts in entries:
+            objs = []
+            for part in parts:
+                if part is None:
+                    objs.append(None)
+                    continue
+                obj, offset, length = part
+                obj.__class__ = cls
+                obj.streamContent = _SHARED_BLOCK.buf[offset:offset + length]
+                objs.append(obj)
+            _IMAGE_XOBJECTS[path] = (name, *objs)
+    _init_batch_worker()
+
+@contextlib.contextmanager
+def shared_image_workers(paths):
+    """Yield (initializer, initargs) for a process pool sharing the images at paths.
+
+    Falls back to per-worker loading where shared memory is unavailable.
+    """
+    try:
+        pool = SharedImagePool(paths)
+    except OSError:
+        yield _init_batch_worker, ()
+        return
+    with pool:
+        yield _init_shared_worker, pool.initargs()
+
+# ==================== PARALLEL PAGES ====================
+#
+# --parallel splits one document's pages into contiguous groups. Each group
+# is rendered to its own PDF in a worker process, and PdfMerger stitches the
+# groups together, writing the fonts, images and forms they share only once.
+# The workers map the shared image pool, so a long catalogue does not pay
+# for every worker encoding every image.
+
+def _page_group_job(job):
+    pages, pagesize, use_forms = job
+    buf = io.BytesIO()
+    c = canvas.Canvas(buf, pagesize=tuple(pagesize))
+    replay_plan(c, {'pages': pages}, use_forms)
+    with span('save', 'save'):
+        save_canvas(c)
+    return buf.getvalue()
+
+def page_groups(pages, workers, group_size=None):
+    """Split pages into contiguous groups, one per worker unless group_size is given"""
+    size = group_size or max(1, math.ceil(len(pages) / workers))
+    return [pages[i:i + size] for i in range(0, len(pages), size)]
+
+def render_parallel_pdf(output_path, content=None, verbose=True, plan=None, dpi=None, use_forms=True,
+                        workers=None, group_size=None):
+    """Render page groups across worker processes and merge them into output_path.
+
+    Returns the number of groups rendered.
+    """
+    if plan is None:
+        plan = get_plan(content)
+    if dpi:
+        plan = prepare_assets(plan, dpi)
+    workers = workers or os.cpu_count() or 1
+    jobs = [(group, plan['pagesize'], use_forms) for group in page_groups(plan['pages'], workers, group_size)]
+    if len(jobs) == 1:
+        sources = [_page_group_job(jobs[0])]
+    else:
+        images = list(dict.fromkeys(img_path for ops in plan['pages'] for img_path, _, _ in placed_images(ops)))
+        with shared_image_workers(images) as (initializer, initargs), \
+                futures.ProcessPoolExecutor(max_workers=min(workers, len(jobs)), initializer=initializer,
+                                            initargs=initargs) as pool:
+            sources = list(pool.map(_page_group_job, jobs))
+    with span('merge', 'save'):
+        merge_pdfs(sources, output_path)
+    if verbose:
+        report_render(plan, output_path, f" ({len(jobs)} page groups on {min(workers, len(jobs))} workers)")
+    return len(jobs)
+
+# ==================== BATCH RENDERING ====================
+
+def _parse_manifest_value(value):
+    """CSV cells holding JSON lists/objects (stats, clients) are decoded, others kept as text"""
+    value = value.strip()
+    if value[:1] in ('[', '{'):
+        return json.loads(value)
+    return value
+
+def load_manifest(manifest_path):
+    """Read per-recipient overrides from a CSV or JSONL manifest.
+
+    Each row is a dict of ProfileContent field overrides plus an optional
+    'output' file name.
+    """
+    rows = []
+    with open(manifest_path, newline='', encoding='utf-8') as f:
+        if manifest_path.lower().endswith(('.jsonl', '.ndjson')):
+            for line in f:
+                if line.strip():
+                    rows.append(json.loads(line))
+        else:
+            for row in csv.DictReader(f):
+                # Empty cells keep the default rather than blanking the field
+                rows.append({k: _parse_manifest_value(v) for k, v in row.items() if v and v.strip()})
+    return rows
+
+def _batch_output_names(rows):
+    """File name of each row's profile, unique within the manifest.
+
+    An explicit 'output' used by two rows is a ValueError. Default names
+    come from the recipient (the row number without one), and a name
+    already taken gets a -2, -3, ... suffix.
+    """
+    taken = set()
+    for i, row in enumerate(rows, 1):
+        if row.get('output'):
+            name = os.path.normcase(row['output'])
+            if name in taken:
+                raise ValueError(f"manifest row {i}: output {row['output']!r} is already used by another row")
+            taken.add(name)
+    names = []
+    for i, row in enumerate(rows, 1):
+        name = row.get('output')
+        if not name:
+            slug = re.sub(r'[^A-Za-z0-9]+', '-', row.get('recipient') or '').strip('-')
+            stem = f"S-Urban_Business_Profile_{slug or i}"
+            name, n = stem + '.pdf', 2
+            while os.path.normcase(name) in taken:
+                name, n = f"{stem}-{n}.pdf", n + 1
+            taken.add(os.path.normcase(name))
+        names.append(name)
+    return names
+
+def _init_batch_worker():
+    """Encode every brand/client image once per worker process"""
+    for name in sorted(os.listdir(IMAGES_DIR)):
+        if name.lower().endswith(('.jpeg', '.jpg', '.png')):
+            try:
+                load_image_xobject(os.path.join(IMAGES_DIR, name))
+            except Exception:
+                pass
+
+def _render_batch_job(job):
+    output_path, overrides, dpi, cache = job
+    if cache is None:
+        create_profile_pdf(output_path, overrides, verbose=False, dpi=dpi)
+    else:
+        render_cached(output_path, overrides, dpi=dpi, cache=cache, verbose=False)
+    return output_path
+
+def render_batch(rows, out_dir, workers=None, chunksize=1, dpi=None, cache=None):
+    """Render one profile per manifest row across a process pool.
+
+    Yields output paths in manifest order as they complete. With an
+    OutputCache, rows already rendered once are copied from it.
+    """
+    rows = list(rows)
+    names = _batch_output_names(rows)
+    os.makedirs(out_dir, exist_ok=True)
+    jobs = []
+    for name, row in zip(names, rows):
+        overrides = {k: v for k, v in row.items() if k != 'output'}
+        resolve_content(overrides)  # fail fast on bad fields before forking
+        jobs.append((os.path.join(out_dir, name), overrides, dpi, cache))
+    with shared_image_workers(shared_image_paths(dpi)) as (initializer, initargs), \
+            futures.ProcessPoolExecutor(max_workers=workers, initializer=initializer, initargs=initargs) as pool:
+        yield from pool.map(_render_batch_job, jobs, chunksize=chunksize)
+
+# ==================== STAMPING ====================
+#
+# Personalised variants usually differ only in the STAMP_FIELDS, which
+# compile_plan draws over otherwise finished pages. `batch --stamp` renders
+# each distinct base document (stamp fields unset) once per worker process,
+# then writes every variant as the base file followed by a PDF incremental
+# update holding, per stamped page, the stamp ops as a Form XObject and a
+# new version of the page object that draws it after the original contents.
+# A variant costs a reportlab render of a few text ops plus a copy of the
+# base bytes.
+
+# Resource name of the stamp form on every stamped page
+STAMP_FORM = 'SurbanStamp'
+# Base documents each process keeps while stamping, most recently used last
+STAMP_BASE_CACHE_SIZE = 8
+
+class StampBase(NamedTuple):
+    data: bytes
+    reader: object      # PdfReader over data
+    pages: list         # page dictionaries, inherited attributes filled in
+    page_refs: list
+    pagesize: list
+
+def stamp_base_content(content):
+    """content with every stamp field unset"""
+    return replace(resolve_content(content), **dict.fromkeys(STAMP_FIELDS))
+
+def render_stamp_base(content=None, dpi=None, use_forms=True):
+    """Render the base document that content's variants are stamped onto"""
+    plan = get_plan(stamp_base_content(content))
+    data = render_pdf_bytes(plan=plan, dpi=dpi, use_forms=use_forms)
+    reader = PdfReader(data)
+    return StampBase(data, reader, reader.pages(), reader.page_refs(), plan['pagesize'])
+
+def render_stamps(stamps, pagesize):
+    """A PDF with one page per entry of stamps ({page index: ops}), in page index order"""
+    buf = io.BytesIO()
+    # Left uncompressed: the streams are tiny and become form contents as they are
+    c = canvas.Canvas(buf, pagesize=tuple(pagesize), pageCompression=0)
+    replayer = PlanReplayer(c, use_forms=False)
+    for i in sorted(stamps):
+        replayer.draw_page(stamps[i])
+        c.showPage()
+    c.save()
+    return buf.getvalue()
+
+def stamp_pdf(base, stamps, output):
+    """Write base with stamps ({page index: ops}) drawn over its pages to output (path or binary stream)"""
+    tail = b''
+    if stamps:
+        reader = base.reader
+        overlay = PdfReader(render_stamps(stamps, base.pagesize))
+        update = PdfUpdate(reader)
+        copier = PdfCopier(update)
+        mapping = {}
+        # Shared by the stamped pages: the original contents run in their own
+        # graphics state, then the page's stamp form is drawn on top
+        before = update.write(PdfStream({}, b'q'))
+        after = update.write(PdfStream({}, b'Q /%s Do' % STAMP_FORM.encode('ascii')))
+        for i, stamp_page in zip(sorted(stamps), overlay.pages()):
+            # reportlab writes a single content stream per page
+            contents = overlay.resolve(stamp_page['Contents'])
+            form = {PdfName('Type'): PdfName('XObject'), PdfName('Subtype'): PdfName('Form'),
+                    PdfName('BBox'): base.pages[i]['MediaBox'],
+                    PdfName('Resources'): copier.copy(overlay, stamp_page['Resources'], mapping)}
+            if 'Filter' in contents.dict:
+                form[PdfName('Filter')] = contents.dict['Filter']
+            form_ref = update.write(PdfStream(form, contents.data))
+
+            node = dict(reader.get(base.page_refs[i]))
+            original = reader.resolve(node['Contents'])
+            resources = dict(reader.resolve(base.pages[i].get('Resources', {})))
+            xobjects = dict(reader.resolve(resources.get('XObject', {})))
+            xobjects[PdfName(STAMP_FORM)] = form_ref
+            resources[PdfName('XObject')] = xobjects
+            node[PdfName('Contents')] = [before, *(original if isinstance(original, list) else [node['Contents']]), after]
+            node[PdfName('Resources')] = resources
+            update.write(node, base.page_refs[i])
+        tail = update.tail()
+    f = open(output, 'wb') if isinstance(output, str) else output
+    try:
+        f.write(base.data)
+        f.write(tail)
+    finally:
+        if f is not output:
+            f.close()
+    return len(base.data) + len(tail)
+
+# Per process: the workers of a stamped batch each keep their own bases
+_STAMP_BASES = OrderedDict()
+
+def stamp_variant(output_path, overrides, dpi=None, use_forms=True):
+    """Write one variant by stamping onto its base, rendering the base if this process has not.
+
+    Returns (output_path, whether a base was rendered).
+    """
+    content = resolve_content(overrides)
+    # Keyed on the row itself: hashing the whole resolved content would cost more than stamping
+    key = json.dumps([{k: v for k, v in overrides.items() if k not in STAMP_FIELDS}, dpi, use_forms], sort_keys=True)
+    base = _STAMP_BASES.get(key)
+    rendered = base is None
+    if rendered:
+        base = _STAMP_BASES[key] = render_stamp_base(content, dpi, use_forms)
+        if len(_STAMP_BASES) > STAMP_BASE_CACHE_SIZE:
+            _STAMP_BASES.popitem(last=False)
+    else:
+        _STAMP_BASES.move_to_end(key)
+    stamps = {page_no: page.ops for page_no, page in layout_stamps(content, len(base.pages)).items()}
+    stamp_pdf(base, stamps, output_path)
+    return output_path, rendered
+
+def _stamp_batch_job(job):
+    return stamp_variant(*job)
+
+def render_stamped_batch(rows, out_dir, workers=None, chunksize=1, dpi=None, use_forms=True):
+    """Render one profile per manifest row by stamping its fields onto a shared base document.
+
+    Rows that agree on everything but the STAMP_FIELDS share a base, which
+    each worker renders the first time one of its rows needs it, so
+    manifests grouped by base stamp best with a larger chunksize. Yields
+    output paths in manifest order.
+    """
+    rows = list(rows)
+    names = _batch_output_names(rows)
+    os.makedirs(out_dir, exist_ok=True)
+    jobs = []
+    for name, row in zip(names, rows):
+        overrides = {k: v for k, v in row.items() if k != 'output'}
+        resolve_content(overrides)  # fail fast on bad fields before forking
+        jobs.append((os.path.join(out_dir, name), overrides, dpi, use_forms))
+    with shared_image_workers(shared_image_paths(dpi)) as (initializer, initargs), \
+            futures.ProcessPoolExecutor(max_workers=workers, initializer=initializer, initargs=initargs) as pool:
+        for path, rendered in pool.map(_stamp_batch_job, jobs, chunksize=chunksize):
+            if rendered:
+                count_event('stamp_bases')
+            count_event('stamped_variants')
+            yield path
+
+# ==================== RASTER EXPORT ====================
+#
+# Page previews (website, CRM) are the PDF pages themselves: each page is
+# rendered to a one-page PDF as the profile is, and MuPDF rasterizes it at
+# every width asked for. Each page/width/format is cached under the page
+# fingerprint and the MuPDF version, so unchanged pages are not redrawn and
+# a change to either renderer never serves a stale preview.
+
+RASTER_CACHE_DIR = os.path.join(CACHE_DIR, 'raster')
+RASTER_WIDTHS = (320, 640, 1280)
+RASTER_FORMATS = ('png', 'webp')
+
+def rasterize_pdf(data, widths):
+    """Rasterize the first page of a PDF (bytes) at each of widths, in pixels; returns RGB images"""
+    doc = pymupdf.open(stream=data, filetype='pdf')
+    try:
+        page = doc[0]
+        images = []
+        for width in widths:
+            scale = width / page.rect.width
+            pix = page.get_pixmap(matrix=pymupdf.Matrix(scale, scale), alpha=False)
+            images.append(Image.frombytes('RGB', (pix.width, pix.height), pix.samples))
+        return images
+    finally:
+        doc.close()
+
+def rasterize_pdf_page(ops, pagesize, width, use_forms=True):
+    """Render one plan page to PDF and rasterize that PDF width pixels wide"""
+    return rasterize_pdf(render_page_pdf(ops, pagesize, use_forms), [width])[0]
+
+def _save_raster(image, path, fmt):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    if fmt == 'webp':
+        image.save(tmp_path, 'WEBP', quality=85)
+    else:
+        image.save(tmp_path, 'PNG')
+    os.replace(tmp_path, path)
+
+def _raster_page_job(job):
+    """Write every width/format of one page, drawing it only if some are not cached"""
+    ops, pagesize, page_no, widths, formats, out_dir, cache_dir = job
+    key = f"{page_fingerprint(ops)[:40]}-mupdf{pymupdf.VersionBind}"
+    wanted = [(width, fmt, os.path.join(cache_dir, f"{key}-{width}.{fmt}")) for width in widths for fmt in formats]
+    missing = [item for item in wanted if not os.path.exists(item[2])]
+    if missing:
+        os.makedirs(cache_dir, exist_ok=True)
+        missing_widths = sorted({width for width, _, _ in missing})
+        images = dict(zip(missing_widths, rasterize_pdf(render_page_pdf(ops, pagesize), missing_widths)))
+        for width, fmt, path in missing:
+            _save_raster(images[width], path, fmt)
+    paths = []
+    for width, fmt, path in wanted:
+        out = os.path.join(out_dir, f"page-{page_no}-{width}.{fmt}")
+        shutil.copyfile(path, out)
+        paths.append(out)
+    return paths, bool(missing)
+
+def export_rasters(plan, out_dir, widths=RASTER_WIDTHS, formats=RASTER_FORMATS, workers=None,
+                   cache_dir=RASTER_CACHE_DIR):
+    """Write page previews for every page of plan at each width and format.
+
+    Pages are drawn in parallel; returns (paths, number of pages drawn).
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    jobs = [(ops, plan['pagesize'], i, tuple(widths), tuple(formats), out_dir, cache_dir)
+            for i, ops in enumerate(plan['pages'], 1)]
+    with futures.ProcessPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(_raster_page_job, jobs))
+    return [path for paths, _ in results for path in paths], sum(drawn for _, drawn in results)
+
+# ==================== VISUAL REGRESSION ====================
+#
+# `regress` renders every page to PDF exactly as the profile is built
+# (replay, Form XObjects, image embedding, save), rasterizes that PDF with
+# MuPDF and compares it with a golden image: a per-pixel difference plus
+# SSIM on luminance, both vectorised with NumPy. Failing pages get a
+# heatmap. Goldens are stored once per distinct image under
+# goldens/images/<sha256>.png, with a small goldens/<variant>.json listing
+# each variant's pages, and a page is only compared once per (page
+# fingerprint, golden) pair. So a manifest of hundreds of recipients costs
+# about as much as its distinct cover pages. Nothing is cached: the point
+# is to catch changes in the code, which no fingerprint covers.
+
+GOLDEN_DIR = os.path.join(SCRIPT_DIR, 'goldens')
+REGRESS_WIDTH = 640
+# A page passes when no SSIM window scores below REGRESS_MIN_SSIM and no
+# more than REGRESS_MAX_CHANGED of its pixels are off by over
+# REGRESS_PIXEL_THRESHOLD (anti-aliasing noise stays well inside both)
+REGRESS_MIN_SSIM = 0.95
+REGRESS_MAX_CHANGED = 0.00005
+REGRESS_PIXEL_THRESHOLD = 24
+# Side of the square SSIM window, in pixels
+SSIM_WINDOW = 7
+
+class PageDiff(NamedTuple):
+    variant: str
+    page: int
+    # 'ok', 'changed', 'new' (no golden) or 'missing' (golden page no longer rendered)
+    status: str
+    ssim: float = None       # mean SSIM over the page
+    worst_ssim: float = None  # lowest-scoring window
+    changed: float = None    # fraction of pixels over the threshold
+    mean_diff: float = None
+    heatmap: str = None
+
+def _png_bytes(image):
+    buf = io.BytesIO()
+    image.save(buf, 'PNG')
+    return buf.getvalue()
+
+def _load_rgb(path):
+    with Image.open(path) as im:
+        return np.asarray(im.convert('RGB'))
+
+def _luma(rgb):
+    return rgb @ np.array([0.299, 0.587, 0.114], dtype=np.float32)
+
+def _box_mean(a, k):
+    """Mean of every k x k window of a, from a 2-D running sum"""
+    s = np.pad(a, ((1, 0), (1, 0))).cumsum(0, dtype=np.float64).cumsum(1)
+    return (s[k:, k:] - s[:-k, k:] - s[k:, :-k] + s[:-k, :-k]) / (k * k)
+
+def ssim_map(x, y, k=SSIM_WINDOW):
+    """Structural similarity of two luminance images over k x k windows"""
+    c1, c2 = (0.01 * 255) ** 2, (0.03 * 255) ** 2
+    mx, my = _box_mean(x, k), _box_mean(y, k)
+    vx = _box_mean(x * x, k) - mx * mx
+    vy = _box_mean(y * y, k) - my * my
+    cov = _box_mean(x * y, k) - mx * my
+    return ((2 * mx * my + c1) * (2 * cov + c2)) / ((mx * mx + my * my + c1) * (vx + vy + c2))
+
+def compare_pages(golden, actual, threshold=REGRESS_PIXEL_THRESHOLD, k=SSIM_WINDOW):
+    """Compare two uint8 RGB arrays.
+
+    Returns (mean SSIM, worst window SSIM, changed fraction, mean abs
+    difference, per-pixel difference); the last is None if sizes differ.
+    """
+    if golden.shape != actual.shape:
+        return 0.0, 0.0, 1.0, 255.0, None
+    # |a - b| without leaving uint8
+    diff = np.maximum(golden, actual) - np.minimum(golden, actual)
+    per_pixel = np.maximum(np.maximum(diff[..., 0], diff[..., 1]), diff[..., 2])
+    # SSIM is exactly 1 wherever a window sees identical pixels, so only the
+    # windows overlapping the bounding box of the differences are computed
+    rows, cols = np.flatnonzero(per_pixel.any(axis=1)), np.flatnonzero(per_pixel.any(axis=0))
+    windows = (golden.shape[0] - k + 1) * (golden.shape[1] - k + 1)
+    if not len(rows):
+        return 1.0, 1.0, 0.0, 0.0, per_pixel
+    top, bottom = max(rows[0] - k + 1, 0), min(rows[-1] + k, golden.shape[0])
+    left, right = max(cols[0] - k + 1, 0), min(cols[-1] + k, golden.shape[1])
+    ssim = ssim_map(_luma(golden[top:bottom, left:right]), _luma(actual[top:bottom, left:right]), k)
+    mean = (ssim.sum() + windows - ssim.size) / windows
+    return float(mean), float(ssim.min()), float((per_pixel > threshold).mean()), float(diff.mean()), per_pixel
+
+def diff_heatmap(actual, per_pixel):
+    """The page dimmed to grey with differing pixels in red, brighter the larger the difference"""
+    grey = _luma(actual) * 0.35
+    heat = np.minimum(per_pixel, 64).astype(np.float32) / 64
+    rgb = np.stack([grey + (255 - grey) * heat, grey * (1 - heat), grey * (1 - heat)], axis=2)
+    return Image.fromarray(rgb.astype(np.uint8))
+
+def _regress_job(job):
+    """Compare one distinct page with its golden; returns the PageDiff fields after status"""
+    ops, pagesize, golden_path, heatmap_path, min_ssim, max_changed = job
+    with Image.open(golden_path) as im:
+        width = im.width
+    image = rasterize_pdf_page(ops, pagesize, width)
+    # MuPDF is deterministic, so an unchanged page is byte-identical
+    if hashlib.sha256(_png_bytes(image)).hexdigest() == os.path.splitext(os.path.basename(golden_path))[0]:
+        return 'ok', 1.0, 1.0, 0.0, 0.0, None
+    actual = np.asarray(image)
+    ssim, worst, changed, mean_diff, per_pixel = compare_pages(_load_rgb(golden_path), actual)
+    if worst >= min_ssim and changed <= max_changed:
+        return 'ok', ssim, worst, changed, mean_diff, None
+    os.makedirs(os.path.dirname(heatmap_path), exist_ok=True)
+    if per_pixel is None:
+        image.save(heatmap_path, compress_level=1)  # size changed: show the new page as is
+    else:
+        diff_heatmap(actual, per_pixel).save(heatmap_path, compress_level=1)
+    return 'changed', ssim, worst, changed, mean_diff, heatmap_path
+
+def _golden_job(job):
+    """Rasterize one page into images_dir under its digest; returns the digest"""
+    ops, pagesize, width, images_dir = job
+    data = _png_bytes(rasterize_pdf_page(ops, pagesize, width))
+    digest = hashlib.sha256(data).hexdigest()
+    target = os.path.join(images_dir, digest + '.png')
+    if not os.path.exists(target):
+        tmp_path = f"{target}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, target)
+    return digest
+
+def load_golden_index(golden_dir, name):
+    """Golden image digests of a variant's pages, in page order ([] if it has none)"""
+    try:
+        with open(os.path.join(golden_dir, name + '.json'), encoding='utf-8') as f:
+            return json.load(f)['pages']
+    except (OSError, ValueError, KeyError):
+        return []
+
+def store_goldens(variants, golden_dir=GOLDEN_DIR, width=REGRESS_WIDTH, workers=None):
+    """Make the current rendering of each (name, plan) variant its golden; returns pages stored"""
+    images_dir = os.path.join(golden_dir, 'images')
+    os.makedirs(images_dir, exist_ok=True)
+    jobs = {}
+    for _, plan in variants:
+        for ops in plan['pages']:
+            jobs.setdefault(page_fingerprint(ops), (ops, plan['pagesize'], width, images_dir))
+    with futures.ProcessPoolExecutor(max_workers=workers) as pool:
+        goldens = dict(zip(jobs, pool.map(_golden_job, jobs.values(), chunksize=max(1, len(jobs) // 64))))
+    stored = 0
+    for name, plan in variants:
+        digests = [goldens[page_fingerprint(ops)] for ops in plan['pages']]
+        index_path = os.path.join(golden_dir, name + '.json')
+        tmp_path = f"{index_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'width': width, 'pages': digests}, f, indent=1)
+        os.replace(tmp_path, index_path)
+        stored += len(digests)
+    return stored
+
+def regress(variants, golden_dir=GOLDEN_DIR, out_dir=None, workers=None,
+            min_ssim=REGRESS_MIN_SSIM, max_changed=REGRESS_MAX_CHANGED):
+    """Check every page of each (name, plan) variant against its goldens.
+
+    Pages are drawn at the width the goldens were stored at. Heatmaps of
+    failing pages go to out_dir (default goldens/_diff). Returns a
+    PageDiff per page.
+    """
+    out_dir = out_dir or os.path.join(golden_dir, '_diff')
+    # Distinct (page, golden) pairs -> the variant pages they stand for
+    jobs, users, results = {}, {}, []
+    for name, plan in variants:
+        goldens = load_golden_index(golden_dir, name)
+        for page_no, ops in enumerate(plan['pages'], 1):
+            if page_no > len(goldens):
+                results.append(PageDiff(name, page_no, 'new'))
+                continue
+            key = (page_fingerprint(ops), goldens[page_no - 1])
+            if key not in jobs:
+                golden_path = os.path.join(golden_dir, 'images', goldens[page_no - 1] + '.png')
+                heatmap_path = os.path.join(out_dir, name, f"page-{page_no}-diff.png")
+                jobs[key] = (ops, plan['pagesize'], golden_path, heatmap_path, min_ssim, max_changed)
+            users.setdefault(key, []).append((name, page_no))
+        results.extend(PageDiff(name, page_no, 'missing') for page_no in range(len(plan['pages']) + 1, len(goldens) + 1))
+    if jobs:
+        with futures.ProcessPoolExecutor(max_workers=workers) as pool:
+            outcomes = pool.map(_regress_job, jobs.values(), chunksize=max(1, len(jobs) // 64))
+            for key, outcome in zip(jobs, outcomes):
+                results.extend(PageDiff(name, page_no, *outcome) for name, page_no in users[key])
+    results.sort(key=lambda diff: (diff.variant, diff.page))
+    return results
+
+# ==================== STATIC SITE ====================
+#
+# `site` builds the web page from the same ProfileContent as the PDF, so the
+# copy lives in one place. Styles, script and icons are kept in site/, the
+# only source of the page (dist/index.html is build output). The
+# build inlines only the CSS the navigation and hero need and loads the full
+# sheet without blocking render, minifies everything, and encodes every image
+# in images/ at several widths as AVIF (when Pillow has it) and WebP, with
+# the original format as fallback. Image tags carry srcset, intrinsic
+# width/height and lazy loading. Encoded variants are cached by source hash.
+
+SITE_SOURCE_DIR = os.path.join(SCRIPT_DIR, 'site')
+SITE_CACHE_DIR = os.path.join(CACHE_DIR, 'site')
+SITE_IMAGE_WIDTHS = (160, 320, 640, 1280)
+# The page's download button links to the web profile, written next to it
+PROFILE_PDF_NAME = 'S-Urban_Business_Profile.pdf'
+# Layout slot -> (CSS px it is shown at on desktop, sizes attribute)
+SITE_IMAGE_SLOTS = {
+    'client': (140, '140px'),
+    'founder': (300, '(max-width: 1024px) 100vw, 300px'),
+}
+
+# Copy that only the web page has; everything else comes from ProfileContent.
+# {years} is the content's Years stat, as the PDF shows it.
+SITE_COPY = {
+    'title': "S-Urban Consultancy | From Queries to Solutions",
+    'description': "S-Urban Consultancy - Professional Project Management Services. From Queries to Solutions. PAN India construction consultancy services.",
+    'keywords': "project management, construction consultancy, civil engineering, Gujarat, India",
+    'og_description': "Professional Project Management Company with {years} years experience. PAN India Services.",
+    'fonts': "https://fonts.googleapis.com/css2?family=DM+Sans:wght@400;500;600;700&family=Libre+Baskerville:wght@400;700&display=swap",
+    'nav': [('about', "About"), ('services', "Services"), ('lifecycle', "Process"), ('founder', "Founder"), ('contact', "Contact")],
+    'hero_desc': "Your trusted partner in Project Management, delivering excellence from concept to completion with {years} years of proven expertise.",
+    # (Unsplash photo URL, alt text, widths to offer, intrinsic width, height)
+    'hero_photo': ("https://images.unsplash.com/photo-1504307651254-35680f356dfd", "Construction Site", (640, 1024, 1600), 1600, 1067),
+    'about_photo': ("https://images.unsplash.com/photo-1541888946425-d81bb19240f5", "Construction Project", (400, 800), 800, 533),
+    'about_tag': "About Us",
+    'why': ("Why Choose Us", "What Sets Us Apart", "Our commitment to excellence drives everything we do"),
+    'clients': ("Our Clients", "Trusted By Industry Leaders"),
+    'services': ("Our Services", "Area of Expertise"),
+    'service_blurbs': {
+        "Project Consultancy": "Updated technology implementation and strategic planning.",
+        "Project Management": "Effective services from conception to closeout.",
+        "Planning Services": "Comprehensive planning with regular reporting.",
+        "Claim & Dispute": "Complete site survey and fair settlement solutions.",
+        "Risk Management": "Comprehensive risk identification and control.",
+        "Quality Assurance": "Ensuring excellence through rigorous QC.",
+    },
+    'lifecycle': ("Our Process", "Project Life Cycle"),
+    'founder': ("Leadership", "Meet Our Founder"),
+    'contact_tag': "Get In Touch",
+    'form_action': "https://formspree.io/f/xeekkgqr",
+}
+
+def _esc(text):
+    return html.escape(str(text), quote=True)
+
+def minify_css(css):
+    """Strip comments and the whitespace CSS does not need"""
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.S)
+    css = re.sub(r'\s+', ' ', css)
+    css = re.sub(r'\s*([{};,>])\s*', r'\1', css)
+    css = re.sub(r':\s+', ':', css)
+    return css.replace(';}', '}').strip()
+
+def minify_js(js):
+    """Drop comment lines, indentation and blank lines (newlines are kept for ASI)"""
+    lines = (line.strip() for line in js.splitlines())
+    return '\n'.join(line for line in lines if line and not line.startswith('//'))
+
+def _minify_svg(markup):
+    return re.sub(r'\s+', ' ', re.sub(r'>\s+<', '><', markup)).strip()
+
+def load_site_icons(path):
+    """Icons from a file of SVGs, each after a `<!-- name -->` marker"""
+    with open(path, encoding='utf-8') as f:
+        parts = re.split(r'<!--\s*([\w-]+)\s*-->', f.read())
+    return {name: _minify_svg(svg) for name, svg in zip(parts[1::2], parts[2::2])}
+
+def _icon(icons, prefix, index):
+    """The index-th of prefix-1, prefix-2, ..., wrapping when items outnumber icons"""
+    numbers = sorted(int(name.rsplit('-', 1)[1]) for name in icons if re.fullmatch(rf'{prefix}-\d+', name))
+    return icons[f'{prefix}-{numbers[index % len(numbers)]}'] if numbers else ''
+
+def _css_blocks(css):
+    """Split minified CSS into (prelude, body) pairs; nested at-rule bodies stay as text"""
+    blocks, i = [], 0
+    while True:
+        start = css.find('{', i)
+        if start < 0:
+            return blocks
+        depth, j = 1, start + 1
+        while depth:
+            depth += {'{': 1, '}': -1}.get(css[j], 0)
+            j += 1
+        blocks.append((css[i:start], css[start + 1:j - 1]))
+        i = j
+
+def critical_css(css, markup):
+    """The rules of minified css that can apply to markup, plus the keyframes they use.
+
+    markup is a fragment of the body. A selector is kept when every tag,
+    class and id in one of its parts occurs in it; pseudo-classes and pseudo-elements are ignored, so
+    hover styles come along and classes added later by script do not.
+    """
+    tags = set(re.findall(r'<([a-z][a-z0-9]*)', markup)) | {'html', 'body'}
+    classes = {name for attr in re.findall(r'class="([^"]*)"', markup) for name in attr.split()}
+    ids = set(re.findall(r'id="([^"]*)"', markup))
+
+    def matches(selectors):
+        for selector in selectors.split(','):
+            selector = re.sub(r'::?[\w-]+(\([^)]*\))?|\[[^\]]*\]', '', selector)
+            for simple in re.split(r'[\s>+~]+', selector.strip()):
+                tag = re.match(r'[a-z][\w-]*', simple)
+                if ((tag and tag.group(0) not in tags)
+                        or not classes.issuperset(re.findall(r'\.([\w-]+)', simple))
+                        or not ids.issuperset(re.findall(r'#([\w-]+)', simple))):
+                    break
+            else:
+                return True
+        return False
+
+    kept, keyframes = [], {}
+    for prelude, body in _css_blocks(css):
+        if prelude.startswith('@keyframes'):
+            keyframes[prelude.split()[1]] = f'{prelude}{{{body}}}'
+        elif prelude.startswith('@media'):
+            inner = ''.join(f'{p}{{{b}}}' for p, b in _css_blocks(body) if matches(p))
+            if inner:
+                kept.append(f'{prelude}{{{inner}}}')
+        elif prelude.startswith('@') or matches(prelude):
+            kept.append(f'{prelude}{{{body}}}')
+    critical = ''.join(kept)
+    animations = ' '.join(re.findall(r'animation:([^;}]*)', critical))
+    return critical + ''.join(rule for name, rule in keyframes.items() if re.search(rf'\b{re.escape(name)}\b', animations))
+
+class SiteImage(NamedTuple):
+    name: str
+    width: int
+    height: int
+    # mime type -> [(cached path, width)], modern formats first, fallback last
+    variants: dict
+
+SITE_IMAGE_FORMATS = {'image/avif': ('AVIF', '.avif'), 'image/webp': ('WEBP', '.webp'),
+                      'image/jpeg': ('JPEG', '.jpg'), 'image/png': ('PNG', '.png')}
+
+def site_image(img_path, widths=SITE_IMAGE_WIDTHS, cache_dir=SITE_CACHE_DIR):
+    """Encode img_path at each width up to its own, as AVIF/WebP and its fallback format.
+
+    Images are never upscaled; the source width itself is always offered.
+    Opaque images fall back to JPEG, anything with alpha to PNG.
+    """
+    digest = file_digest(img_path)[:32]
+    with Image.open(img_path) as im:
+        im.load()
+        source_format = im.format
+        has_alpha = im.mode in ('RGBA', 'LA') or (im.mode == 'P' and 'transparency' in im.info)
+        im = im.convert('RGBA' if has_alpha else 'RGB')
+    fallback = 'image/png' if has_alpha else 'image/jpeg'
+    mimes = [m for m in ('image/avif', 'image/webp') if features.check(SITE_IMAGE_FORMATS[m][0].lower())] + [fallback]
+    sizes = sorted({w for w in widths if w < im.width} | {im.width})
+
+    os.makedirs(cache_dir, exist_ok=True)
+    variants = {}
+    for mime in mimes:
+        fmt, ext = SITE_IMAGE_FORMATS[mime]
+        for w in sizes:
+            cached = os.path.join(cache_dir, f"{digest}-{w}{ext}")
+            variants.setdefault(mime, []).append((cached, w))
+            if os.path.exists(cached):
+                continue
+            scaled = im if w == im.width else im.resize((w, max(1, round(im.height * w / im.width))), Image.LANCZOS)
+            tmp_path = f"{cached}.{os.getpid()}.tmp"
+            if fmt == 'JPEG':
+                scaled.save(tmp_path, fmt, quality=82, optimize=True, progressive=True)
+            elif fmt == 'PNG':
+                scaled.save(tmp_path, fmt, optimize=True)
+            else:
+                scaled.save(tmp_path, fmt, quality=80 if fmt == 'WEBP' else 60)
+            # At full size in the source's own format, keep the original if re-encoding didn't pay off
+            if w == im.width and fmt == source_format and os.path.getsize(tmp_path) >= os.path.getsize(img_path):
+                shutil.copyfile(img_path, tmp_path)
+            os.replace(tmp_path, cached)
+    return SiteImage(os.path.basename(img_path), im.width, im.height, variants)
+
+class SiteBuilder:
+    """Renders the page for one ProfileContent, publishing images into out_dir/assets"""
+
+    def __init__(self, content, icons, out_dir, cache_dir=SITE_CACHE_DIR):
+        self.content = content
+        self.icons = icons
+        self.out_dir = out_dir
+        self.cache_dir = cache_dir
+        self.images = {}
+        # (source bytes, bytes of the variant a 1x desktop browser picks) per placed image
+        self.image_bytes = []
+
+    def copy(self, key):
+        """SITE_COPY[key] with the content's figures filled in"""
+        stats = [(number, label) for number, label, *_ in self.content.stats + self.content.founder_stats]
+        years = next((number for number, label in stats if label == 'Years'), 'many')
+        return SITE_COPY[key].format(years=years)
+
+    def asset(self, path, stem):
+        """Copy path into assets/ under a content-hashed name; returns the page URL"""
+        name = f"{stem}.{file_digest(path)[:10]}{os.path.splitext(path)[1]}"
+        target = os.path.join(self.out_dir, 'assets', name)
+        if not os.path.exists(target):
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            shutil.copyfile(path, target)
+        return 'assets/' + name
+
+    def picture(self, filename, alt, slot, lazy=True):
+        """<picture> for an image in IMAGES_DIR with srcset per format"""
+        img_path = os.path.join(IMAGES_DIR, filename)
+        image = self.images.get(filename)
+        if image is None:
+            try:
+                image = self.images[filename] = site_image(img_path, cache_dir=self.cache_dir)
+            except OSError:
+                return f'<img alt="{_esc(alt)}">'
+        px, sizes = SITE_IMAGE_SLOTS[slot]
+        stem = os.path.splitext(filename)[0]
+        srcsets = {mime: ','.join(f"{self.asset(path, f'{stem}-{w}')} {w}w" for path, w in entries)
+                   for mime, entries in image.variants.items()}
+        mimes = list(image.variants)
+        picked = next((path for path, w in image.variants[mimes[0]] if w >= px), image.variants[mimes[0]][-1][0])
+        self.image_bytes.append((os.path.getsize(img_path), os.path.getsize(picked)))
+        fallback = image.variants[mimes[-1]]
+        src = self.asset(fallback[-1][0], f'{stem}-{fallback[-1][1]}')
+        sources = ''.join(f'<source type="{mime}" srcset="{srcsets[mime]}" sizes="{sizes}">' for mime in mimes[:-1])
+        loading = ' loading="lazy"' if lazy else ''
+        return (f'<picture>{sources}<img src="{src}" srcset="{srcsets[mimes[-1]]}" sizes="{sizes}" '
+                f'width="{image.width}" height="{image.height}" alt="{_esc(alt)}"{loading} decoding="async"></picture>')
+
+    @staticmethod
+    def photo_srcset(photo):
+        url, _, widths, _, _ = photo
+        return ','.join(f"{url}?w={w}&amp;q=80&amp;auto=format {w}w" for w in widths)
+
+    def photo(self, photo, sizes, lazy=True):
+        """<img> for a remote Unsplash photo; auto=format serves AVIF/WebP where supported"""
+        url, alt, widths, width, height = photo
+        loading = ' loading="lazy" decoding="async"' if lazy else ' fetchpriority="high"'
+        return (f'<img src="{url}?w={widths[-1]}&amp;q=80&amp;auto=format" srcset="{self.photo_srcset(photo)}" '
+                f'sizes="{sizes}" width="{width}" height="{height}" alt="{_esc(alt)}"{loading}>')
+
+    def header(self, tag, title, desc=None):
+        desc = f'<p class="section-desc">{_esc(desc)}</p>' if desc else ''
+        return (f'<div class="section-header"><span class="section-tag">{_esc(tag)}</span>'
+                f'<h2 class="section-title">{_esc(title)}</h2>{desc}</div>')
+
+    def nav(self):
+        links = ''.join(f'<li><a href="#{anchor}">{_esc(label)}</a></li>' for anchor, label in SITE_COPY['nav'])
+        mobile = ''.join(f'<a href="#{anchor}">{_esc(label)}</a>' for anchor, label in SITE_COPY['nav'])
+        return (f'<nav class="navbar" id="navbar"><a href="#" class="logo" aria-label="S-Urban Consultancy">{self.icons["logo"]}</a>'
+                f'<ul class="nav-links">{links}</ul><a href="#contact" class="nav-cta">Get Started</a>'
+                '<button class="mobile-toggle" id="mobileToggle" aria-label="Menu"><span></span><span></span><span></span></button></nav>'
+                f'<div class="mobile-nav" id="mobileNav"><button class="close-nav" id="closeNav" aria-label="Close">'
+                f'{self.icons["close"]}</button>{mobile}</div>')
+
+    def hero(self):
+        c = self.content
+        head, sep, tail = c.tagline.partition(' to ')
+        first, _, rest = head.partition(' ')
+        title = (f'{_esc(first)} <span class="highlight">{_esc(rest)}</span><br>to {_esc(tail)}'
+                 if sep and rest else _esc(c.tagline))
+        return ('<section class="hero" id="home">'
+                f'<div class="hero-bg">{self.photo(SITE_COPY["hero_photo"], "100vw", lazy=False)}</div>'
+                '<div class="hero-overlay"></div><div class="hero-content container"><div class="hero-text">'
+                f'<div class="hero-badge"><span class="dot"></span>{_esc(c.coverage_tag)}</div>'
+                f'<h1>{title}</h1><p class="hero-tagline">S-URBAN CONSULTANCY</p>'
+                f'<p class="hero-desc">{_esc(self.copy("hero_desc"))}</p><div class="hero-btns">'
+                f'<a href="#contact" class="btn btn-primary">Start Your Project {self.icons["arrow"]}</a>'
+                '<a href="#services" class="btn btn-outline">Explore Services</a>'
+                f'<a href="{PROFILE_PDF_NAME}" download class="btn btn-outline">{self.icons["download"]} Download Profile</a>'
+                f'</div></div><div class="hero-visual">{self.icons["hero-logo"]}</div></div></section>')
+
+    def stats(self):
+        items = ''.join(f'<div class="stat-item"><div class="stat-num">{_esc(num)}</div>'
+                        f'<div class="stat-label">{_esc(a)} {_esc(b)}</div></div>' for num, a, b in self.content.stats)
+        return f'<section class="stats"><div class="stats-grid container">{items}</div></section>'
+
+    def about(self):
+        c = self.content
+        num, label = c.stats[0][0], c.stats[0][1]
+        paragraphs = ''.join(f'<p>{_esc(p)}</p>' for p in c.about_paragraphs)
+        features = ''.join(f'<div class="about-feature"><div class="feature-icon">{_icon(self.icons, "value", i)}</div>'
+                           f'<div class="feature-text"><h5>{_esc(title)}</h5><p>{_esc(desc)}</p></div></div>'
+                           for i, (title, desc) in enumerate(c.core_values))
+        return ('<section class="about" id="about"><div class="about-grid container"><div class="about-img reveal">'
+                f'{self.photo(SITE_COPY["about_photo"], "(max-width: 1024px) 100vw, 560px")}'
+                f'<div class="about-badge"><span>{_esc(num)}</span><small>{_esc(label)} Exp.</small></div></div>'
+                f'<div class="about-content reveal"><span class="section-tag">{_esc(SITE_COPY["about_tag"])}</span>'
+                f'<h3>{_esc(" ".join(c.about_title))}</h3>{paragraphs}<div class="about-features">{features}</div>'
+                '</div></div></section>')
+
+    def why(self):
+        cards = ''.join(f'<div class="why-card reveal"><span class="why-num">{_esc(num)}</span>'
+                        f'<div class="why-icon">{_icon(self.icons, "reason", i)}</div><h4>{_esc(title)}</h4><p>{_esc(desc)}</p></div>'
+                        for i, (num, title, desc) in enumerate(self.content.reasons))
+        return (f'<section class="why-us" id="why"><div class="container">{self.header(*SITE_COPY["why"])}'
+                f'<div class="why-grid">{cards}</div></div></section>')
+
+    def clients(self):
+        c = self.content
+        cards = ''.join(f'<div class="client-card reveal">{self.picture(filename, name, "client")}</div>'
+                        for filename, name in c.clients)
+        return (f'<section class="clients" id="clients"><div class="container">'
+                f'{self.header(*SITE_COPY["clients"], c.clients_subtitle)}<div class="clients-grid">{cards}</div></div></section>')
+
+    def services(self):
+        c = self.content
+        cards = []
+        for i, (_, title, items) in enumerate(c.services):
+            blurb = SITE_COPY['service_blurbs'].get(title)
+            blurb = f'<p>{_esc(blurb)}</p>' if blurb else ''
+            points = ''.join(f'<li>{self.icons["check"]}{_esc(item)}</li>' for item in items)
+            cards.append(f'<div class="service-card reveal"><div class="service-icon">{_icon(self.icons, "service", i)}</div>'
+                         f'<h4>{_esc(title)}</h4>{blurb}<ul class="service-list">{points}</ul></div>')
+        return (f'<section class="services" id="services"><div class="container">'
+                f'{self.header(*SITE_COPY["services"], c.services_subtitle)}<div class="services-grid">{"".join(cards)}</div>'
+                '</div></section>')
+
+    def lifecycle(self):
+        c = self.content
+        items = ''.join(f'<div class="lifecycle-item reveal"><div class="lifecycle-icon">{_icon(self.icons, "phase", i)}</div>'
+                        f'<h4>{_esc(name.title())}</h4><p>{_esc(" ".join(lines))}</p></div>'
+                        for i, (_, name, *lines) in enumerate(c.phases))
+        return (f'<section class="lifecycle" id="lifecycle"><div class="container">'
+                f'{self.header(*SITE_COPY["lifecycle"], c.lifecycle_subtitle)}<div class="lifecycle-grid">{items}</div>'
+                '</div></section>')
+
+    def founder(self):
+        c = self.content
+        stats = ''.join(f'<div class="founder-stat"><span>{_esc(num)}</span><small>{_esc(label)}</small></div>'
+                        for num, label in c.founder_stats)
+        return (f'<section class="founder" id="founder"><div class="container">{self.header(*SITE_COPY["founder"])}'
+                f'<div class="founder-card reveal"><div class="founder-img">{self.picture(c.founder_photo, c.founder_name, "founder")}</div>'
+                f'<div class="founder-content"><h3>{_esc(c.founder_name)}</h3><p class="founder-role">{_esc(c.founder_role)}</p>'
+                f'<p>{_esc(c.founder_bio)}</p><div class="founder-stats">{stats}</div></div></div></div></section>')
+
+    def contact(self):
+        c = self.content
+
+        def item(icon, label, value):
+            return (f'<div class="contact-item"><div class="contact-icon">{self.icons[icon]}</div>'
+                    f'<div class="contact-text"><h5>{label}</h5>{value}</div></div>')
+
+        def field(label, control):
+            return f'<div class="form-group"><label>{label}</label>{control}</div>'
+
+        phone = re.sub(r'[^\d+]', '', c.phone)
+        items = (item('contact-person', "Contact Person", f'<p>{_esc(c.contact_person)}</p>')
+                 + item('contact-address', "Office Address", f'<p>{"<br>".join(_esc(line) for line in c.address)}</p>')
+                 + item('contact-email', "Email", f'<a href="mailto:{_esc(c.email)}">{_esc(c.email)}</a>')
+                 + item('contact-phone', "Phone", f'<a href="tel:{phone}">{_esc(c.phone)}</a>'))
+        form = (field("Your Name", '<input type="text" name="name" placeholder="Enter your full name" required>')
+                + field("Email Address", '<input type="email" name="email" placeholder="Enter your email" required>')
+                + field("Phone Number", '<input type="tel" name="phone" placeholder="Enter your phone number">')
+                + field("Project Details", '<textarea name="message" placeholder="Tell us about your project..."></textarea>'))
+        return ('<section class="contact" id="contact"><div class="container"><div class="contact-grid">'
+                f'<div class="contact-info reveal"><span class="section-tag">{_esc(SITE_COPY["contact_tag"])}</span>'
+                f'<h3>{_esc(c.contact_title)}</h3><p>{_esc(c.contact_subtitle)}</p><div class="contact-items">{items}</div></div>'
+                f'<form class="contact-form reveal" id="contactForm" action="{SITE_COPY["form_action"]}" method="POST">{form}'
+                f'<button type="submit" class="form-btn">Send Message {self.icons["send"]}</button></form>'
+                '</div></div></section>')
+
+    def footer(self):
+        c = self.content
+        links = ''.join(f'<li><a href="#{anchor}">{_esc(label)}</a></li>' for anchor, label in SITE_COPY['nav'])
+        return (f'<footer class="footer"><div class="footer-main container"><a href="#" class="footer-logo" aria-label="S-Urban Consultancy">'
+                f'{self.icons["footer-logo"]}</a><ul class="footer-links">{links}</ul></div>'
+                f'<div class="footer-copy container">&copy; {_esc(c.year)} S-Urban Consultancy. All Rights Reserved. | {_esc(c.tagline)}</div></footer>')
+
+    def page(self, css_url, css, js):
+        """The whole document; css is the minified full sheet, used to pick the critical rules"""
+        above_fold = self.nav() + self.hero()
+        below_fold = (self.stats() + self.about() + self.why() + self.clients() + self.services()
+                      + self.lifecycle() + self.founder() + self.contact() + self.footer())
+        hero = SITE_COPY['hero_photo']
+        hrefs = [_esc(SITE_COPY['fonts']), css_url]
+        deferred = ''.join(f'<link rel="stylesheet" href="{href}" media="print" onload="this.media=\'all\'">' for href in hrefs)
+        blocking = ''.join(f'<link rel="stylesheet" href="{href}">' for href in hrefs)
+        head = ('<meta charset="UTF-8"><meta name="viewport" content="width=device-width, initial-scale=1.0">'
+                f'<meta name="description" content="{_esc(SITE_COPY["description"])}">'
+                f'<meta name="keywords" content="{_esc(SITE_COPY["keywords"])}"><meta name="author" content="S-Urban Consultancy">'
+                f'<meta property="og:title" content="{_esc(SITE_COPY["title"])}">'
+                f'<meta property="og:description" content="{_esc(self.copy("og_description"))}">'
+                f'<title>{_esc(SITE_COPY["title"])}</title>'
+                '<link rel="preconnect" href="https://fonts.googleapis.com"><link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>'
+                '<link rel="preconnect" href="https://images.unsplash.com">'
+                f'<link rel="preload" as="image" href="{hero[0]}?w={hero[2][-1]}&amp;q=80&amp;auto=format" '
+                f'imagesrcset="{self.photo_srcset(hero)}" imagesizes="100vw" fetchpriority="high">'
+                f'<style>{critical_css(css, above_fold)}</style>{deferred}<noscript>{blocking}</noscript>')
+        return (f'<!DOCTYPE html><html lang="en"><head>{head}</head><body>{above_fold}{below_fold}'
+                f'<script>{js}</script></body></html>')
+
+def build_site(out_dir, content=None, pdf=True, source_dir=SITE_SOURCE_DIR, cache_dir=SITE_CACHE_DIR):
+    """Write index.html, its assets and (optionally) the web-profile PDF into out_dir.
+
+    Returns a dict of byte counts for the report printed by `site`.
+    """
+    content = portfolio_content(content)
+    with open(os.path.join(source_dir, 'style.css'), encoding='utf-8') as f:
+        css = minify_css(f.read())
+    with open(os.path.join(source_dir, 'site.js'), encoding='utf-8') as f:
+        js = minify_js(f.read())
+    icons = load_site_icons(os.path.join(source_dir, 'icons.html'))
+
+    os.makedirs(os.path.join(out_dir, 'assets'), exist_ok=True)
+    builder = SiteBuilder(content, icons, out_dir, cache_dir)
+    css_name = f"site.{hashlib.sha256(css.encode('utf-8')).hexdigest()[:10]}.css"
+    with open(os.path.join(out_dir, 'assets', css_name), 'w', encoding='utf-8') as f:
+        f.write(css)
+    document = builder.page('assets/' + css_name, css, js)
+    # Publish every image in images/, including ones the page does not place today
+    for name in sorted(os.listdir(IMAGES_DIR)):
+        with contextlib.suppress(OSError):
+            image = builder.images.get(name) or site_image(os.path.join(IMAGES_DIR, name), cache_dir=cache_dir)
+            builder.images[name] = image
+            for path, w in (entry for entries in image.variants.values() for entry in entries):
+                builder.asset(path, f"{os.path.splitext(name)[0]}-{w}")
+    index_path = os.path.join(out_dir, 'index.html')
+    with open(index_path, 'w', encoding='utf-8') as f:
+        f.write(document)
+    if pdf:
+        render_profile_pdf(os.path.join(out_dir, PROFILE_PDF_NAME), 'web', content=content, verbose=False)
+
+    critical = re.search(r'<style>(.*?)</style>', document, re.S).group(1)
+    return {
+        'html_bytes': len(document.encode('utf-8')),
+        'critical_css_bytes': len(critical.encode('utf-8')),
+        'css_bytes': len(css.encode('utf-8')),
+        'image_variants': sum(len(entries) for image in builder.images.values() for entries in image.variants.values()),
+        'images': len(builder.images),
+        'page_image_source_bytes': sum(source for source, _ in builder.image_bytes),
+        'page_image_bytes': sum(picked for _, picked in builder.image_bytes),
+    }
+
+# ==================== JOB SCHEDULER ====================
+#
+# Render jobs reach the worker pool through a priority scheduler. Each job
+# class has its own bounded queue. A free worker always takes the waiting
+# job of the highest-priority class, and a class can be capped to a share
+# of the workers, so bulk regeneration never holds every worker while a
+# sales request waits. A job may carry a deadline: one that expires while
+# queued is dropped unrendered, and the result of one that expires while
+# running is discarded. Cancelling a job's future drops it the same way.
+# A request that joins a queued job of a lower class promotes it, and the
+# job lives until the latest deadline of the requests waiting on it.
+
+class JobClass(NamedTuple):
+    priority: int      # lower is served first
+    queue_size: int    # waiting jobs before submissions are refused (or made to wait)
+    max_share: float   # fraction of the workers the class may occupy at once
+    deadline: float    # default seconds from submission to result, 0 for none
+
+JOB_CLASSES = {
+    'interactive': JobClass(priority=0, queue_size=32, max_share=1.0, deadline=5.0),
+    'bulk': JobClass(priority=1, queue_size=256, max_share=0.75, deadline=0),
+}
+
+# Recent jobs per class kept for the latency percentiles
+JOB_LATENCY_SAMPLES = 1024
+
+class DeadlineExceeded(TimeoutError):
+    pass
+
+@dataclass(eq=False)
+class ScheduledJob:
+    kind: str
+    fn: object
+    arg: object
+    future: object
+    submitted: float
+    started: float = None
+    expires: float = None   # loop time of the deadline, None for none
+    timer: object = None
+
+def _percentiles(samples, points=(50, 95, 99)):
+    """Nearest-rank percentiles of samples (seconds) in milliseconds"""
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+    return {f'p{q}': round(ordered[min(len(ordered) - 1, math.ceil(q / 100 * len(ordered)) - 1)] * 1000, 1)
+            for q in points}
+
+class JobScheduler:
+    """Priority classes, bounded queues and deadlines in front of an executor.
+
+    Must be used from a single event loop.
+    """
+
+    COUNTERS = ('submitted', 'completed', 'failed', 'rejected', 'expired', 'cancelled', 'promoted')
+
+    def __init__(self, executor, concurrency, classes=JOB_CLASSES):
+        self.executor = executor
+        self.concurrency = concurrency
+        self.classes = dict(classes)
+        self.order = sorted(self.classes, key=lambda kind: self.classes[kind].priority)
+        self.limits = {kind: max(1, math.floor(concurrency * cls.max_share)) for kind, cls in self.classes.items()}
+        self.queues = {kind: deque() for kind in self.classes}
+        self.running = dict.fromkeys(self.classes, 0)
+        self.counters = {kind: dict.fromkeys(self.COUNTERS, 0) for kind in self.classes}
+        self.waits = {kind: deque(maxlen=JOB_LATENCY_SAMPLES) for kind in self.classes}
+        self.latencies = {kind: deque(maxlen=JOB_LATENCY_SAMPLES) for kind in self.classes}
+        # Producers blocked on a full queue, woken one at a time as room frees up
+        self.room = {kind: deque() for kind in self.classes}
+        # Future -> job, until the job's future is done
+        self.jobs = {}
+
+    def _full(self, kind):
+        return len(self.queues[kind]) >= self.classes[kind].queue_size
+
+    async def submit(self, kind, fn, arg, deadline=None, block=False):
+        """Queue fn(arg) to run on the executor and return the future for its result.
+
+        deadline is in seconds from now (default: the class's). A full queue
+        raises asyncio.QueueFull, or with block waits until there is room.
+        """
+        cls = self.classes[kind]
+        loop = asyncio.get_running_loop()
+        while self._full(kind):
+            if not block:
+                self.counters[kind]['rejected'] += 1
+                raise asyncio.QueueFull(f"{kind} queue is full")
+            waiter = loop.create_future()
+            self.room[kind].append(waiter)
+            try:
+                await waiter
+            finally:
+                with contextlib.suppress(ValueError):
+                    self.room[kind].remove(waiter)
+        job = ScheduledJob(kind, fn, arg, loop.create_future(), loop.time())
+        deadline = cls.deadline if deadline is None else deadline
+        if deadline:
+            job.expires = loop.time() + deadline
+            job.timer = loop.call_at(job.expires, self._expire, job)
+        self.jobs[job.future] = job
+        job.future.add_done_callback(lambda _, job=job: self._settled(job))
+        self.queues[kind].append(job)
+        self.counters[kind]['submitted'] += 1
+        self._pump()
+        return job.future
+
+    async def run(self, kind, fn, arg, deadline=None, block=False):
+        """submit() and wait for the result"""
+        return await (await self.submit(kind, fn, arg, deadline, block))
+
+    def join(self, future, kind, deadline=None):
+        """Another request of class kind now waits on the job behind future.
+
+        A job still queued in a lower-priority class moves to kind's queue,
+        and the job's deadline is pushed back to the joining request's
+        (default: the class's) if that is later.
+        """
+        job = self.jobs.get(future)
+        if job is None:
+            return
+        loop = asyncio.get_running_loop()
+        cls = self.classes[kind]
+        deadline = cls.deadline if deadline is None else deadline
+        if job.expires is not None:
+            expires = loop.time() + deadline if deadline else None
+            if expires is None or expires > job.expires:
+                job.timer.cancel()
+                job.expires, job.timer = expires, None
+                if expires is not None:
+                    job.timer = loop.call_at(expires, self._expire, job)
+        if job.started is None and cls.priority < self.classes[job.kind].priority:
+            self.queues[job.kind].remove(job)
+            self.counters[job.kind]['promoted'] += 1
+            self._wake(job.kind)
+            job.kind = kind
+            self.queues[kind].append(job)
+            self._pump()
+
+    def _expire(self, job):
+        if not job.future.done():
+            job.future.set_exception(DeadlineExceeded(f"{job.kind} job missed its deadline"))
+
+    def _settled(self, job):
+        """The job's future is done: by its result, its deadline or a cancellation"""
+        self.jobs.pop(job.future, None)
+        if job.timer is not None:
+            job.timer.cancel()
+        future = job.future
+        if job.started is None:
+            with contextlib.suppress(ValueError):
+                self.queues[job.kind].remove(job)
+            self._wake(job.kind)
+        if future.cancelled():
+            self.counters[job.kind]['cancelled'] += 1
+        elif isinstance(future.exception(), DeadlineExceeded):
+            self.counters[job.kind]['expired'] += 1
+
+    def _wake(self, kind):
+        while self.room[kind]:
+            waiter = self.room[kind].popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                break
+
+    def _next(self):
+        for kind in self.order:
+            queue = self.queues[kind]
+            # Jobs cancelled or expired since the last pump; _settled is about to count them
+            while queue and queue[0].future.done():
+                queue.popleft()
+            if queue and self.running[kind] < self.limits[kind]:
+                return queue.popleft()
+        return None
+
+    def _pump(self):
+        """Start queued jobs while there are free workers"""
+        loop = asyncio.get_running_loop()
+        while sum(self.running.values()) < self.concurrency:
+            job = self._next()
+            if job is None:
+                break
+            self._wake(job.kind)
+            job.started = loop.time()
+            self.waits[job.kind].append(job.started - job.submitted)
+            self.running[job.kind] += 1
+            work = loop.run_in_executor(self.executor, job.fn, job.arg)
+            work.add_done_callback(lambda work, job=job: self._finished(job, work))
+
+    def _finished(self, job, work):
+        kind = job.kind
+        self.running[kind] -= 1
+        self.latencies[kind].append(asyncio.get_running_loop().time() - job.submitted)
+        exc = None if work.cancelled() else work.exception()
+        if work.cancelled() or exc is not None:
+            self.counters[kind]['failed'] += 1
+        else:
+            self.counters[kind]['completed'] += 1
+        if not job.future.done():
+            if work.cancelled():
+                job.future.cancel()
+            elif exc is not None:
+                job.future.set_exception(exc)
+            else:
+                job.future.set_result(work.result())
+        self._pump()
+
+    def depth(self):
+        return sum(len(queue) for queue in self.queues.values())
+
+    def metrics(self):
+        """Queue depth, running jobs, counters and wait/latency percentiles per class"""
+        return {kind: dict(self.counters[kind], queued=len(self.queues[kind]), running=self.running[kind],
+                           queue_size=self.classes[kind].queue_size, max_running=self.limits[kind],
+                           blocked_producers=len(self.room[kind]),
+                           wait_ms=_percentiles(self.waits[kind]), latency_ms=_percentiles(self.latencies[kind]))
+                for kind in self.order}
+
+# ==================== RENDER SERVICE ====================
+#
+# `serve` puts a small asyncio HTTP/1.1 front end on a pool of warm render
+# workers. Jobs go through the JobScheduler: a full interactive queue
+# answers 503 rather than letting latency grow without limit, while bulk
+# requests wait for room. Identical in-flight requests share one render
+# whatever their priority (see JobScheduler.join), and finished PDFs are kept in an LRU keyed by the canonical content hash.
+#
+#   POST /render   JSON object of ProfileContent overrides; GET renders the default profile.
+#                  ?dpi=150 resamples images as --dpi does.
+#                  ?priority=bulk queues behind interactive work (default: interactive).
+#                  ?deadline=2.5 overrides the class's deadline in seconds; a miss answers 504.
+#   GET  /health   worker, scheduler and cache statistics as JSON
+
+SERVICE_MAX_BODY = 1 << 20
+SERVICE_CHUNK = 64 * 1024
+
+_HTTP_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+                 413: 'Payload Too Large', 500: 'Internal Server Error', 503: 'Service Unavailable',
+                 504: 'Gateway Timeout'}
+
+class HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+def _render_service_job(job):
+    overrides, dpi, output_cache = job
+    if output_cache is None:
+        return render_pdf_bytes(overrides, dpi=dpi)
+    buf = io.BytesIO()
+    render_cached(buf, overrides, dpi=dpi, cache=output_cache, verbose=False)
+    return buf.getvalue()
+
+class RenderService:
+    """Warm worker pool, job scheduler and response LRU behind the HTTP handler"""
+
+    def __init__(self, workers=None, queue_size=32, cache_size=128, output_cache=None, classes=JOB_CLASSES):
+        self.workers = workers or os.cpu_count() or 1
+        self.classes = dict(classes)
+        self.classes['interactive'] = self.classes['interactive']._replace(queue_size=queue_size)
+        self.cache_size = cache_size
+        # Optional OutputCache behind the in-memory LRU, shared with other processes
+        self.output_cache = output_cache
+        self.cache = OrderedDict()
+        # key -> [future, number of requests waiting on it]
+        self.pending = {}
+        self.stats = {'requests': 0, 'rendered': 0, 'cache_hits': 0, 'coalesced': 0, 'rejected': 0,
+                      'expired': 0, 'errors': 0}
+        self.pool = None
+        self.images = contextlib.ExitStack()
+        self.scheduler = None
+
+    async def start(self):
+        initializer, initargs = self.images.enter_context(shared_image_workers(shared_image_paths()))
+        self.pool = futures.ProcessPoolExecutor(max_workers=self.workers, initializer=initializer, initargs=initargs)
+        self.scheduler = JobScheduler(self.pool, self.workers, self.classes)
+        # One throwaway render per worker so the first real request pays no import or encoding cost
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self.pool, _render_service_job, (None, None, None))
+                               for _ in range(self.workers)))
+
+    async def close(self):
+        self.pool.shutdown(cancel_futures=True)
+        self.images.close()
+
+    def _finished(self, key, future):
+        del self.pending[key]
+        if future.cancelled():
+            return
+        exc = future.exception()
+        if isinstance(exc, DeadlineExceeded):
+            self.stats['expired'] += 1
+        elif exc is not None:
+            self.stats['errors'] += 1
+        else:
+            self.stats['rendered'] += 1
+            self.cache[key] = future.result()
+            while len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+
+    async def _wait(self, entry, deadline):
+        """Wait on a shared render for up to deadline seconds (0 for no limit).
+
+        The last request to give up cancels the render if it has not started.
+        """
+        future = entry[0]
+        entry[1] += 1
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), deadline or None)
+        except DeadlineExceeded:
+            raise
+        except TimeoutError:
+            self.stats['expired'] += 1
+            raise DeadlineExceeded("request missed its deadline")
+        finally:
+            entry[1] -= 1
+            if not entry[1] and not future.done():
+                future.cancel()
+
+    async def render(self, overrides=None, dpi=None, priority='interactive', deadline=None):
+        """Return (pdf_bytes, source) with source 'hit', 'coalesced' or 'miss'.
+
+        Raises ValueError for unknown content fields or priorities,
+        HttpError(503) when the interactive queue is full and
+        HttpError(504) when the deadline passes first. Bulk requests wait
+        for room in their queue instead of being refused.
+        """
+        if priority not in self.classes:
+            raise ValueError(f"Unknown priority: {priority!r}")
+        key = f"{plan_key(overrides)}:{dpi or 0}"
+        data = self.cache.get(key)
+        if data is not None:
+            self.cache.move_to_end(key)
+            self.stats['cache_hits'] += 1
+            return data, 'hit'
+        source = 'coalesced'
+        entry = self.pending.get(key)
+        if entry is None:
+            try:
+                future = await self.scheduler.submit(priority, _render_service_job, (overrides, dpi, self.output_cache),
+                                                     deadline, block=priority == 'bulk')
+            except asyncio.QueueFull:
+                self.stats['rejected'] += 1
+                raise HttpError(503, "Render queue is full, retry shortly")
+            entry = self.pending[key] = [future, 0]
+            future.add_done_callback(lambda future: self._finished(key, future))
+            source = 'miss'
+        else:
+            self.stats['coalesced'] += 1
+            self.scheduler.join(entry[0], priority, deadline)
+        try:
+            return await self._wait(entry, self.classes[priority].deadline if deadline is None else deadline), source
+        except DeadlineExceeded as exc:
+            raise HttpError(504, str(exc))
+
+    def health(self):
+        health = dict(self.stats, workers=self.workers, queued=self.scheduler.depth(),
+                      in_flight=len(self.pending), cached=len(self.cache),
+                      cached_bytes=sum(len(data) for data in self.cache.values()),
+                      scheduler=self.scheduler.metrics())
+        if self.output_cache is not None:
+            health['output_cache'] = self.output_cache.stats()
+        return health
+
+    async def handle(self, reader, writer):
+        """Serve one client connection (keep-alive aware)"""
+        try:
+            while True:
+                keep_alive = False
+                try:
+                    request = await _read_http_request(reader)
+                    if request is None:
+                        break
+                    method, target, headers, body = request
+                    keep_alive = headers.get('connection', '').lower() != 'close'
+                    self.stats['requests'] += 1
+                    status, content_type, payload, extra = await self._route(method, target, body)
+                except HttpError as exc:
+                    status, content_type, payload, extra = exc.status, 'application/json', \
+                        json.dumps({'error': str(exc)}).encode('utf-8'), {}
+                    if status == 503:
+                        extra = {'Retry-After': '1'}
+                except ValueError as exc:
+                    status, content_type, payload, extra = 400, 'application/json', \
+                        json.dumps({'error': str(exc)}).encode('utf-8'), {}
+                except Exception as exc:
+                    status, content_type, payload, extra = 500, 'application/json', \
+                        json.dumps({'error': f"{type(exc).__name__}: {exc}"}).encode('utf-8'), {}
+                await _write_http_response(writer, status, content_type, payload, extra, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _route(self, method, target, body):
+        url = urllib_parse.urlsplit(target)
+        if url.path == '/health':
+            return 200, 'application/json', json.dumps(self.health()).encode('utf-8'), {}
+        if url.path != '/render':
+            raise HttpError(404, f"No such endpoint: {url.path}")
+        if method not in ('GET', 'POST'):
+            raise HttpError(405, f"Method not allowed: {method}")
+        query = urllib_parse.parse_qs(url.query)
+        dpi = None
+        if 'dpi' in query:
+            try:
+                dpi = int(query['dpi'][0])
+            except ValueError:
+                raise HttpError(400, "dpi must be an integer")
+        overrides = None
+        if method == 'POST' and body.strip():
+            try:
+                overrides = json.loads(body)
+            except json.JSONDecodeError as exc:
+                raise HttpError(400, f"Invalid JSON: {exc}")
+            if not isinstance(overrides, dict):
+                raise HttpError(400, "Request body must be a JSON object of content overrides")
+        priority = query.get('priority', ['interactive'])[0]
+        deadline = None
+        if 'deadline' in query:
+            try:
+                deadline = float(query['deadline'][0])
+            except ValueError:
+                raise HttpError(400, "deadline must be a number of seconds")
+        data, source = await self.render(overrides, dpi, priority, deadline)
+        return 200, 'application/pdf', data, {'X-Cache': source}
+
+async def _read_http_request(reader):
+    """Return (method, target, headers, body), or None once the client has closed the connection"""
+    line = await reader.readline()
+    if not line:
+        return None
+    try:
+        method, target, _ = line.decode('latin-1').split()
+    except ValueError:
+        raise HttpError(400, "Malformed request line")
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    length = int(headers.get('content-length') or 0)
+    if length > SERVICE_MAX_BODY:
+        raise HttpError(413, f"Request body over {SERVICE_MAX_BODY} bytes")
+    body = await reader.readexactly(length) if length else b''
+    return method.upper(), target, headers, body
+
+async def _write_http_response(writer, status, content_type, payload, extra, keep_alive):
+    """Send headers, then the body in chunks so a large PDF is streamed under flow control"""
+    head = [f"HTTP/1.1 {status} {_HTTP_REASONS.get(status, '')}",
+            f"Content-Type: {content_type}",
+            f"Content-Length: {len(payload)}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+    head += [f"{name}: {value}" for name, value in extra.items()]
+    writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1'))
+    view = memoryview(payload)
+    for start in range(0, len(view), SERVICE_CHUNK):
+        writer.write(view[start:start + SERVICE_CHUNK])
+        await writer.drain()
+    await writer.drain()
+
+def serve(host='127.0.0.1', port=8765, workers=None, queue_size=32, cache_size=128, output_cache=None,
+          classes=JOB_CLASSES):
+    """Run the render service until interrupted"""
+    async def run():
+        service = RenderService(workers, queue_size, cache_size, output_cache, classes)
+        await service.start()
+        server = await asyncio.start_server(service.handle, host, port)
+        print(f"Serving on http://{host}:{port}/render with {service.workers} warm workers", file=sys.stderr)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            await service.close()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+# ==================== FORK SERVER ====================
+#
+# `fork-server` is a long-lived process with reportlab imported, every image
+# encoded and the default plan compiled. `client -- <render args>` hands its
+# arguments to it over a unix socket and the server forks a child that runs
+# them with all of that already in memory. The child's stdout/stderr come
+# back as frames (1-byte channel, 4-byte length, data); channel 0 carries
+# the exit status. Unix only.
+
+FORK_SERVER_SOCKET = os.path.join(CACHE_DIR, 'render.sock')
+_FRAME_HEADER = struct.Struct('>BI')
+
+class _FrameWriter(io.RawIOBase):
+    """Sends everything written to it as frames on one channel of a socket"""
+
+    def __init__(self, sock, channel):
+        self.sock = sock
+        self.channel = channel
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.sock.sendall(_FRAME_HEADER.pack(self.channel, len(data)) + bytes(data))
+        return len(data)
+
+def _recv_exact(sock, n):
+    data = bytearray()
+    while len(data) < n:
+        chunk = sock.recv(n - len(data))
+        if not chunk:
+            raise ConnectionError("fork server closed the connection")
+        data += chunk
+    return bytes(data)
+
+def _fork_child(conn):
+    """Run one client request in a forked child and report its exit status"""
+    status = 1
+    stdout = io.TextIOWrapper(io.BufferedWriter(_FrameWriter(conn, 1)), encoding='utf-8', line_buffering=True)
+    stderr = io.TextIOWrapper(io.BufferedWriter(_FrameWriter(conn, 2)), encoding='utf-8', line_buffering=True)
+    sys.stdout, sys.stderr = stdout, stderr
+    try:
+        with conn.makefile('rb') as f:
+            request = json.loads(f.readline())
+        os.chdir(request['cwd'])
+        main(request['argv'])
+        status = 0
+    except SystemExit as exc:
+        status = exc.code if isinstance(exc.code, int) else (0 if exc.code is None else 1)
+        if not isinstance(exc.code, (int, type(None))):
+            print(exc.code, file=sys.stderr)
+    except Exception:
+        traceback.print_exc()
+    finally:
+        stdout.flush()
+        stderr.flush()
+        conn.sendall(_FRAME_HEADER.pack(0, 4) + struct.pack('>i', status))
+        conn.close()
+    return status
+
+def fork_server(path=FORK_SERVER_SOCKET):
+    """Preload everything a render needs, then fork a child per client request"""
+    if os.path.exists(path):
+        probe = socket.socket(socket.AF_UNIX)
+        try:
+            probe.connect(path)
+        except OSError:
+            os.unlink(path)  # stale socket from a server that died
+        else:
+            raise SystemExit(f"A fork server is already listening on {path}")
+        finally:
+            probe.close()
+    _init_batch_worker()
+    render_pdf_bytes()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    server = socket.socket(socket.AF_UNIX)
+    server.bind(path)
+    server.listen(64)
+    # Children are reaped automatically; SIGTERM shuts down cleanly like Ctrl-C
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    print(f"Fork server ready on {path}", file=sys.stderr)
+    try:
+        while True:
+            conn, _ = server.accept()
+            if os.fork() == 0:
+                for signum in (signal.SIGCHLD, signal.SIGINT, signal.SIGTERM):
+                    signal.signal(signum, signal.SIG_DFL)
+                server.close()
+                os._exit(_fork_child(conn))
+            conn.close()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        os.unlink(path)
+
+def fork_client(argv, path=FORK_SERVER_SOCKET):
+    """Run a render through the fork server; returns the exit status.
+
+    Falls back to rendering in this process when no server is listening.
+    """
+    sock = socket.socket(socket.AF_UNIX)
+    try:
+        sock.connect(path)
+    except OSError:
+        sock.close()
+        main(argv)
+        return 0
+    with sock:
+        sock.sendall(json.dumps({'argv': argv, 'cwd': os.getcwd()}).encode('utf-8') + b'\n')
+        outputs = {1: sys.stdout.buffer, 2: sys.stderr.buffer}
+        while True:
+            channel, length = _FRAME_HEADER.unpack(_recv_exact(sock, _FRAME_HEADER.size))
+            data = _recv_exact(sock, length)
+            if channel == 0:
+                return struct.unpack('>i', data)[0]
+            outputs[channel].write(data)
+            outputs[channel].flush()
+
+# ==================== BENCHMARKS ====================
+#
+# `bench` measures the renderer end to end and records a flat dict of
+# metrics (lower is better for all of them). Results can be saved as a
+# baseline and later runs checked against it with a tolerance, exiting
+# non-zero on a regression.
+
+BENCH_BASELINE = os.path.join(SCRIPT_DIR, 'bench_baseline.json')
+
+def _synthetic_rows(n):
+    """n distinct recipients, enough to defeat the plan cache"""
+    return [{'recipient': f"Prospect {i:04d} Pvt. Ltd.", 'phone': f"+91 98{i:08d}"} for i in range(n)]
+
+def _median_time(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+def bench_single(repeat=5):
+    """Cold/warm render time, per-page and image embed time, size and peak memory"""
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        # Cold: a fresh interpreter with empty on-disk caches
+        env = dict(os.environ, SURBAN_CACHE_DIR=os.path.join(tmp, 'cache'))
+        cmd = [sys.executable, os.path.abspath(__file__), '-o', os.path.join(tmp, 'cold.pdf')]
+        start = time.perf_counter()
+        subprocess.run(cmd, env=env, check=True, stdout=subprocess.DEVNULL)
+        results['single.cold_s'] = time.perf_counter() - start
+
+        # Image embed: decode and encode every placed image with no caches
+        images = sorted({path for ops in get_plan()['pages'] for path, _, _ in placed_images(ops)
+                         if os.path.exists(path)})
+        _IMAGE_XOBJECTS.clear()
+        start = time.perf_counter()
+        for path in images:
+            load_image_xobject(path, cache_dir=os.path.join(tmp, 'xobjects'))
+        results['single.image_embed_s'] = time.perf_counter() - start
+        _IMAGE_XOBJECTS.clear()
+
+    plan = get_plan()
+    data = render_pdf_bytes(plan=plan)  # warm every cache
+    results['single.warm_s'] = _median_time(lambda: create_profile_pdf(io.BytesIO(), verbose=False, plan=compile_plan(None)), repeat)
+    results['single.replay_s'] = _median_time(lambda: render_pdf_bytes(plan=plan), repeat)
+    for i, ops in enumerate(plan['pages'], 1):
+        results[f'single.page{i}_s'] = _median_time(lambda: render_page_pdf(ops, plan['pagesize']), repeat)
+    results['single.bytes'] = len(data)
+
+    tracemalloc.start()
+    render_pdf_bytes(plan=compile_plan(None))
+    results['single.peak_mb'] = tracemalloc.get_traced_memory()[1] / 1e6
+    tracemalloc.stop()
+    return results
+
+def bench_batch(n, workers=None, chunksize=4):
+    """Wall time, per-document time and output size for n synthetic variants"""
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        paths = list(render_batch(_synthetic_rows(n), tmp, workers, chunksize))
+        wall = time.perf_counter() - start
+        total = sum(os.path.getsize(p) for p in paths)
+    return {f'batch{n}.wall_s': wall, f'batch{n}.per_doc_s': wall / n, f'batch{n}.bytes': total}
+
+def run_benchmarks(batches=(100,), repeat=5, workers=None):
+    results = bench_single(repeat)
+    for n in batches:
+        results.update(bench_batch(n, workers))
+    return results
+
+def compare_to_baseline(results, baseline, tolerance=0.2):
+    """Return (metric, baseline, current) for every metric more than tolerance above its baseline"""
+    return [(name, baseline[name], value) for name, value in sorted(results.items())
+            if name in baseline and value > baseline[name] * (1 + tolerance)]
+
+def _format_metric(name, value):
+    if name.endswith('_s'):
+        return f"{value * 1000:10.1f} ms"
+    if name.endswith('bytes'):
+        return f"{value / 1024:10.1f} KiB"
+    return f"{value:10.2f} MB"
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate the S-Urban business profile PDF")
+    parser.add_argument('-o', '--output', default=os.path.join(SCRIPT_DIR, "S-Urban_Business_Profile.pdf"),
+                        help="output PDF path, or - to stream to stdout")
+    parser.add_argument('--content', help="JSON file of ProfileContent overrides")
+    parser.add_argument('--portfolio', help="SQLite project database for the portfolio pages and stats")
+    parser.add_argument('--plan', help="render a previously compiled plan instead of laying out content")
+    parser.add_argument('--display-list', help="replay a recorded display list; --profile re-encodes its streams")
+    parser.add_argument('--svg-dir', help="also write every page as an SVG into this directory, from the same drawing pass")
+    parser.add_argument('--dpi', type=int, default=None,
+                        help="resample images to this resolution (e.g. 150 screen, 300 print)")
+    parser.add_argument('--no-forms', dest='use_forms', action='store_false',
+                        help="draw page chrome inline instead of as shared Form XObjects")
+    parser.add_argument('--incremental', action='store_true',
+                        help="re-render only pages whose content or images changed since the last build")
+    parser.add_argument('--parallel', type=int, metavar='WORKERS',
+                        help="render page groups in this many worker processes and merge them")
+    parser.add_argument('--group-size', type=int, default=None,
+                        help="pages per --parallel group (default: spread evenly over the workers)")
+    parser.add_argument('--profile', choices=sorted(OUTPUT_PROFILES),
+                        help="size-optimised output: print (300 dpi), email (smallest) or web (150 dpi, linearized)")
+    parser.add_argument('--output-cache', action='store_true',
+                        help="reuse finished PDFs from the on-disk output cache (batch and serve too)")
+    parser.add_argument('--output-cache-mb', type=int, default=OUTPUT_CACHE_MAX_BYTES >> 20,
+                        help="size cap of the output cache in MiB (default %(default)s)")
+    parser.add_argument('--compress-level', type=int, choices=range(10), metavar='0-9',
+                        help="zlib level for page and form streams (default: zlib's own, as reportlab)")
+    parser.add_argument('--compress-threads', type=int, default=None,
+                        help=f"threads deflating streams at save time (default {SAVE_OPTIONS.threads})")
+    parser.add_argument('--report', help="write a JSON timing/counter report of the run to this path")
+    parser.add_argument('--trace', help="write a Chrome trace-event file of the run to this path")
+    sub = parser.add_subparsers(dest='command')
+
+    compile_cmd = sub.add_parser('compile', help="lay out the profile and write its render plan as JSON")
+    compile_cmd.add_argument('plan_output')
+
+    record_cmd = sub.add_parser('record', help="record the drawing calls of a render as a display list")
+    record_cmd.add_argument('display_list_output')
+
+    batch = sub.add_parser('batch', help="render per-recipient variants from a CSV/JSONL manifest")
+    batch.add_argument('manifest')
+    batch.add_argument('--out-dir', default=os.path.join(SCRIPT_DIR, 'batch_output'))
+    batch.add_argument('--workers', type=int, default=None, help="worker processes (default: CPU count)")
+    batch.add_argument('--chunksize', type=int, default=4, help="documents handed to a worker at a time")
+    batch.add_argument('--dpi', type=int, default=argparse.SUPPRESS, help="as for the single render")
+    batch.add_argument('--output-cache', action='store_true', default=argparse.SUPPRESS, help="as for the single render")
+    batch.add_argument('--stamp', action='store_true',
+                       help="render each distinct base document once and stamp " + ', '.join(STAMP_FIELDS) +
+                            " onto copies of it")
+
+    bench = sub.add_parser('bench', help="measure render time, size and memory against a stored baseline")
+    bench.add_argument('--batch', type=int, nargs='*', default=[100], help="synthetic batch sizes (e.g. 100 1000)")
+    bench.add_argument('--repeat', type=int, default=5, help="runs per warm measurement (median is kept)")
+    bench.add_argument('--workers', type=int, default=None, help="worker processes for the batch runs")
+    bench.add_argument('--baseline', default=BENCH_BASELINE, help="baseline JSON to compare against or save")
+    bench.add_argument('--save-baseline', action='store_true', help="store these results as the new baseline")
+    bench.add_argument('--check', action='store_true', help="exit non-zero if any metric regressed past --tolerance")
+    bench.add_argument('--tolerance', type=float, default=0.2, help="allowed fractional slowdown/growth (default 0.2)")
+    bench.add_argument('--json', help="also write the results to this file")
+
+    raster = sub.add_parser('raster', help="export page previews as PNG/WebP at several widths")
+    raster.add_argument('--out-dir', default=os.path.join(SCRIPT_DIR, 'previews'))
+    raster.add_argument('--widths', type=int, nargs='+', default=list(RASTER_WIDTHS), help="pixel widths")
+    raster.add_argument('--formats', nargs='+', choices=RASTER_FORMATS, default=list(RASTER_FORMATS))
+    raster.add_argument('--workers', type=int, default=None, help="worker processes (default: CPU count)")
+
+    regress_cmd = sub.add_parser('regress', help="compare every rendered page against stored golden images")
+    regress_cmd.add_argument('--manifest', help="check each variant of a batch manifest instead of the single profile")
+    regress_cmd.add_argument('--goldens', default=GOLDEN_DIR, help="golden image directory")
+    regress_cmd.add_argument('--out-dir', default=None, help="where diff heatmaps go (default: <goldens>/_diff)")
+    regress_cmd.add_argument('--width', type=int, default=REGRESS_WIDTH, help="raster width for --update, in pixels")
+    regress_cmd.add_argument('--update', action='store_true', help="store the current pages as the new goldens")
+    regress_cmd.add_argument('--min-ssim', type=float, default=REGRESS_MIN_SSIM, help="lowest SSIM allowed in any window")
+    regress_cmd.add_argument('--max-changed', type=float, default=REGRESS_MAX_CHANGED,
+                             help="fraction of pixels allowed to differ")
+    regress_cmd.add_argument('--workers', type=int, default=None, help="worker processes (default: CPU count)")
+    regress_cmd.add_argument('--json', help="also write every page's scores to this file")
+
+    portfolio_cmd = sub.add_parser('portfolio', help="import projects into a portfolio database and show its figures")
+    portfolio_cmd.add_argument('database')
+    portfolio_cmd.add_argument('--import', dest='import_csv', metavar='CSV',
+                               help="add the projects in this CSV (columns: " + ', '.join(PORTFOLIO_FIELDS) + ")")
+    portfolio_cmd.add_argument('--replace', action='store_true', help="delete the existing projects before importing")
+
+    cache_cmd = sub.add_parser('cache', help="show output cache statistics, or prune/clear it")
+    cache_cmd.add_argument('--prune-mb', type=int, default=None, help="evict least recently used PDFs down to this size")
+    cache_cmd.add_argument('--clear', action='store_true', help="remove every cached PDF and reset the counters")
+    cache_cmd.add_argument('--json', action='store_true', help="print the statistics as JSON")
+    cache_cmd.add_argument('--output-cache-mb', type=int, default=argparse.SUPPRESS, help="size cap in MiB")
+
+    site = sub.add_parser('site', help="build the static web page from the profile content")
+    site.add_argument('--out-dir', default=os.path.join(SCRIPT_DIR, 'dist'))
+    site.add_argument('--no-pdf', dest='pdf', action='store_false', help="skip writing the web-profile PDF")
+
+    serve_cmd = sub.add_parser('serve', help="run a local HTTP render service with warm workers")
+    serve_cmd.add_argument('--host', default='127.0.0.1')
+    serve_cmd.add_argument('--port', type=int, default=8765)
+    serve_cmd.add_argument('--workers', type=int, default=None, help="render processes (default: CPU count)")
+    serve_cmd.add_argument('--queue', type=int, default=32,
+                           help="interactive jobs allowed to wait before answering 503")
+    serve_cmd.add_argument('--deadline', type=float, default=JOB_CLASSES['interactive'].deadline,
+                           help="seconds an interactive request may take before answering 504 (0: none)")
+    serve_cmd.add_argument('--bulk-queue', type=int, default=JOB_CLASSES['bulk'].queue_size,
+                           help="bulk jobs allowed to wait; further bulk requests wait for room")
+    serve_cmd.add_argument('--bulk-share', type=float, default=JOB_CLASSES['bulk'].max_share,
+                           help="fraction of the workers bulk jobs may occupy at once")
+    serve_cmd.add_argument('--cache-size', type=int, default=128, help="rendered PDFs kept in the response LRU")
+    serve_cmd.add_argument('--output-cache', action='store_true', default=argparse.SUPPRESS,
+                           help="back the LRU with the shared on-disk output cache")
+
+    fork_cmd = sub.add_parser('fork-server', help="preload reportlab and assets, then fork a child per client render")
+    fork_cmd.add_argument('--socket', default=FORK_SERVER_SOCKET)
+
+    client = sub.add_parser('client', help="run a render through a running fork server (in-process if none)")
+    client.add_argument('--socket', default=FORK_SERVER_SOCKET)
+    client.add_argument('render_args', nargs=argparse.REMAINDER,
+                        help="arguments for the render, after --, e.g. -- -o out.pdf --content c.json")
+
+    args = parser.parse_args(argv)
+    if args.profile and args.incremental:
+        parser.error("--profile cannot be combined with --incremental")
+    if args.display_list and args.plan:
+        parser.error("--display-list cannot be combined with --plan")
+    if (args.display_list or args.svg_dir) and (args.incremental or args.output_cache):
+        parser.error("--display-list and --svg-dir cannot be combined with --incremental or --output-cache")
+    if args.parallel and (args.incremental or args.profile or args.output_cache or args.display_list or args.svg_dir):
+        parser.error("--parallel cannot be combined with --incremental, --profile, --output-cache, "
+                     "--display-list or --svg-dir")
+    if args.output_cache and args.incremental:
+        parser.error("--output-cache cannot be combined with --incremental")
+    configure_save(args.compress_level, args.compress_threads)
+    output_cache = OutputCache(max_bytes=args.output_cache_mb << 20) if args.output_cache else None
+    overrides = None
+    if args.content:
+        with open(args.content, encoding='utf-8') as f:
+            overrides = json.load(f)
+    if args.portfolio:
+        overrides = dict(overrides or {}, portfolio=args.portfolio)
+    try:
+        resolve_content(overrides)
+    except ValueError as exc:
+        parser.error(str(exc))
+
+    if args.command == 'compile':
+        save_plan(compile_plan(overrides), args.plan_output)
+        print(f"Render plan written: {args.plan_output}")
+    elif args.command == 'record':
+        plan = load_plan(args.plan) if args.plan else get_plan(overrides, cache_dir=PLAN_CACHE_DIR)
+        if args.dpi:
+            plan = prepare_assets(plan, args.dpi)
+        display_list = record_display_list(plan, args.use_forms)
+        save_display_list(display_list, args.display_list_output)
+        print(f"Display list written: {args.display_list_output} "
+              f"({sum(map(len, display_list['pages']))} ops, {os.path.getsize(args.display_list_output) / 1024:.1f} KiB)")
+    elif args.command == 'batch':
+        if args.stamp and output_cache is not None:
+            parser.error("--stamp cannot be combined with --output-cache")
+        rows = load_manifest(args.manifest)
+        if args.stamp:
+            paths = render_stamped_batch(rows, args.out_dir, args.workers, args.chunksize, args.dpi, args.use_forms)
+        else:
+            paths = render_batch(rows, args.out_dir, args.workers, args.chunksize, args.dpi, output_cache)
+        count = 0
+        for count, path in enumerate(paths, 1):
+            pass
+        print(f"Rendered {count} profiles into {args.out_dir}")
+    elif args.command == 'raster':
+        plan = load_plan(args.plan) if args.plan else get_plan(overrides, cache_dir=PLAN_CACHE_DIR)
+        paths, drawn = export_rasters(plan, args.out_dir, args.widths, args.formats, args.workers)
+        print(f"Wrote {len(paths)} previews to {args.out_dir} ({drawn} of {len(plan['pages'])} pages drawn)")
+    elif args.command == 'regress':
+        if args.manifest:
+            rows = load_manifest(args.manifest)
+            variants = [(os.path.splitext(name)[0],
+                         get_plan({k: v for k, v in row.items() if k != 'output'}, cache_dir=PLAN_CACHE_DIR))
+                        for name, row in zip(_batch_output_names(rows), rows)]
+        else:
+            variants = [('default', load_plan(args.plan) if args.plan else get_plan(overrides, cache_dir=PLAN_CACHE_DIR))]
+        if args.update:
+            stored = store_goldens(variants, args.goldens, args.width, args.workers)
+            print(f"Stored {stored} golden pages for {len(variants)} variant(s) in {args.goldens}")
+            return
+        start = time.perf_counter()
+        diffs = regress(variants, args.goldens, args.out_dir, args.workers, args.min_ssim, args.max_changed)
+        seconds = time.perf_counter() - start
+        if args.json:
+            with open(args.json, 'w', encoding='utf-8') as f:
+                json.dump([diff._asdict() for diff in diffs], f, indent=2)
+        for diff in diffs:
+            if diff.status == 'changed':
+                print(f"CHANGED {diff.variant} page {diff.page}: ssim {diff.ssim:.4f} (worst window "
+                      f"{diff.worst_ssim:.3f}), {diff.changed:.3%} pixels differ -> {diff.heatmap}")
+            elif diff.status != 'ok':
+                print(f"{diff.status.upper()} {diff.variant} page {diff.page}")
+        counts = {}
+        for diff in diffs:
+            counts[diff.status] = counts.get(diff.status, 0) + 1
+        summary = ', '.join(f"{n} {status}" for status, n in sorted(counts.items()))
+        print(f"Checked {len(diffs)} pages of {len(variants)} variant(s) in {seconds:.2f} s: {summary}")
+        if set(counts) - {'ok'}:
+            sys.exit(1)
+    elif args.command == 'portfolio':
+        if args.import_csv:
+            with open(args.import_csv, newline='', encoding='utf-8') as f:
+                added = import_projects(args.database, csv.DictReader(f), args.replace)
+            print(f"Imported {added} projects into {args.database}")
+        stats = portfolio_stats(args.database)
+        if not stats.projects:
+            print(f"No projects in {args.database}")
+            return
+        print(f"{stats.projects:,} projects since {stats.first_year}, {stats.clients:,} clients, "
+              f"{stats.regions:,} regions")
+        for category, count in stats.categories:
+            print(f"  {count:8,}  {category}")
+    elif args.command == 'cache':
+        cache = OutputCache(max_bytes=args.output_cache_mb << 20)
+        if args.clear:
+            cache.clear()
+        elif args.prune_mb is not None:
+            print(f"Evicted {cache.prune(args.prune_mb << 20)} cached PDFs")
+        stats = cache.stats()
+        if args.json:
+            print(json.dumps(stats, indent=2))
+        else:
+            print(f"{stats['entries']} PDFs, {stats['bytes'] / (1 << 20):.1f} of {stats['max_bytes'] >> 20} MiB "
+                  f"in {cache.cache_dir}")
+            print(f"{stats['hits']} hits, {stats['misses']} misses ({stats['hit_rate']:.1%} hit rate), "
+                  f"{stats['stores']} stores, {stats['evictions']} evictions")
+    elif args.command == 'site':
+        stats = build_site(args.out_dir, overrides, args.pdf)
+        kib = lambda n: f"{n / 1024:.1f} KiB"
+        print(f"Site written to {args.out_dir}: index.html {kib(stats['html_bytes'])}")
+        print(f"CSS: {kib(stats['critical_css_bytes'])} critical inline, {kib(stats['css_bytes'])} full sheet deferred")
+        print(f"Images: {stats['image_variants']} variants of {stats['images']} sources; placed images "
+              f"{kib(stats['page_image_source_bytes'])} -> {kib(stats['page_image_bytes'])} at 1x")
+    elif args.command == 'fork-server':
+        fork_server(args.socket)
+    elif args.command == 'client':
+        render_args = args.render_args[1:] if args.render_args[:1] == ['--'] else args.render_args
+        sys.exit(fork_client(render_args, args.socket))
+    elif args.command == 'serve':
+        classes = dict(JOB_CLASSES, interactive=JOB_CLASSES['interactive']._replace(deadline=args.deadline),
+                       bulk=JOB_CLASSES['bulk']._replace(queue_size=args.bulk_queue, max_share=args.bulk_share))
+        serve(args.host, args.port, args.workers, args.queue, args.cache_size, output_cache, classes)
+    elif args.command == 'bench':
+        results = run_benchmarks(args.batch, args.repeat, args.workers)
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, encoding='utf-8') as f:
+                baseline = json.load(f)
+        for name, value in results.items():
+            delta = f"  {(value / baseline[name] - 1) * 100:+6.1f}%" if baseline.get(name) else ''
+            print(f"{name:24} {_format_metric(name, value)}{delta}")
+        if args.json:
+            with open(args.json, 'w', encoding='utf-8') as f:
+                json.dump(results, f, indent=2)
+        if args.save_baseline:
+            with open(args.baseline, 'w', encoding='utf-8') as f:
+                json.dump(results, f, indent=2)
+            print(f"Baseline saved: {args.baseline}")
+        if args.check:
+            regressions = compare_to_baseline(results, baseline, args.tolerance)
+            for name, old, new in regressions:
+                print(f"REGRESSION {name}: {_format_metric(name, old).strip()} -> {_format_metric(name, new).strip()}",
+                      file=sys.stderr)
+            if not baseline:
+                print(f"No baseline at {args.baseline}; run with --save-baseline first", file=sys.stderr)
+            if regressions or not baseline:
+                sys.exit(1)
+    else:
+        with instrumented() if args.report or args.trace else contextlib.nullcontext() as inst:
+            output = sys.stdout.buffer if args.output == '-' else args.output
+            if args.display_list or args.svg_dir:
+                if args.display_list:
+                    display_list = load_display_list(args.display_list)
+                else:
+                    with span('plan', 'layout'):
+                        plan = load_plan(args.plan) if args.plan else get_plan(overrides, cache_dir=PLAN_CACHE_DIR)
+                    if args.profile:
+                        settings = OUTPUT_PROFILES[args.profile]
+                        plan = prepare_assets(plan, args.dpi or settings.dpi, settings.jpeg_quality)
+                    elif args.dpi:
+                        plan = prepare_assets(plan, args.dpi)
+                    with span('record', 'render'):
+                        display_list = record_display_list(plan, args.use_forms)
+                with span('render', 'render'):
+                    render_display_list(output, display_list, args.profile)
+                if args.svg_dir:
+                    with span('svg', 'render'):
+                        paths = export_svgs(display_list, args.svg_dir)
+                    size = sum(os.path.getsize(path) for path in paths)
+                    print(f"Wrote {len(paths)} SVGs ({size / 1024:.1f} KiB) to {args.svg_dir}",
+                          file=sys.stdout if isinstance(output, str) else sys.stderr)
+            else:
+                # A portfolio is laid out as it is written unless the render needs the whole plan
+                lazy = (not (args.plan or args.profile or args.parallel or args.incremental) and output_cache is None
+                        and resolve_content(overrides).portfolio)
+                with span('plan', 'layout'):
+                    if args.plan:
+                        plan = load_plan(args.plan)
+                    elif not lazy:
+                        plan = get_plan(overrides, cache_dir=PLAN_CACHE_DIR)
+                with span('render', 'render'):
+                    if output_cache is not None:
+                        render_cached(output, plan=plan, dpi=args.dpi, use_forms=args.use_forms, profile=args.profile,
+                                      cache=output_cache)
+                    elif args.profile:
+                        render_profile_pdf(output, args.profile, plan=plan, dpi=args.dpi, use_forms=args.use_forms)
+                    elif args.parallel:
+                        render_parallel_pdf(output, plan=plan, dpi=args.dpi, use_forms=args.use_forms,
+                                            workers=args.parallel, group_size=args.group_size)
+                    elif lazy:
+                        create_profile_pdf(output, overrides, dpi=args.dpi, use_forms=args.use_forms)
+                    else:
+                        render = build_profile_pdf if args.incremental else create_profile_pdf
+                        render(output, plan=plan, dpi=args.dpi, use_forms=args.use_forms)
+        if args.report:
+            inst.write_report(args.report)
+            print(f"Instrumentation report written: {args.report}", file=sys.stderr)
+        if args.trace:
+            inst.write_trace(args.trace)
+            print(f"Trace written: {args.trace}", file=sys.stderr)
 
 if __name__ == "__main__":
-    output_path = os.path.join(SCRIPT_DIR, "S-Urban_Business_Profile.pdf")
-    create_profile_pdf(output_path)
+    main()
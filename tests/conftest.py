@@ -0,0 +1,48 @@
+import importlib.util
+import os
+import sys
+
+import pytest
+
+SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'S-Urban_Business_Profile_Code.py')
+
+
+def _load():
+    # The script's file name is not importable; register it under a module
+    # name so the process pools can pickle its functions
+    if 'surban' not in sys.modules:
+        spec = importlib.util.spec_from_file_location('surban', SCRIPT)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules['surban'] = module
+        spec.loader.exec_module(module)
+    return sys.modules['surban']
+
+
+@pytest.fixture(scope='session')
+def surban():
+    return _load()
+
+
+@pytest.fixture(scope='session')
+def plan(surban):
+    return surban.compile_plan(surban.resolve_content())
+
+
+def _page_pixels(pdf, dpi=40):
+    """Every page of a PDF (path or bytes) rasterized by MuPDF, as arrays"""
+    import numpy as np
+    import pymupdf
+    doc = pymupdf.open(pdf) if isinstance(pdf, str) else pymupdf.open(stream=pdf, filetype='pdf')
+    with doc:
+        return [np.frombuffer(page.get_pixmap(dpi=dpi, alpha=False).samples, np.uint8) for page in doc]
+
+
+@pytest.fixture(scope='session')
+def page_pixels():
+    return _page_pixels
+
+
+@pytest.fixture(scope='session')
+def reference_pdf(surban, plan):
+    """The profile rendered on a single canvas, the output the other writers must match"""
+    return surban.render_pdf_bytes(plan=plan)
@@ -0,0 +1,51 @@
+import os
+
+from PIL import Image
+
+
+def _image(path, size, mode='RGB'):
+    Image.new(mode, size, (200, 120, 40, 128) if mode == 'RGBA' else (200, 120, 40)).save(path)
+    return str(path)
+
+
+def test_large_images_are_downsampled_to_their_box(surban, tmp_path):
+    src = _image(tmp_path / 'big.jpg', (1200, 600))
+    # 100 x 50 points at 144 dpi
+    out = surban.prepared_asset(src, 100, 50, 144, cache_dir=str(tmp_path / 'assets'))
+    with Image.open(out) as im:
+        assert im.format == 'JPEG'
+        assert im.size == (200, 100)
+
+
+def test_small_images_are_never_upsampled(surban, tmp_path):
+    cache_dir = str(tmp_path / 'assets')
+    for name, mode, fmt in (('small.png', 'RGBA', 'PNG'), ('small.jpg', 'RGB', 'JPEG')):
+        src = _image(tmp_path / name, (40, 30), mode)
+        out = surban.prepared_asset(src, 500, 500, 300, cache_dir=cache_dir)
+        with Image.open(out) as im:
+            assert im.format == fmt
+            assert im.size == (40, 30)
+
+
+def test_prepared_assets_come_from_the_cache(surban, tmp_path, monkeypatch):
+    src = _image(tmp_path / 'big.jpg', (1200, 600))
+    cache_dir = str(tmp_path / 'assets')
+    first = surban.prepared_asset(src, 100, 50, 144, cache_dir=cache_dir)
+
+    def reopened(*args, **kwargs):
+        raise AssertionError("a cached asset was resampled again")
+
+    monkeypatch.setattr(surban.Image, 'open', reopened)
+    assert surban.prepared_asset(src, 100, 50, 144, cache_dir=cache_dir) == first
+    assert os.listdir(cache_dir) == [os.path.basename(first)]
+
+
+def test_images_are_prepared_once_at_their_largest_placement(surban, tmp_path):
+    src = _image(tmp_path / 'logo.jpg', (1200, 1200))
+    pages = [[('photo', src, 0, 0, 50)], [('photo', src, 0, 0, 150), ('photo', src, 0, 0, 100)]]
+    mapping = surban.asset_mapping(pages, 72, cache_dir=str(tmp_path / 'assets'))
+    with Image.open(mapping[src]) as im:
+        assert im.size == (150, 150)
+    missing = str(tmp_path / 'missing.png')
+    # Unreadable images are left to the draw helpers' fallback
+    assert surban.asset_mapping([[('photo', missing, 0, 0, 50)]], 72, cache_dir=str(tmp_path / 'assets')) == {}
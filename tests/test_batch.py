@@ -0,0 +1,42 @@
+import os
+
+import pytest
+
+
+def test_repeated_recipients_get_distinct_files(surban):
+    rows = [{'recipient': "Acme Ltd"}, {'recipient': "Acme Ltd", 'phone': "+91 00000 00000"},
+            {'recipient': "Acme Ltd"}, {}]
+    names = surban._batch_output_names(rows)
+    assert names == ["S-Urban_Business_Profile_Acme-Ltd.pdf", "S-Urban_Business_Profile_Acme-Ltd-2.pdf",
+                     "S-Urban_Business_Profile_Acme-Ltd-3.pdf", "S-Urban_Business_Profile_4.pdf"]
+
+
+def test_default_names_avoid_explicit_outputs(surban):
+    rows = [{'recipient': "Acme Ltd"}, {'output': "S-Urban_Business_Profile_Acme-Ltd.pdf"}]
+    assert surban._batch_output_names(rows) == ["S-Urban_Business_Profile_Acme-Ltd-2.pdf",
+                                                "S-Urban_Business_Profile_Acme-Ltd.pdf"]
+
+
+def test_repeated_explicit_output_is_rejected(surban):
+    with pytest.raises(ValueError, match="row 2"):
+        surban._batch_output_names([{'output': "a.pdf"}, {'output': "a.pdf"}])
+
+
+@pytest.mark.parametrize('stamp', [False, True])
+def test_batch_writes_one_file_per_row(surban, tmp_path, stamp):
+    rows = [{'recipient': "Acme Ltd"}, {'recipient': "Acme Ltd", 'phone': "+91 00000 00000"}, {'recipient': "Acme Ltd"}]
+    if stamp:
+        paths = list(surban.render_stamped_batch(rows, str(tmp_path), workers=1))
+    else:
+        paths = list(surban.render_batch(rows, str(tmp_path), workers=1))
+    assert len(set(paths)) == 3
+    assert sorted(os.listdir(tmp_path)) == sorted(os.path.basename(p) for p in paths)
+
+
+def test_stamped_batch_spreads_rows_over_workers(surban, tmp_path):
+    rows = [{'recipient': f"Client {i}", 'reference': f"REF-{i}"} for i in range(6)]
+    paths = list(surban.render_stamped_batch(rows, str(tmp_path), workers=2, chunksize=2))
+    assert [os.path.basename(p) for p in paths] == surban._batch_output_names(rows)
+    for path in paths:
+        with open(path, 'rb') as f:
+            assert f.read().rstrip().endswith(b'%%EOF')
@@ -0,0 +1,47 @@
+import json
+
+import pytest
+
+BASELINE = {'single.warm_s': 0.5, 'single.bytes': 100000, 'batch100.wall_s': 10.0}
+
+
+def test_compare_to_baseline(surban):
+    results = {'single.warm_s': 0.61, 'single.bytes': 119000, 'batch100.wall_s': 4.0, 'single.peak_mb': 9.0}
+    # Over the tolerance, within it, faster, and a metric the baseline lacks
+    assert surban.compare_to_baseline(results, BASELINE) == [('single.warm_s', 0.5, 0.61)]
+    assert surban.compare_to_baseline(results, BASELINE, tolerance=0.1) == [
+        ('single.bytes', 100000, 119000), ('single.warm_s', 0.5, 0.61)]
+    assert surban.compare_to_baseline(results, {}) == []
+
+
+def _bench(surban, monkeypatch, tmp_path, results, *args):
+    monkeypatch.setattr(surban, 'run_benchmarks', lambda batches, repeat, workers: dict(results))
+    baseline = str(tmp_path / 'baseline.json')
+    try:
+        surban.main(['bench', '--baseline', baseline, *args])
+    except SystemExit as e:
+        return e.code, baseline
+    return 0, baseline
+
+
+def test_bench_check_exits_on_a_regression(surban, monkeypatch, tmp_path, capsys):
+    code, baseline = _bench(surban, monkeypatch, tmp_path, BASELINE, '--save-baseline')
+    assert code == 0
+    with open(baseline) as f:
+        assert json.load(f) == BASELINE
+    assert _bench(surban, monkeypatch, tmp_path, dict(BASELINE, **{'single.warm_s': 0.55}), '--check')[0] == 0
+    assert _bench(surban, monkeypatch, tmp_path, dict(BASELINE, **{'single.warm_s': 0.7}), '--check')[0] == 1
+    assert "REGRESSION single.warm_s" in capsys.readouterr().err
+
+
+def test_bench_check_needs_a_baseline(surban, monkeypatch, tmp_path, capsys):
+    assert _bench(surban, monkeypatch, tmp_path, BASELINE, '--check')[0] == 1
+    assert "run with --save-baseline first" in capsys.readouterr().err
+
+
+def test_bench_batch_metrics(surban):
+    n = 3
+    results = surban.bench_batch(n, workers=1)
+    assert set(results) == {f'batch{n}.wall_s', f'batch{n}.per_doc_s', f'batch{n}.bytes'}
+    assert results[f'batch{n}.per_doc_s'] == pytest.approx(results[f'batch{n}.wall_s'] / n)
+    assert results[f'batch{n}.bytes'] > 0
@@ -0,0 +1,59 @@
+import io
+import json
+import zlib
+
+import pikepdf
+import pytest
+
+
+def _page_contents(data):
+    """Decoded content stream of every page, and of every form they use"""
+    with pikepdf.open(io.BytesIO(data)) as pdf:
+        pages = [page.obj.Contents.read_bytes() for page in pdf.pages]
+        forms = {str(name): xobj.read_bytes() for page in pdf.pages
+                 for name, xobj in page.obj.Resources.get('/XObject', {}).items()
+                 if xobj.get('/Subtype') == '/Form'}
+    return pages, forms
+
+
+@pytest.fixture(scope='module')
+def display_list(surban, plan):
+    return surban.record_display_list(plan)
+
+
+def test_replay_draws_the_same_pages(surban, plan, display_list, reference_pdf, page_pixels, tmp_path):
+    path = str(tmp_path / 'profile.dl')
+    surban.save_display_list(display_list, path)
+    loaded = surban.load_display_list(path)
+    assert loaded == json.loads(json.dumps(display_list))
+    out = io.BytesIO()
+    assert surban.render_display_list(out, loaded, verbose=False) == len(out.getvalue())
+    assert _page_contents(out.getvalue()) == _page_contents(reference_pdf)
+    pages = page_pixels(out.getvalue())
+    assert len(pages) == len(plan['pages'])
+    assert all((a == b).all() for a, b in zip(pages, page_pixels(reference_pdf)))
+
+
+def test_replay_without_forms(surban, plan):
+    display_list = surban.record_display_list(plan, use_forms=False)
+    assert display_list['forms'] == {}
+    assert not any(op[0] == 'doForm' for ops in display_list['pages'] for op in ops)
+    out = io.BytesIO()
+    surban.render_display_list(out, display_list, verbose=False)
+    assert _page_contents(out.getvalue()) == _page_contents(surban.render_pdf_bytes(plan=plan, use_forms=False))
+
+
+def test_replay_under_a_profile(surban, display_list):
+    out = io.BytesIO()
+    surban.render_display_list(out, display_list, profile='web', verbose=False)
+    with pikepdf.open(io.BytesIO(out.getvalue())) as pdf:
+        assert pdf.is_linearized
+        assert len(pdf.pages) == len(display_list['pages'])
+
+
+def test_stale_display_lists_are_refused(surban, display_list, tmp_path):
+    path = str(tmp_path / 'old.dl')
+    with open(path, 'wb') as f:
+        f.write(zlib.compress(b'{"version": 0, "pages": []}'))
+    with pytest.raises(ValueError, match="version 0"):
+        surban.load_display_list(path)
@@ -0,0 +1,49 @@
+import json
+
+
+def test_nothing_is_recorded_outside_a_block(surban):
+    assert surban._INSTRUMENT is None
+    assert surban.span('page') is surban._NO_SPAN
+    surban.count_event('text_layouts')
+
+
+def test_report_covers_every_page_and_op(surban, plan):
+    events = []
+    with surban.instrumented([lambda *event: events.append(event)]) as inst:
+        surban.render_pdf_bytes(plan=plan)
+    assert surban._INSTRUMENT is None
+    report = inst.report()
+    ops = sum(len(page) for page in plan['pages'])
+    assert [page['page'] for page in report['pages']] == list(range(1, len(plan['pages']) + 1))
+    assert [page['ops'] for page in report['pages']] == [len(page) for page in plan['pages']]
+    assert sum(n for name, n in report['counters'].items() if name.startswith('ops.')) == ops
+    assert report['spans']['page']['calls'] == len(plan['pages'])
+    assert sum(entry['calls'] for name, entry in report['spans'].items() if name.startswith('op_')) == ops
+    for entry in report['spans'].values():
+        assert 0 <= entry['max_ms'] <= entry['total_ms']
+    # Hooks see every span and count as it happens
+    assert sum(1 for kind, *_ in events if kind == 'span') == len(inst.spans)
+    assert sum(n for kind, _, n, _ in events if kind == 'count') == sum(inst.counters.values())
+
+
+def test_blocks_nest(surban):
+    with surban.instrumented() as outer:
+        with surban.instrumented() as inner:
+            surban.count_event('x')
+        surban.count_event('y')
+    assert inner.counters == {'x': 1}
+    assert outer.counters == {'y': 1}
+
+
+def test_cli_writes_report_and_trace(surban, plan, tmp_path):
+    report_path, trace_path = str(tmp_path / 'report.json'), str(tmp_path / 'trace.json')
+    surban.main(['-o', str(tmp_path / 'out.pdf'), '--report', report_path, '--trace', trace_path])
+    with open(report_path) as f:
+        report = json.load(f)
+    assert len(report['pages']) == len(plan['pages'])
+    with open(trace_path) as f:
+        trace = json.load(f)
+    events = trace['traceEvents']
+    assert {event['ph'] for event in events} == {'X'}
+    assert sum(1 for event in events if event['name'] == 'page') == len(plan['pages'])
+    assert all(event['dur'] >= 0 and event['ts'] >= 0 for event in events)
@@ -0,0 +1,60 @@
+import pytest
+from reportlab.pdfbase.pdfmetrics import stringWidth
+
+TEXT = ("Urban regeneration, residential schemes and mixed-use developments delivered "
+        "across London and the South East for private and public sector clients")
+FONT = 'Helvetica'
+
+
+def test_lines_fit_and_keep_every_word(surban):
+    layout = surban.layout_text(TEXT, FONT, 10, 150, x=20, y=700)
+    assert not layout.overflow
+    assert len(layout.lines) > 2
+    assert ' '.join(line.text for line in layout.lines) == ' '.join(TEXT.split())
+    for i, line in enumerate(layout.lines):
+        assert line.width <= 150
+        assert line.width == pytest.approx(stringWidth(line.text, FONT, 10))
+        assert (line.x, line.y) == (20, pytest.approx(700 - i * 12))
+    assert layout.height == pytest.approx(12 * len(layout.lines))
+    # Greedy: the next word would not have fitted on any line
+    for line, following in zip(layout.lines, layout.lines[1:]):
+        assert stringWidth(line.text + ' ' + following.text.split()[0], FONT, 10) >= 150
+
+
+def test_a_word_wider_than_the_box_gets_its_own_line(surban):
+    layout = surban.layout_text("a Supercalifragilistic b", FONT, 12, 40)
+    assert [line.text for line in layout.lines] == ["a", "Supercalifragilistic", "b"]
+    assert layout.lines[1].width > 40
+
+
+def test_max_lines_ends_in_an_ellipsis(surban):
+    full = surban.layout_text(TEXT, FONT, 10, 150)
+    layout = surban.layout_text(TEXT, FONT, 10, 150, max_lines=2)
+    assert layout.overflow
+    assert len(layout.lines) == 2
+    assert layout.lines[0] == full.lines[0]
+    assert layout.lines[1].text.endswith('...')
+    assert layout.lines[1].width <= 150
+    # Exactly enough lines is not an overflow
+    assert not surban.layout_text(TEXT, FONT, 10, 150, max_lines=len(full.lines)).overflow
+
+
+@pytest.mark.parametrize('align', ['centre', 'right', 'justify'])
+def test_alignment(surban, align):
+    layout = surban.layout_text(TEXT, FONT, 10, 150, x=20, align=align)
+    *body, last = layout.lines
+    for line in body:
+        if align == 'centre':
+            assert line.x == pytest.approx(20 + (150 - line.width) / 2)
+        elif align == 'right':
+            assert line.x + line.width == pytest.approx(170)
+        else:
+            gaps = len(line.text.split()) - 1
+            assert line.x == 20
+            assert line.width + gaps * line.word_space == pytest.approx(150)
+    if align == 'justify':
+        assert last.word_space == 0
+
+
+def test_empty_text(surban):
+    assert surban.layout_text("   ", FONT, 10, 150) == surban.TextLayout([], 0, False)
@@ -0,0 +1,59 @@
+import itertools
+import random
+
+import pytest
+
+
+def _row_used(widths, row, gap):
+    return sum(widths[i] for i in row) + gap * (len(row) - 1)
+
+
+def _best_by_brute_force(widths, row_width, gap):
+    """(rows, summed squared slack) of the best split of widths into contiguous rows"""
+    n = len(widths)
+    best = None
+    for cuts in itertools.product([False, True], repeat=n - 1):
+        bounds = [0] + [i + 1 for i, cut in enumerate(cuts) if cut] + [n]
+        rows = [list(range(a, b)) for a, b in zip(bounds, bounds[1:])]
+        if any(len(row) > 1 and _row_used(widths, row, gap) > row_width for row in rows):
+            continue
+        cost = (len(rows), sum((row_width - _row_used(widths, row, gap)) ** 2 for row in rows))
+        best = cost if best is None else min(best, cost)
+    return best
+
+
+def test_rows_are_as_few_and_as_even_as_possible(surban):
+    # Greedy filling gives 80 + 50; moving a card down evens it to 60 + 70
+    assert surban.pack_rows([20, 20, 20, 20, 50], 100, 0) == [[0, 1, 2], [3, 4]]
+    # Fewer rows come first: a lone 10 on its own row would be evener but costs a row
+    assert len(surban.pack_rows([90, 10, 90], 100, 0)) == 2
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_matches_brute_force(surban, seed):
+    rng = random.Random(seed)
+    widths = [rng.uniform(20, 90) for _ in range(rng.randint(1, 10))]
+    row_width, gap = 200, 8
+    rows = surban.pack_rows(widths, row_width, gap)
+    assert [i for row in rows for i in row] == list(range(len(widths)))
+    assert all(len(row) == 1 or _row_used(widths, row, gap) <= row_width for row in rows)
+    slack = sum((row_width - _row_used(widths, row, gap)) ** 2 for row in rows)
+    best = _best_by_brute_force(widths, row_width, gap)
+    assert len(rows) == best[0]
+    assert slack == pytest.approx(best[1])
+
+
+def test_a_card_wider_than_the_row_gets_its_own(surban):
+    assert surban.pack_rows([30, 250, 30], 200, 8) == [[0], [1], [2]]
+    assert surban.pack_rows([], 200, 8) == []
+
+
+def test_logo_wall_cards_stay_inside_the_wall(surban):
+    sizes = [(400, 100), (100, 100), None, (300, 200), (800, 100), (120, 60)] * 4
+    x, width, top, bottom = 40, 500, 600, 300
+    placed = surban.layout_logo_wall(sizes, x, width, top, bottom)
+    assert sorted(card[-1] for card in placed) == list(range(len(sizes)))
+    for page_no, cx, y, w, h, _ in placed:
+        assert x - 1e-6 <= cx and cx + w <= x + width + 1e-6
+        if page_no == 0:
+            assert bottom - 1e-6 <= y and y + h <= top + 1e-6
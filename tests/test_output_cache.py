@@ -0,0 +1,90 @@
+import multiprocessing
+import os
+import shutil
+
+import pytest
+
+
+def test_compress_level_changes_page_and_output_keys(surban, plan):
+    ops = plan['pages'][0]
+    assert surban.page_fingerprint(ops, compress_level=0) != surban.page_fingerprint(ops, compress_level=9)
+    assert surban.output_key(plan, compress_level=0) != surban.output_key(plan, compress_level=9)
+
+
+def test_keys_follow_configured_compress_level(surban, plan, monkeypatch):
+    before = surban.output_key(plan), surban.page_fingerprint(plan['pages'][0])
+    monkeypatch.setattr(surban, 'SAVE_OPTIONS', surban.SAVE_OPTIONS._replace(compress_level=0))
+    assert surban.output_key(plan) != before[0]
+    assert surban.page_fingerprint(plan['pages'][0]) != before[1]
+
+
+def _plan_with_image(surban, plan, image_path):
+    """plan with its first placed image swapped for image_path"""
+    ops = next(page for page in plan['pages'] if any(surban.placed_images(page)))
+    original = next(surban.placed_images(ops))[0]
+    page = [tuple(image_path if value == original else value for value in op) for op in ops]
+    return dict(plan, pages=[page])
+
+
+@pytest.mark.parametrize('options', [{'dpi': 150}, {'use_forms': False}, {'profile': 'email'},
+                                     {'compress_level': 1}])
+def test_each_option_changes_output_key(surban, plan, options):
+    assert surban.output_key(plan, **options) != surban.output_key(plan)
+
+
+def test_content_changes_output_key(surban, plan):
+    other = surban.compile_plan(surban.resolve_content({'recipient': "Acme Ltd"}))
+    assert surban.output_key(other) != surban.output_key(plan)
+
+
+def test_asset_content_changes_output_key(surban, plan, tmp_path):
+    image = tmp_path / 'logo.png'
+    shutil.copyfile(os.path.join(surban.IMAGES_DIR, sorted(
+        name for name in os.listdir(surban.IMAGES_DIR) if name.endswith('.png'))[0]), image)
+    variant = _plan_with_image(surban, plan, str(image))
+    before = surban.output_key(variant)
+    assert surban.output_key(variant) == before
+    with open(image, 'ab') as f:
+        f.write(b'\0')
+    assert surban.output_key(variant) != before
+
+
+def test_hit_after_miss(surban, plan, tmp_path):
+    cache = surban.OutputCache(str(tmp_path / 'cache'))
+    assert not surban.render_cached(str(tmp_path / 'a.pdf'), plan=plan, cache=cache, verbose=False)
+    assert surban.render_cached(str(tmp_path / 'b.pdf'), plan=plan, cache=cache, verbose=False)
+    assert (tmp_path / 'a.pdf').read_bytes() == (tmp_path / 'b.pdf').read_bytes()
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['stores']) == (1, 1, 1)
+
+
+def _hammer(surban, cache_dir, worker, entries, size):
+    cache = surban.OutputCache(cache_dir, max_bytes=4 * size)
+    for i in range(entries):
+        key = f'{worker}-{i}'
+        cache.put(key, key.encode('ascii').ljust(size, b'.'))
+        data = cache.get(key)
+        # Another worker may have evicted it already, but never left it torn
+        assert data is None or data == key.encode('ascii').ljust(size, b'.')
+
+
+def test_concurrent_store_and_evict(surban, tmp_path):
+    cache_dir, workers, entries, size = str(tmp_path / 'cache'), 4, 25, 1000
+    ctx = multiprocessing.get_context('fork')
+    procs = [ctx.Process(target=_hammer, args=(surban, cache_dir, w, entries, size)) for w in range(workers)]
+    for proc in procs:
+        proc.start()
+    for proc in procs:
+        proc.join()
+    assert [proc.exitcode for proc in procs] == [0] * workers
+    cache = surban.OutputCache(cache_dir, max_bytes=4 * size)
+    stats = cache.stats()
+    assert stats['stores'] == workers * entries
+    assert stats['hits'] + stats['misses'] == workers * entries
+    assert stats['entries'] == stats['stores'] - stats['evictions']
+    assert stats['bytes'] <= cache.max_bytes
+    assert not [name for name in os.listdir(cache_dir) if name.endswith('.tmp')]
+    for name in os.listdir(cache_dir):
+        if name.endswith('.pdf'):
+            with open(os.path.join(cache_dir, name), 'rb') as f:
+                assert f.read() == name[:-4].encode('ascii').ljust(size, b'.')
@@ -0,0 +1,160 @@
+import io
+import os
+import socket
+import threading
+
+import numpy as np
+import pikepdf
+import pytest
+
+
+def _same_pages(page_pixels, a, b):
+    pages_a, pages_b = page_pixels(a), page_pixels(b)
+    assert len(pages_a) == len(pages_b)
+    for i, (x, y) in enumerate(zip(pages_a, pages_b), 1):
+        assert np.array_equal(x, y), f"page {i} differs"
+
+
+def _check(data):
+    with pikepdf.open(io.BytesIO(data)) as pdf:
+        assert pdf.check_pdf_syntax() == []
+        return len(pdf.pages)
+
+
+# ---- page cache (incremental builds)
+
+def test_incremental_build_matches_single_canvas(surban, plan, reference_pdf, page_pixels, tmp_path):
+    out = str(tmp_path / 'out.pdf')
+    cache_dir = str(tmp_path / 'pages')
+    assert surban.build_profile_pdf(out, plan=plan, verbose=False, cache_dir=cache_dir) == len(plan['pages'])
+    data = open(out, 'rb').read()
+    assert _check(data) == len(plan['pages'])
+    _same_pages(page_pixels, data, reference_pdf)
+    # Nothing changed: every page comes from the cache
+    assert surban.build_profile_pdf(out, plan=plan, verbose=False, cache_dir=cache_dir) == 0
+    _same_pages(page_pixels, out, reference_pdf)
+
+
+def test_incremental_build_rerenders_only_changed_pages(surban, page_pixels, tmp_path):
+    cache_dir = str(tmp_path / 'pages')
+    surban.build_profile_pdf(str(tmp_path / 'a.pdf'), plan=surban.compile_plan(None), verbose=False, cache_dir=cache_dir)
+    variant = surban.compile_plan({'recipient': "Acme Ltd"})
+    out = str(tmp_path / 'b.pdf')
+    assert surban.build_profile_pdf(out, plan=variant, verbose=False, cache_dir=cache_dir) == 1
+    _same_pages(page_pixels, out, surban.render_pdf_bytes(plan=variant))
+
+
+def _shared_objects(data):
+    """Count of fonts, images and forms in a PDF, and of distinct ones among them"""
+    counts, distinct = {}, {}
+    with pikepdf.open(io.BytesIO(data)) as pdf:
+        for obj in pdf.objects:
+            if isinstance(obj, pikepdf.Dictionary) and obj.get('/Type') == '/Font':
+                kind, key = 'font', str(obj.get('/BaseFont'))
+            elif isinstance(obj, pikepdf.Stream) and obj.get('/Subtype') in ('/Image', '/Form'):
+                kind, key = str(obj.get('/Subtype')), obj.read_raw_bytes()
+            else:
+                continue
+            counts[kind] = counts.get(kind, 0) + 1
+            distinct.setdefault(kind, set()).add(key)
+    return counts, {kind: len(keys) for kind, keys in distinct.items()}
+
+
+def _assert_shared_once(data, reference):
+    counts, distinct = _shared_objects(data)
+    assert counts == distinct, "a font, image or form was written more than once"
+    assert counts == _shared_objects(reference)[0]
+
+
+# ---- streamed output
+
+def test_stream_matches_single_canvas(surban, plan, reference_pdf, page_pixels):
+    buf = io.BytesIO()
+    surban.stream_profile_pdf(buf, plan=plan)
+    data = buf.getvalue()
+    assert _check(data) == len(plan['pages'])
+    _same_pages(page_pixels, data, reference_pdf)
+    _assert_shared_once(data, reference_pdf)
+
+
+def test_stream_to_a_socket(surban, plan, reference_pdf, page_pixels):
+    ours, theirs = socket.socketpair()
+    received = []
+    reader = threading.Thread(target=lambda: received.append(theirs.makefile('rb').read()))
+    reader.start()
+    with ours:
+        surban.stream_profile_pdf(ours, plan=plan)
+        ours.shutdown(socket.SHUT_WR)
+    reader.join(10)
+    theirs.close()
+    _same_pages(page_pixels, received[0], reference_pdf)
+
+
+# ---- output profiles
+
+def test_optimize_keeps_pages_and_linearizes(surban, reference_pdf, page_pixels):
+    data = surban.optimize_pdf(reference_pdf, compress_level=9, linearize=True)
+    with pikepdf.open(io.BytesIO(data)) as pdf:
+        assert pdf.is_linearized
+        assert pdf.check_linearization()
+    _check(data)
+    _same_pages(page_pixels, data, reference_pdf)
+    _assert_shared_once(data, reference_pdf)
+
+
+@pytest.mark.parametrize('profile', ['print', 'web', 'email'])
+def test_output_profiles(surban, plan, reference_pdf, page_pixels, profile, tmp_path):
+    out = str(tmp_path / f'{profile}.pdf')
+    size, _ = surban.render_profile_pdf(out, profile, plan=plan, verbose=False)
+    data = open(out, 'rb').read()
+    assert size == len(data)
+    assert _check(data) == len(plan['pages'])
+    with pikepdf.open(io.BytesIO(data)) as pdf:
+        assert pdf.is_linearized == surban.OUTPUT_PROFILES[profile].linearize
+        if pdf.is_linearized:
+            assert pdf.check_linearization()
+    # Images are resampled for the profile, so pages only come close
+    for x, y in zip(page_pixels(data), page_pixels(reference_pdf)):
+        assert np.abs(x.astype(int) - y).mean() < 2
+
+
+# ---- parallel page groups
+
+@pytest.mark.parametrize('group_size', [1, 3])
+def test_parallel_render_matches_single_canvas(surban, plan, reference_pdf, page_pixels, group_size, tmp_path):
+    out = str(tmp_path / 'parallel.pdf')
+    groups = surban.render_parallel_pdf(out, plan=plan, verbose=False, workers=2, group_size=group_size)
+    assert groups == -(-len(plan['pages']) // group_size)
+    data = open(out, 'rb').read()
+    assert _check(data) == len(plan['pages'])
+    _same_pages(page_pixels, data, reference_pdf)
+    _assert_shared_once(data, reference_pdf)
+
+
+# ---- stamped variants
+
+STAMPED_ROW = {'recipient': "Acme Ltd", 'reference': "Q-2041", 'watermark': "DRAFT"}
+
+
+def test_stamped_variant_matches_full_render(surban, page_pixels, tmp_path):
+    out = str(tmp_path / 'acme.pdf')
+    surban._STAMP_BASES.clear()
+    assert surban.stamp_variant(out, STAMPED_ROW) == (out, True)
+    base, = surban._STAMP_BASES.values()
+    data = open(out, 'rb').read()
+    # An incremental update: the base is left as it was and the stamps appended
+    assert data.startswith(base.data)
+    assert _check(data) == len(base.pages)
+    _same_pages(page_pixels, data, surban.render_pdf_bytes(plan=surban.compile_plan(STAMPED_ROW)))
+    # The next row on the same base only stamps
+    assert surban.stamp_variant(str(tmp_path / 'other.pdf'), {'recipient': "Other plc"})[1] is False
+
+
+def test_stamped_batch_matches_full_renders(surban, page_pixels, tmp_path):
+    rows = [STAMPED_ROW, {'recipient': "Other plc", 'output': 'other.pdf'}, {}]
+    paths = list(surban.render_stamped_batch(rows, str(tmp_path), workers=2))
+    assert len(paths) == 3 and os.path.basename(paths[1]) == 'other.pdf'
+    for path, row in zip(paths, rows):
+        overrides = {k: v for k, v in row.items() if k != 'output'}
+        _check(open(path, 'rb').read())
+        _same_pages(page_pixels, path, surban.render_pdf_bytes(plan=surban.compile_plan(overrides)))
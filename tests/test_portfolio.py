@@ -0,0 +1,67 @@
+import tracemalloc
+
+import pymupdf
+import pytest
+
+
+@pytest.fixture
+def portfolio(surban, tmp_path):
+    path = str(tmp_path / 'projects.db')
+    surban.import_projects(path, [
+        {'name': "Township roads", 'category': "Infrastructure", 'client': "GIDC", 'region': "Gujarat", 'year': 2016},
+        {'name': "Office block", 'category': "Commercial", 'client': "Acme", 'region': "Maharashtra", 'year': 2021},
+    ])
+    return path
+
+
+@pytest.mark.parametrize('template', ["Our {work} since 2015", "{}", "{projects.real}", "{categories}",
+                                      "{projects:s}", "unbalanced }"])
+def test_bad_subtitle_is_a_value_error(surban, template):
+    with pytest.raises(ValueError, match="portfolio_subtitle"):
+        surban.resolve_content({'portfolio_subtitle': template})
+
+
+def test_subtitle_placeholders(surban, portfolio):
+    content = surban.resolve_content({'portfolio': portfolio,
+                                      'portfolio_subtitle': "{projects} jobs for {clients} clients since {first_year}"})
+    page = next(surban.layout_portfolio(content))
+    assert any("2 jobs for 2 clients since 2016" in op for op in page.ops if op[0] == 'text')
+
+
+def _catalogue(surban, path, n):
+    surban.import_projects(path, ({'name': f"Project {i}", 'category': ("Industrial", "Roads")[i % 2],
+                                   'client': f"Client {i % 40}", 'region': "Gujarat", 'year': 2010 + i % 16}
+                                  for i in range(n)))
+    return path
+
+
+def test_lazy_plan_matches_the_compiled_plan(surban, tmp_path):
+    content = {'portfolio': _catalogue(surban, str(tmp_path / 'p.db'), 200), 'watermark': "DRAFT",
+               'recipient': "Acme Ltd"}
+    plan = surban.compile_plan(content)
+    lazy = surban.lazy_plan(content)
+    assert [list(map(list, ops)) for ops in lazy['pages']] == [list(map(list, ops)) for ops in plan['pages']]
+    assert lazy['overflow'] == plan['overflow']
+
+
+def _render_working_set(surban, content, path):
+    """Peak heap of a render over what it leaves behind in the (bounded) text measurement cache"""
+    surban._word_units.cache_clear()
+    tracemalloc.start()
+    try:
+        surban.create_profile_pdf(path, content, verbose=False)
+        current, peak = tracemalloc.get_traced_memory()
+        return peak - current
+    finally:
+        tracemalloc.stop()
+
+
+def test_portfolio_render_memory_does_not_grow_with_the_catalogue(surban, tmp_path):
+    small = {'portfolio': _catalogue(surban, str(tmp_path / 'small.db'), 150)}
+    large = {'portfolio': _catalogue(surban, str(tmp_path / 'large.db'), 1500)}
+    surban.create_profile_pdf(str(tmp_path / 'warm.pdf'), small, verbose=False)
+    small_peak = _render_working_set(surban, small, str(tmp_path / 'small.pdf'))
+    large_peak = _render_working_set(surban, large, str(tmp_path / 'large.pdf'))
+    # Ten times the cards (about 80 pages more) in about the same memory
+    assert large_peak < small_peak * 1.3
+    assert pymupdf.open(str(tmp_path / 'large.pdf')).page_count > pymupdf.open(str(tmp_path / 'small.pdf')).page_count + 70
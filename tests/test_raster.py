@@ -0,0 +1,29 @@
+import numpy as np
+from PIL import Image
+
+
+def test_previews_are_the_pdf_pages(surban, plan, tmp_path):
+    cache_dir = str(tmp_path / 'cache')
+    paths, drawn = surban.export_rasters(plan, str(tmp_path / 'out'), widths=(320, 640), formats=('png',),
+                                         workers=1, cache_dir=cache_dir)
+    assert drawn == len(plan['pages'])
+    assert len(paths) == 2 * len(plan['pages'])
+    for page_no, ops in enumerate(plan['pages'], 1):
+        expected = surban.rasterize_pdf_page(ops, plan['pagesize'], 640)
+        with Image.open(tmp_path / 'out' / f'page-{page_no}-640.png') as im:
+            assert im.size == expected.size
+            assert np.array_equal(np.asarray(im.convert('RGB')), np.asarray(expected))
+        with Image.open(tmp_path / 'out' / f'page-{page_no}-320.png') as im:
+            assert im.width == 320
+
+
+def test_unchanged_pages_come_from_the_cache(surban, plan, tmp_path):
+    cache_dir = str(tmp_path / 'cache')
+    surban.export_rasters(plan, str(tmp_path / 'a'), widths=(320,), formats=('png',), workers=1, cache_dir=cache_dir)
+    _, drawn = surban.export_rasters(plan, str(tmp_path / 'b'), widths=(320, 160), formats=('png',),
+                                     workers=1, cache_dir=cache_dir)
+    # Only the new width is drawn, but every page needs it
+    assert drawn == len(plan['pages'])
+    _, drawn = surban.export_rasters(plan, str(tmp_path / 'c'), widths=(160,), formats=('png',),
+                                     workers=1, cache_dir=cache_dir)
+    assert drawn == 0
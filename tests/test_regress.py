@@ -0,0 +1,22 @@
+import pytest
+
+
+@pytest.fixture
+def goldens(surban, plan, tmp_path):
+    golden_dir = str(tmp_path / 'goldens')
+    surban.store_goldens([('default', plan)], golden_dir, width=320, workers=1)
+    return golden_dir
+
+
+def test_unchanged_pages_pass(surban, plan, goldens):
+    diffs = surban.regress([('default', plan)], goldens, workers=1)
+    assert [diff.status for diff in diffs] == ['ok'] * len(plan['pages'])
+
+
+def test_pdf_side_break_is_flagged(surban, plan, goldens, monkeypatch):
+    # The plan is untouched; only the PDF replay loses its rectangles
+    monkeypatch.setattr(surban.PlanReplayer, 'op_rect', lambda self, *args: None)
+    diffs = surban.regress([('default', plan)], goldens, workers=1)
+    changed = [diff for diff in diffs if diff.status == 'changed']
+    assert changed
+    assert all(diff.heatmap for diff in changed)
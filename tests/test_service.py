@@ -0,0 +1,151 @@
+import asyncio
+import threading
+from concurrent import futures
+
+import pytest
+
+
+def _blocked(event):
+    event.wait(5)
+    return 'blocker'
+
+
+def _name(name):
+    return name
+
+
+async def _run_order(surban, join):
+    """Run bulk jobs 'x' and 'z' behind a blocker on one worker, joining 'z' as interactive if join is set"""
+    release = threading.Event()
+    with futures.ThreadPoolExecutor(1) as executor:
+        scheduler = surban.JobScheduler(executor, 1)
+        order = []
+        blocker = await scheduler.submit('interactive', _blocked, release)
+        jobs = {name: await scheduler.submit('bulk', _name, name) for name in 'xz'}
+        for name, future in jobs.items():
+            future.add_done_callback(lambda f: order.append(f.result()))
+        if join:
+            scheduler.join(jobs['z'], 'interactive')
+        release.set()
+        await asyncio.gather(blocker, *jobs.values())
+        return order, scheduler.metrics()
+
+
+def test_join_promotes_a_queued_job(surban):
+    order, _ = asyncio.run(_run_order(surban, join=False))
+    assert order == ['x', 'z']
+    order, metrics = asyncio.run(_run_order(surban, join=True))
+    assert order == ['z', 'x']
+    assert metrics['bulk']['promoted'] == 1
+
+
+def test_join_extends_the_deadline(surban):
+    async def run():
+        release = threading.Event()
+        with futures.ThreadPoolExecutor(1) as executor:
+            scheduler = surban.JobScheduler(executor, 1)
+            blocker = await scheduler.submit('bulk', _blocked, release)
+            job = await scheduler.submit('interactive', _name, 'late', deadline=0.05)
+            scheduler.join(job, 'bulk')  # bulk has no deadline
+            await asyncio.sleep(0.1)
+            release.set()
+            await blocker
+            return await job
+    assert asyncio.run(run()) == 'late'
+
+
+async def _run_queued(surban, submissions):
+    """Run (kind, name) jobs queued behind a blocker on one worker; returns the order they ran in"""
+    release = threading.Event()
+    with futures.ThreadPoolExecutor(1) as executor:
+        scheduler = surban.JobScheduler(executor, 1)
+        order = []
+        blocker = await scheduler.submit('interactive', _blocked, release)
+        jobs = [await scheduler.submit(kind, order.append, name) for kind, name in submissions]
+        release.set()
+        await asyncio.gather(blocker, *jobs)
+        return order
+
+
+def test_higher_priority_runs_first(surban):
+    order = asyncio.run(_run_queued(surban, [('bulk', 'a'), ('interactive', 'b'), ('bulk', 'c'), ('interactive', 'd')]))
+    assert order == ['b', 'd', 'a', 'c']
+
+
+def test_bulk_leaves_workers_for_interactive(surban):
+    async def run():
+        release = threading.Event()
+        with futures.ThreadPoolExecutor(4) as executor:
+            scheduler = surban.JobScheduler(executor, 4)
+            bulk = [await scheduler.submit('bulk', _blocked, release) for _ in range(5)]
+            metrics = scheduler.metrics()['bulk']
+            # 0.75 of four workers: the fourth stays free for interactive work
+            assert (metrics['running'], metrics['queued'], metrics['max_running']) == (3, 2, 3)
+            assert await scheduler.run('interactive', _name, 'served') == 'served'
+            release.set()
+            await asyncio.gather(*bulk)
+            return scheduler.metrics()
+    metrics = asyncio.run(run())
+    assert metrics['bulk']['completed'] == 5
+    assert metrics['interactive']['completed'] == 1
+
+
+def test_queued_jobs_expire_at_their_deadline(surban):
+    ran = []
+
+    async def run():
+        release = threading.Event()
+        with futures.ThreadPoolExecutor(1) as executor:
+            scheduler = surban.JobScheduler(executor, 1)
+            blocker = await scheduler.submit('bulk', _blocked, release)
+            with pytest.raises(surban.DeadlineExceeded):
+                await scheduler.run('interactive', ran.append, 'late', deadline=0.05)
+            release.set()
+            await blocker
+            return scheduler.metrics()
+    metrics = asyncio.run(run())
+    # The expired job never reached a worker
+    assert ran == []
+    assert metrics['interactive']['expired'] == 1
+    assert metrics['interactive']['queued'] == 0
+
+
+def test_full_queues_reject_or_block(surban):
+    classes = dict(surban.JOB_CLASSES, bulk=surban.JOB_CLASSES['bulk']._replace(queue_size=1))
+
+    async def run():
+        release = threading.Event()
+        with futures.ThreadPoolExecutor(1) as executor:
+            scheduler = surban.JobScheduler(executor, 1, classes)
+            blocker = await scheduler.submit('interactive', _blocked, release)
+            queued = await scheduler.submit('bulk', _name, 'queued')
+            with pytest.raises(asyncio.QueueFull):
+                await scheduler.submit('bulk', _name, 'refused')
+            waiting = asyncio.ensure_future(scheduler.run('bulk', _name, 'waited', block=True))
+            await asyncio.sleep(0.01)
+            assert scheduler.metrics()['bulk']['blocked_producers'] == 1
+            release.set()
+            results = await asyncio.gather(blocker, queued, waiting)
+            return results, scheduler.metrics()['bulk']
+    results, metrics = asyncio.run(run())
+    assert results == ['blocker', 'queued', 'waited']
+    assert (metrics['rejected'], metrics['completed']) == (1, 2)
+
+
+@pytest.fixture
+def service(surban):
+    service = surban.RenderService(workers=1)
+    executor = futures.ThreadPoolExecutor(1)
+    service.scheduler = surban.JobScheduler(executor, 1, service.classes)
+    yield service
+    executor.shutdown()
+
+
+def test_one_render_for_both_priorities(surban, service):
+    async def run():
+        return await asyncio.gather(service.render({'recipient': "Acme Ltd"}, priority='bulk'),
+                                    service.render({'recipient': "Acme Ltd"}, priority='interactive'))
+    (first, first_source), (second, second_source) = asyncio.run(run())
+    assert first == second
+    assert (first_source, second_source) == ('miss', 'coalesced')
+    assert service.stats['rendered'] == 1
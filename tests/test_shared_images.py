@@ -0,0 +1,57 @@
+import io
+from concurrent import futures
+
+import pikepdf
+
+
+def _image_streams(data):
+    with pikepdf.open(io.BytesIO(data)) as pdf:
+        return sorted(obj.read_raw_bytes() for obj in pdf.objects
+                      if isinstance(obj, pikepdf.Stream) and obj.get('/Subtype') == '/Image')
+
+
+def _worker_images():
+    import surban
+    return {path: type(entry[1]).__name__ for path, entry in surban._IMAGE_XOBJECTS.items()}
+
+
+def _images(surban, plan):
+    return list(dict.fromkeys(path for ops in plan['pages'] for path, _, _ in surban.placed_images(ops)))
+
+
+def test_pool_holds_the_encoded_streams(surban, plan):
+    paths = _images(surban, plan)
+    with surban.SharedImagePool(paths) as pool:
+        assert pool.entries
+        for path, name, xobj, smask in pool.entries:
+            expected = surban.load_image_xobject(path)
+            for part, obj in ((xobj, expected[1]), (smask, expected[2])):
+                if obj is None:
+                    assert part is None
+                    continue
+                shell, offset, length = part
+                assert shell.streamContent is None
+                assert bytes(pool.block.buf[offset:offset + length]) == surban.pdfdoc.pdfdocEnc(obj.streamContent)
+
+
+def test_workers_write_byte_identical_image_streams(surban, plan, reference_pdf):
+    paths = _images(surban, plan)
+    jobs = [(plan['pages'], plan['pagesize'], True)]
+    with surban.shared_image_workers(paths) as (initializer, initargs), \
+            futures.ProcessPoolExecutor(max_workers=1, initializer=initializer, initargs=initargs) as pool:
+        assert initializer is surban._init_shared_worker
+        data = pool.submit(surban._page_group_job, jobs[0]).result()
+        loaded = pool.submit(_worker_images).result()
+    # Every image the worker drew came out of the shared block
+    assert set(loaded) >= {path for path, *_ in initargs[1]}
+    assert {loaded[path] for path, *_ in initargs[1]} == {'SharedImageXObject'}
+    streams = _image_streams(data)
+    assert streams and streams == _image_streams(reference_pdf)
+
+
+def test_workers_fall_back_without_the_block(surban, plan, reference_pdf):
+    jobs = [(plan['pages'], plan['pagesize'], True)]
+    with futures.ProcessPoolExecutor(max_workers=1, initializer=surban._init_shared_worker,
+                                     initargs=('surban-no-such-block', [])) as pool:
+        data = pool.submit(surban._page_group_job, jobs[0]).result()
+    assert _image_streams(data) == _image_streams(reference_pdf)
@@ -0,0 +1,25 @@
+import re
+
+
+def _meta_description(html):
+    return re.search(r'<meta property="og:description" content="([^"]*)"', html).group(1)
+
+
+def test_years_come_from_the_content(surban, tmp_path):
+    surban.build_site(str(tmp_path / 'site'), pdf=False, cache_dir=str(tmp_path / 'cache'))
+    html = (tmp_path / 'site' / 'index.html').read_text(encoding='utf-8')
+    years = next(number for number, label, _ in surban.resolve_content().stats if label == 'Years')
+    assert f"with {years} years experience" in _meta_description(html)
+    assert f"with {years} years of proven expertise" in html
+
+
+def test_years_follow_the_portfolio(surban, tmp_path):
+    db = str(tmp_path / 'projects.db')
+    surban.import_projects(db, [{'name': "Depot", 'category': "Industrial", 'year': 2011}])
+    content = {'portfolio': db, 'year': "2026"}
+    surban.build_site(str(tmp_path / 'site'), content, pdf=False, cache_dir=str(tmp_path / 'cache'))
+    html = (tmp_path / 'site' / 'index.html').read_text(encoding='utf-8')
+    pdf_years = next(number for number, label, _ in surban.portfolio_content(content).stats if label == 'Years')
+    assert pdf_years == "15+"
+    assert "with 15+ years experience" in _meta_description(html)
+    assert "8+" not in _meta_description(html)
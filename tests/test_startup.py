@@ -0,0 +1,70 @@
+import os
+import signal
+import subprocess
+import sys
+
+from conftest import SCRIPT
+
+HEAVY = ('reportlab', 'PIL', 'asyncio', 'numpy', 'pymupdf', 'concurrent.futures')
+
+
+def _python(code, **kwargs):
+    return subprocess.run([sys.executable, '-c', code, SCRIPT], capture_output=True, text=True, **kwargs)
+
+
+def test_heavy_modules_are_imported_on_first_use(surban):
+    lazy = surban._LazyModule('colorsys')
+    assert lazy._module is None
+    assert lazy.rgb_to_hsv(1, 0, 0) == (0, 1, 1)
+    assert lazy._module is sys.modules['colorsys']
+
+
+def test_help_does_not_import_the_renderer():
+    result = _python(
+        "import importlib.util, sys\n"
+        "spec = importlib.util.spec_from_file_location('surban', sys.argv[1])\n"
+        "module = importlib.util.module_from_spec(spec)\n"
+        "spec.loader.exec_module(module)\n"
+        "try:\n"
+        "    module.main(['--help'])\n"
+        "except SystemExit:\n"
+        "    pass\n"
+        f"print([name for name in {HEAVY!r} if name in sys.modules])\n")
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.splitlines()[-1] == '[]'
+
+
+def _client(tmp_path, env, *render_args):
+    return subprocess.run([sys.executable, SCRIPT, 'client', '--socket', str(tmp_path / 'render.sock'), '--',
+                           *render_args], capture_output=True, text=True, env=env, cwd=str(tmp_path), timeout=120)
+
+
+def test_fork_server_renders_for_clients(reference_pdf, page_pixels, tmp_path):
+    env = dict(os.environ, SURBAN_CACHE_DIR=str(tmp_path / 'cache'))
+    sock = str(tmp_path / 'render.sock')
+    server = subprocess.Popen([sys.executable, SCRIPT, 'fork-server', '--socket', sock],
+                              stderr=subprocess.PIPE, text=True, env=env)
+    try:
+        assert "Fork server ready" in server.stderr.readline()
+        result = _client(tmp_path, env, '-o', 'out.pdf')
+        assert result.returncode == 0, result.stderr
+        # Relative paths are the client's, not the server's
+        out = tmp_path / 'out.pdf'
+        pages_a, pages_b = page_pixels(str(out)), page_pixels(reference_pdf)
+        assert len(pages_a) == len(pages_b)
+        assert all((a == b).all() for a, b in zip(pages_a, pages_b))
+        # The child's errors and exit status come back to the client
+        result = _client(tmp_path, env, '--content', 'missing.json')
+        assert result.returncode != 0
+        assert 'missing.json' in result.stderr
+    finally:
+        server.send_signal(signal.SIGTERM)
+        assert server.wait(timeout=30) == 0
+    assert not os.path.exists(sock)
+
+
+def test_client_without_a_server_renders_in_process(tmp_path):
+    env = dict(os.environ, SURBAN_CACHE_DIR=str(tmp_path / 'cache'))
+    result = _client(tmp_path, env, '-o', 'out.pdf')
+    assert result.returncode == 0, result.stderr
+    assert (tmp_path / 'out.pdf').stat().st_size > 0
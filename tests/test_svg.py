@@ -0,0 +1,40 @@
+import os
+import xml.etree.ElementTree as ET
+
+import numpy as np
+import pymupdf
+
+SVG = '{http://www.w3.org/2000/svg}'
+
+
+def test_path_data(surban):
+    assert surban.svg_path_data("10 20 m 30.5 40 l 1 2 3 4 5 6 c h f") == "M10 20L30.5 40C1 2 3 4 5 6Z"
+    assert surban.svg_path_data("0 0 50 -20 re n") == "M0 0h50v-20h-50Z"
+
+
+def test_pages_match_the_pdf(surban, plan, reference_pdf, page_pixels, tmp_path):
+    display_list = surban.record_display_list(plan)
+    paths = surban.export_svgs(display_list, str(tmp_path))
+    names = [f'page-{i}.svg' for i in range(1, len(plan['pages']) + 1)] + ['logo-mark.svg']
+    assert [os.path.basename(p) for p in paths] == names
+    width, height = plan['pagesize']
+    for path, ops, expected in zip(paths, display_list['pages'], page_pixels(reference_pdf)):
+        root = ET.parse(path).getroot()
+        assert root.get('viewBox') == f"0 0 {surban._svg_num(width)} {surban._svg_num(height)}"
+        # Every string drawn on the page is there as text
+        texts = {el.text for el in root.iter(SVG + 'text')}
+        assert {op[3] for op in ops if op[0] in ('drawString', 'drawCentredString')} <= texts
+        # MuPDF draws the SVG within antialiasing of the PDF page
+        with pymupdf.open(path) as doc:
+            pixels = page_pixels(doc.convert_to_pdf())[0]
+        assert pixels.shape == expected.shape
+        assert np.abs(pixels.astype(int) - expected).mean() < 2, path
+    ET.parse(paths[-1])
+
+
+def test_cli_writes_pdf_and_svgs_in_one_pass(surban, plan, tmp_path):
+    out_dir = tmp_path / 'svg'
+    surban.main(['-o', str(tmp_path / 'out.pdf'), '--svg-dir', str(out_dir)])
+    assert (tmp_path / 'out.pdf').stat().st_size > 0
+    assert sorted(os.listdir(out_dir)) == sorted([f'page-{i}.svg' for i in range(1, len(plan['pages']) + 1)]
+                                                 + ['logo-mark.svg'])